@@ -0,0 +1,305 @@
+"""
+Escritor masivo (bulk) para tablas de la base de datos destino
+Convierte DataFrames a filas listas para el driver de forma vectorizada (columna
+por columna, sin iterrows) y las envía en bloques acotados usando el array
+binding de pyodbc (fast_executemany), reportando filas/segundo por bloque.
+
+Con aislamiento de errores activado, un bloque que falla se divide en mitades
+recursivamente: las mitades válidas se confirman en bloque y solo las filas que
+fallan individualmente se envían a una tabla de cuarentena con el error. El
+costo queda en O(filas_malas × log(tamaño_bloque)) viajes en lugar de uno por fila.
+"""
+
+import json
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .metrics import observar_lote_insercion
+
+logger = logging.getLogger('bulk_writer')
+
+# Tamaño de bloque por defecto: suficientemente grande para amortizar el viaje
+# de red y suficientemente pequeño para acotar la memoria del buffer de pyodbc
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def serie_a_valores_driver(serie):
+    """
+    Convierte una Serie de pandas en un array de objetos nativos de Python
+    aceptados por pyodbc (int, float, str, datetime, bool) con None para nulos
+
+    Args:
+        serie: pandas.Series de cualquier dtype
+
+    Returns:
+        numpy.ndarray: Array de dtype object con valores listos para el driver
+    """
+    mascara_nulos = serie.isna().to_numpy()
+
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        if getattr(serie.dt, 'tz', None) is not None:
+            serie = serie.dt.tz_localize(None)
+        valores = np.asarray(serie.dt.to_pydatetime(), dtype=object)
+    else:
+        # astype(object) convierte escalares numpy (int64, float64, bool_) a tipos nativos
+        valores = serie.to_numpy(dtype=object)
+
+    if mascara_nulos.any():
+        valores = valores.copy()
+        valores[mascara_nulos] = None
+
+    return valores
+
+
+def dataframe_a_filas(df):
+    """
+    Convierte un DataFrame completo en una lista de tuplas para executemany
+
+    Args:
+        df: DataFrame de pandas
+
+    Returns:
+        list[tuple]: Filas con valores nativos de Python
+    """
+    if df.empty:
+        return []
+
+    columnas = [serie_a_valores_driver(df.iloc[:, i]) for i in range(df.shape[1])]
+    return list(zip(*columnas))
+
+
+class BulkWriter:
+    """
+    Inserta datos en una tabla destino en bloques acotados con fast_executemany
+    """
+
+    def __init__(self, conn, table_name, columns, chunk_size=DEFAULT_CHUNK_SIZE,
+                 fast_executemany=True, on_chunk=None, isolate_errors=False,
+                 quarantine_table=None, proceso_id=None):
+        """
+        Args:
+            conn: Conexión DB-API abierta (pyodbc en producción)
+            table_name: Nombre de la tabla destino (ya creada)
+            columns: Lista de nombres de columnas destino (ya limpios)
+            chunk_size: Número máximo de filas por executemany
+            fast_executemany: Activar array binding de pyodbc si el driver lo soporta
+            on_chunk: Callback opcional on_chunk(estadistica_dict) tras cada bloque
+            isolate_errors: Confirmar cada bloque y aislar filas malas por bisección
+            quarantine_table: Tabla donde guardar las filas rechazadas (None = solo en memoria)
+            proceso_id: UUID del proceso, se guarda junto a cada fila en cuarentena
+        """
+        self.conn = conn
+        self.table_name = table_name
+        self.columns = list(columns)
+        self.chunk_size = max(1, int(chunk_size))
+        self.on_chunk = on_chunk
+        self.isolate_errors = isolate_errors
+        self.quarantine_table = quarantine_table
+        self.proceso_id = proceso_id
+
+        self.cursor = conn.cursor()
+        if fast_executemany and hasattr(self.cursor, 'fast_executemany'):
+            self.cursor.fast_executemany = True
+
+        columns_sql = ', '.join(f'[{col}]' for col in self.columns)
+        placeholders = ', '.join('?' for _ in self.columns)
+        self.insert_sql = f"INSERT INTO [{self.table_name}] ({columns_sql}) VALUES ({placeholders})"
+
+        self.registros_insertados = 0
+        self.segundos_insercion = 0.0
+        self.segundos_materializacion = 0.0
+        self.estadisticas_chunks = []
+
+        # Estado del aislamiento de errores
+        self.filas_enviadas = 0
+        self.viajes_fallidos = 0
+        self.filas_rechazadas = []
+        self._cuarentena_pendiente = []
+        self._cuarentena_creada = False
+
+    def write(self, datos):
+        """
+        Inserta un DataFrame o un iterable de tuplas en bloques de chunk_size
+
+        La conversión de DataFrame a filas se hace por bloque para que la memoria
+        adicional quede acotada por chunk_size y no por el tamaño total.
+
+        Returns:
+            int: Registros insertados en esta llamada
+        """
+        insertados_antes = self.registros_insertados
+
+        if isinstance(datos, pd.DataFrame):
+            for inicio in range(0, len(datos), self.chunk_size):
+                bloque = datos.iloc[inicio:inicio + self.chunk_size]
+                inicio_materializacion = time.perf_counter()
+                filas = dataframe_a_filas(bloque)
+                self.segundos_materializacion += time.perf_counter() - inicio_materializacion
+                self._insertar_chunk(filas)
+        else:
+            bloque = []
+            inicio_materializacion = time.perf_counter()
+            for fila in datos:
+                bloque.append(tuple(fila))
+                if len(bloque) >= self.chunk_size:
+                    self.segundos_materializacion += time.perf_counter() - inicio_materializacion
+                    self._insertar_chunk(bloque)
+                    bloque = []
+                    inicio_materializacion = time.perf_counter()
+            self.segundos_materializacion += time.perf_counter() - inicio_materializacion
+            if bloque:
+                self._insertar_chunk(bloque)
+
+        self._guardar_cuarentena()
+        return self.registros_insertados - insertados_antes
+
+    def _insertar_chunk(self, filas):
+        """Envía un bloque con executemany y registra su rendimiento"""
+        if not filas:
+            return
+
+        desplazamiento = self.filas_enviadas
+        self.filas_enviadas += len(filas)
+
+        if self.isolate_errors:
+            self._insertar_con_biseccion(filas, desplazamiento)
+            return
+
+        inicio = time.perf_counter()
+        self.cursor.executemany(self.insert_sql, filas)
+        duracion = time.perf_counter() - inicio
+
+        self._registrar_chunk(len(filas), duracion)
+
+    def _insertar_con_biseccion(self, filas, desplazamiento):
+        """
+        Inserta y confirma un bloque; si falla, lo revierte y lo divide en mitades
+        hasta aislar las filas que fallan por sí solas
+
+        Args:
+            filas: Lista de tuplas a insertar
+            desplazamiento: Número de fila (base 0) de la primera tupla en la carga
+        """
+        inicio = time.perf_counter()
+        try:
+            self.cursor.executemany(self.insert_sql, filas)
+            self.conn.commit()
+        except Exception as error:
+            self.conn.rollback()
+            self.viajes_fallidos += 1
+
+            if len(filas) == 1:
+                self._rechazar_fila(filas[0], desplazamiento, error)
+                return
+
+            mitad = len(filas) // 2
+            logger.warning(
+                f"[{self.table_name}] bloque de {len(filas)} filas falló ({error}); "
+                f"dividiendo en {mitad} + {len(filas) - mitad}"
+            )
+            self._insertar_con_biseccion(filas[:mitad], desplazamiento)
+            self._insertar_con_biseccion(filas[mitad:], desplazamiento + mitad)
+            return
+
+        self._registrar_chunk(len(filas), time.perf_counter() - inicio)
+
+    def _rechazar_fila(self, fila, numero_fila, error):
+        """Registra una fila que no se pudo insertar y la deja pendiente de cuarentena"""
+        mensaje = str(error)[:4000]
+        datos_fila = json.dumps(dict(zip(self.columns, fila)), default=str, ensure_ascii=False)
+
+        self.filas_rechazadas.append({'numero_fila': numero_fila, 'error': mensaje})
+        self._cuarentena_pendiente.append(
+            (self.proceso_id, self.table_name, numero_fila, datos_fila, mensaje)
+        )
+        print(f"   ❌ Fila {numero_fila} enviada a cuarentena: {mensaje[:200]}")
+
+    def _guardar_cuarentena(self):
+        """Persiste en bloque las filas rechazadas pendientes en la tabla de cuarentena"""
+        if not self._cuarentena_pendiente or not self.quarantine_table:
+            self._cuarentena_pendiente = []
+            return
+
+        cursor = self.conn.cursor()
+        try:
+            if not self._cuarentena_creada:
+                cursor.execute(f"""
+                    IF OBJECT_ID('{self.quarantine_table}', 'U') IS NULL
+                    CREATE TABLE [{self.quarantine_table}] (
+                        [CuarentenaID] INT IDENTITY(1,1) PRIMARY KEY,
+                        [ProcesoID] NVARCHAR(36) NULL,
+                        [TablaDestino] NVARCHAR(128) NULL,
+                        [NumeroFila] INT NULL,
+                        [DatosFila] NVARCHAR(MAX) NULL,
+                        [MensajeError] NVARCHAR(4000) NULL,
+                        [FechaRegistro] DATETIME2 NOT NULL DEFAULT SYSDATETIME()
+                    )
+                """)
+                self._cuarentena_creada = True
+
+            cursor.executemany(
+                f"INSERT INTO [{self.quarantine_table}] "
+                f"([ProcesoID], [TablaDestino], [NumeroFila], [DatosFila], [MensajeError]) "
+                f"VALUES (?, ?, ?, ?, ?)",
+                self._cuarentena_pendiente
+            )
+            self.conn.commit()
+            print(f"   🧪 {len(self._cuarentena_pendiente)} filas guardadas en cuarentena '{self.quarantine_table}'")
+        except Exception as e:
+            self.conn.rollback()
+            logger.error(f"No se pudo guardar la cuarentena en '{self.quarantine_table}': {str(e)}")
+        finally:
+            cursor.close()
+            self._cuarentena_pendiente = []
+
+    def _registrar_chunk(self, filas, duracion):
+        """Acumula estadísticas del bloque y notifica filas/segundo"""
+        self.registros_insertados += filas
+        self.segundos_insercion += duracion
+        observar_lote_insercion(duracion)
+        filas_por_segundo = filas / duracion if duracion > 0 else float(filas)
+
+        estadistica = {
+            'chunk': len(self.estadisticas_chunks) + 1,
+            'filas': filas,
+            'segundos': round(duracion, 4),
+            'filas_por_segundo': round(filas_por_segundo, 1),
+        }
+        self.estadisticas_chunks.append(estadistica)
+
+        logger.info(
+            f"[{self.table_name}] bloque {estadistica['chunk']}: {filas} filas "
+            f"en {duracion:.3f}s ({filas_por_segundo:,.0f} filas/s)"
+        )
+        print(f"   📦 Bloque {estadistica['chunk']}: {filas} filas, {filas_por_segundo:,.0f} filas/s")
+
+        if self.on_chunk:
+            self.on_chunk(estadistica)
+
+    def resumen(self):
+        """
+        Returns:
+            dict: Totales de la escritura (filas, segundos de inserción y de
+                  materialización de filas, filas/s, bloques)
+        """
+        return {
+            'registros_insertados': self.registros_insertados,
+            'segundos_insercion': round(self.segundos_insercion, 4),
+            'segundos_materializacion': round(self.segundos_materializacion, 4),
+            'filas_por_segundo': round(self.registros_insertados / self.segundos_insercion, 1)
+            if self.segundos_insercion > 0 else None,
+            'bloques': len(self.estadisticas_chunks),
+            'tamano_bloque': self.chunk_size,
+            'registros_cuarentena': len(self.filas_rechazadas),
+            'viajes_fallidos': self.viajes_fallidos,
+        }
+
+    def close(self):
+        """Cierra el cursor del escritor"""
+        try:
+            self.cursor.close()
+        except Exception:
+            pass
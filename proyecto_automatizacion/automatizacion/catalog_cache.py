@@ -0,0 +1,354 @@
+"""
+Caché de metadatos de catálogo de SQL Server (bases de datos, tablas y columnas)
+
+Las vistas de navegación (bases de datos, tablas, columnas, edición de procesos)
+consultaban sys.databases e INFORMATION_SCHEMA en cada petición; en servidores
+con miles de tablas eso son segundos por página. Aquí esas consultas pasan por
+una caché con TTL por conexión (DatabaseConnection.catalog_cache_ttl o
+settings.CATALOG_CACHE_TTL):
+
+- Nivel 1: diccionario en memoria del proceso, acotado con expulsión LRU.
+- Nivel 2 (opcional): una caché de Django (settings.CATALOG_CACHE_ALIAS, p. ej.
+  FileBasedCache o DatabaseCache) compartida por todos los workers.
+
+La invalidación es por versión: cada conexión tiene un número de versión que
+forma parte de las claves; invalidar() lo incrementa y las entradas anteriores
+dejan de usarse (expiran solas). Con nivel 2 la versión vive en la caché
+compartida, así que una invalidación en un worker la ven todos.
+
+precalentar() carga el catálogo completo de una conexión con una consulta de
+columnas por base de datos (en lugar de una por tabla).
+
+Las vistas previas muestran filas estimadas desde sys.partitions; el conteo
+exacto (COUNT_BIG(*)) se lanza bajo demanda en un hilo y su resultado se guarda
+aquí durante ROW_COUNT_CACHE_TTL. Los conteos no dependen de la versión del
+catálogo: guardar un proceso no los descarta. El estado del conteo en curso
+(running/failed) también se publica en el nivel 2 durante ROW_COUNT_JOB_TIMEOUT,
+para que el worker que atiende la consulta siguiente lo vea.
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .metrics import consulta_cache
+
+logger = logging.getLogger('catalog_cache')
+
+DEFAULT_CATALOG_CACHE_TTL = 300          # segundos
+DEFAULT_CATALOG_CACHE_MAX_ENTRIES = 20000
+DEFAULT_ROW_COUNT_CACHE_TTL = 3600       # segundos
+DEFAULT_ROW_COUNT_JOB_TIMEOUT = 900      # segundos que se conserva el estado de un conteo en el nivel 2
+
+# Versión fija de las claves de conteos exactos (sobreviven a invalidar())
+_VERSION_CONTEOS = 'conteos'
+
+_entradas = OrderedDict()  # clave -> (vence, valor)
+_versiones = {}            # id de conexión -> versión (sin nivel 2)
+_conteos = {}              # clave de conteo -> {'status', 'error'} de los conteos de este proceso
+_lock = threading.Lock()
+
+
+def _cache_compartida():
+    """Caché de Django de nivel 2, o None si no está configurada"""
+    alias = getattr(settings, 'CATALOG_CACHE_ALIAS', None)
+    if not alias:
+        return None
+    from django.core.cache import caches
+    return caches[alias]
+
+
+def ttl_conexion(connection):
+    """TTL en segundos para la conexión (0 desactiva la caché)"""
+    if connection.catalog_cache_ttl is not None:
+        return connection.catalog_cache_ttl
+    return getattr(settings, 'CATALOG_CACHE_TTL', DEFAULT_CATALOG_CACHE_TTL)
+
+
+def _clave_version(connection_id):
+    return f'catalogo:{connection_id}:version'
+
+
+def _version(connection_id):
+    compartida = _cache_compartida()
+    if compartida is not None:
+        return compartida.get(_clave_version(connection_id), 0)
+    with _lock:
+        return _versiones.get(connection_id, 0)
+
+
+def _clave(connection, tipo, *partes, version=None):
+    """Clave de una entrada; incluye la versión y el servidor/usuario de la conexión"""
+    if version is None:
+        version = _version(connection.pk)
+    huella = hashlib.sha1(
+        '\x1f'.join([connection.server, str(connection.port), connection.username, *partes]).encode('utf-8')
+    ).hexdigest()
+    return f'catalogo:{connection.pk}:{version}:{tipo}:{huella}'
+
+
+def _leer(clave):
+    ahora = time.monotonic()
+    with _lock:
+        entrada = _entradas.get(clave)
+        if entrada is not None:
+            if entrada[0] > ahora:
+                _entradas.move_to_end(clave)
+                return entrada[1]
+            del _entradas[clave]
+
+    compartida = _cache_compartida()
+    if compartida is not None:
+        return compartida.get(clave)
+    return None
+
+
+def _guardar(entradas, ttl):
+    """
+    Args:
+        entradas: dict {clave: valor}
+    """
+    maximo = getattr(settings, 'CATALOG_CACHE_MAX_ENTRIES', DEFAULT_CATALOG_CACHE_MAX_ENTRIES)
+    vence = time.monotonic() + ttl
+    with _lock:
+        for clave, valor in entradas.items():
+            _entradas[clave] = (vence, valor)
+            _entradas.move_to_end(clave)
+        while len(_entradas) > maximo:
+            _entradas.popitem(last=False)
+
+    compartida = _cache_compartida()
+    if compartida is not None:
+        try:
+            compartida.set_many(entradas, timeout=ttl)
+        except Exception as e:
+            logger.warning(f"No se pudo escribir en la caché compartida de catálogo: {str(e)}")
+
+
+def _obtener(connection, clave, cargar, refrescar=False):
+    """
+    Devuelve el valor cacheado o lo carga con cargar(). Los resultados vacíos no
+    se guardan: el conector devuelve [] también cuando falla la conexión.
+    """
+    ttl = ttl_conexion(connection)
+    if ttl > 0 and not refrescar:
+        valor = _leer(clave)
+        consulta_cache('catalogo', valor is not None)
+        if valor is not None:
+            return valor
+
+    valor = cargar()
+    if ttl > 0 and valor:
+        _guardar({clave: valor}, ttl)
+    return valor
+
+
+def _conector(connection, database=None):
+    from .utils import SQLServerConnector
+    return SQLServerConnector(
+        connection.server,
+        connection.username,
+        connection.password,
+        connection.port,
+        database=database,
+    )
+
+
+def obtener_bases_datos(connection, refrescar=False):
+    """
+    Returns:
+        list: Nombres de las bases de datos de usuario del servidor
+    """
+    return _obtener(
+        connection, _clave(connection, 'bases'),
+        lambda: _conector(connection).get_databases(), refrescar
+    )
+
+
+def obtener_tablas(connection, database=None, refrescar=False):
+    """
+    Returns:
+        list: Tablas de la base de datos (formato de SQLServerConnector.get_tables)
+    """
+    database = database or connection.selected_database
+    return _obtener(
+        connection, _clave(connection, 'tablas', database),
+        lambda: _conector(connection, database).get_tables(), refrescar
+    )
+
+
+def obtener_columnas(connection, schema, table, database=None, refrescar=False):
+    """
+    Returns:
+        list: Columnas de la tabla (formato de SQLServerConnector.get_table_columns)
+    """
+    database = database or connection.selected_database
+    return _obtener(
+        connection, _clave(connection, 'columnas', database, f'{schema}.{table}'),
+        lambda: _conector(connection, database).get_table_columns(schema, table), refrescar
+    )
+
+
+def invalidar(connection):
+    """Descarta el catálogo cacheado de la conexión (en todos los workers si hay nivel 2)"""
+    compartida = _cache_compartida()
+    if compartida is not None:
+        clave = _clave_version(connection.pk)
+        try:
+            compartida.incr(clave)
+        except ValueError:
+            compartida.set(clave, 1, timeout=None)
+    else:
+        with _lock:
+            _versiones[connection.pk] = _versiones.get(connection.pk, 0) + 1
+    logger.info(f"Catálogo de la conexión {connection.pk} invalidado")
+
+
+def precalentar(connection):
+    """
+    Carga en la caché las bases de datos, tablas y columnas de la conexión
+
+    Returns:
+        dict: Resumen con bases_datos, tablas, segundos y errores por base de datos
+    """
+    ttl = ttl_conexion(connection)
+    if ttl <= 0:
+        raise ValueError('La caché de catálogo está desactivada para esta conexión (TTL 0)')
+
+    inicio = time.perf_counter()
+    invalidar(connection)
+
+    bases = _conector(connection).get_databases()
+    if not bases:
+        raise ConnectionError(f"No se pudieron listar las bases de datos de {connection.server}")
+
+    version = _version(connection.pk)
+    entradas = {_clave(connection, 'bases', version=version): bases}
+    total_tablas = 0
+    errores = {}
+    for database in bases:
+        try:
+            tablas = _conector(connection, database).get_tables()
+            columnas = _conector(connection, database).get_all_columns()
+        except Exception as e:
+            errores[database] = str(e)
+            continue
+        if tablas:
+            entradas[_clave(connection, 'tablas', database, version=version)] = tablas
+        for nombre, columnas_tabla in columnas.items():
+            entradas[_clave(connection, 'columnas', database, nombre, version=version)] = columnas_tabla
+        total_tablas += len(tablas)
+
+    _guardar(entradas, ttl)
+    resumen = {
+        'bases_datos': len(bases),
+        'tablas': total_tablas,
+        'segundos': round(time.perf_counter() - inicio, 2),
+        'errores': errores,
+    }
+    logger.info(f"Catálogo de la conexión {connection.pk} precalentado: {resumen}")
+    return resumen
+
+
+def _clave_conteo(connection, schema, table, database=None):
+    database = database or connection.selected_database
+    return _clave(connection, 'conteo', database, f'{schema}.{table}', version=_VERSION_CONTEOS)
+
+
+def obtener_conteo_exacto(connection, schema, table, database=None):
+    """
+    Returns:
+        dict|None: {'count', 'counted_at'} del último conteo exacto vigente
+    """
+    return _leer(_clave_conteo(connection, schema, table, database))
+
+
+def _leer_trabajo(clave):
+    """Estado del conteo en curso: el de este proceso o, si no, el del nivel 2"""
+    with _lock:
+        trabajo = _conteos.get(clave)
+    if trabajo is not None:
+        return dict(trabajo)
+
+    compartida = _cache_compartida()
+    if compartida is not None:
+        try:
+            return compartida.get(f'{clave}:trabajo')
+        except Exception as e:
+            logger.warning(f"No se pudo leer el estado del conteo en la caché compartida: {str(e)}")
+    return None
+
+
+def _guardar_trabajo(clave, trabajo):
+    """Publica (o borra, con trabajo=None) el estado del conteo en este proceso y en el nivel 2"""
+    with _lock:
+        if trabajo is None:
+            _conteos.pop(clave, None)
+        else:
+            _conteos[clave] = trabajo
+
+    compartida = _cache_compartida()
+    if compartida is not None:
+        try:
+            if trabajo is None:
+                compartida.delete(f'{clave}:trabajo')
+            else:
+                timeout = getattr(settings, 'ROW_COUNT_JOB_TIMEOUT', DEFAULT_ROW_COUNT_JOB_TIMEOUT)
+                compartida.set(f'{clave}:trabajo', trabajo, timeout=timeout)
+        except Exception as e:
+            logger.warning(f"No se pudo escribir el estado del conteo en la caché compartida: {str(e)}")
+
+
+def estado_conteo_exacto(connection, schema, table, database=None):
+    """
+    Returns:
+        dict: status ('idle', 'running', 'done' o 'failed'), count, counted_at y error
+    """
+    clave = _clave_conteo(connection, schema, table, database)
+    conteo = _leer(clave)
+    if conteo is not None:
+        return {'status': 'done', 'count': conteo['count'], 'counted_at': conteo['counted_at'], 'error': None}
+    trabajo = _leer_trabajo(clave) or {'status': 'idle', 'error': None}
+    return {'status': trabajo['status'], 'count': None, 'counted_at': None, 'error': trabajo['error']}
+
+
+def iniciar_conteo_exacto(connection, schema, table, database=None):
+    """
+    Lanza en un hilo el COUNT_BIG(*) de una tabla, salvo que ya haya uno en curso
+    (en este proceso o, con nivel 2, en otro worker). Usa una conexión dedicada
+    para no ocupar un cupo del pool durante todo el recorrido.
+
+    Returns:
+        bool: True si se lanzó un conteo nuevo
+    """
+    from django.utils import timezone
+    from .utils import SQLServerConnector
+
+    database = database or connection.selected_database
+    clave = _clave_conteo(connection, schema, table, database)
+    if (_leer_trabajo(clave) or {}).get('status') == 'running':
+        return False
+    _guardar_trabajo(clave, {'status': 'running', 'error': None})
+
+    server, username, password, port = connection.server, connection.username, connection.password, connection.port
+    ttl = getattr(settings, 'ROW_COUNT_CACHE_TTL', DEFAULT_ROW_COUNT_CACHE_TTL)
+
+    def contar():
+        try:
+            conector = SQLServerConnector(server, username, password, port, database=database, use_pool=False)
+            inicio = time.perf_counter()
+            filas = conector.get_exact_row_count(schema, table)
+            _guardar({clave: {'count': filas, 'counted_at': timezone.now().isoformat()}}, ttl)
+            _guardar_trabajo(clave, None)
+            logger.info(f"Conteo exacto de {database}.{schema}.{table}: {filas} filas "
+                        f"en {time.perf_counter() - inicio:.1f} s")
+        except Exception as e:
+            logger.error(f"Error en el conteo exacto de {database}.{schema}.{table}: {str(e)}")
+            _guardar_trabajo(clave, {'status': 'failed', 'error': str(e)})
+
+    threading.Thread(target=contar, name=f'conteo-{schema}.{table}', daemon=True).start()
+    return True
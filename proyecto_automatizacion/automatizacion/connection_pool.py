@@ -0,0 +1,269 @@
+"""
+Pool de conexiones pyodbc compartido por todo el proceso
+
+Abrir una conexión a SQL Server cuesta varios viajes (TCP, TLS y login). Navegar
+las columnas de una tabla abría y cerraba varias conexiones por petición; con el
+pool cada combinación servidor/puerto/base de datos/usuario mantiene hasta
+max_size conexiones que se reutilizan entre peticiones y ejecuciones.
+
+- Tamaño máximo: checkout espera (hasta checkout_timeout) si todas están en uso.
+- Conexiones ociosas más de idle_timeout se cierran.
+- Las conexiones ociosas más de ping_after se verifican con SELECT 1 antes de
+  entregarlas; si el ping falla se descartan y se abre una nueva.
+- Al devolverlas se hace rollback para no arrastrar transacciones abiertas.
+- Estadísticas por pool: conexiones creadas/reutilizadas/descartadas y tiempos
+  de espera y de uso por checkout.
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from .metrics import observar_espera_conexion
+
+logger = logging.getLogger('connection_pool')
+
+DEFAULT_POOL_MAX_SIZE = 8
+DEFAULT_POOL_IDLE_TIMEOUT = 300      # segundos
+DEFAULT_POOL_PING_AFTER = 30         # segundos ociosa antes de verificarla
+DEFAULT_POOL_CHECKOUT_TIMEOUT = 30   # segundos esperando una conexión libre
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeoutError(Exception):
+    """No se liberó ninguna conexión del pool dentro del tiempo de espera"""
+    pass
+
+
+def _configuracion(nombre, defecto):
+    try:
+        from django.conf import settings
+        return getattr(settings, nombre, defecto)
+    except Exception:
+        return defecto
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones para una misma cadena de conexión
+    """
+
+    def __init__(self, factory, nombre, max_size=None, idle_timeout=None,
+                 ping_after=None, checkout_timeout=None):
+        """
+        Args:
+            factory: Callable sin argumentos que abre una conexión nueva
+            nombre: Nombre legible del pool (para logs y estadísticas; sin contraseña)
+        """
+        self.factory = factory
+        self.nombre = nombre
+        self.max_size = max_size or _configuracion('SQL_POOL_MAX_SIZE', DEFAULT_POOL_MAX_SIZE)
+        self.idle_timeout = idle_timeout or _configuracion('SQL_POOL_IDLE_TIMEOUT', DEFAULT_POOL_IDLE_TIMEOUT)
+        self.ping_after = ping_after if ping_after is not None else _configuracion('SQL_POOL_PING_AFTER', DEFAULT_POOL_PING_AFTER)
+        self.checkout_timeout = checkout_timeout or _configuracion('SQL_POOL_CHECKOUT_TIMEOUT', DEFAULT_POOL_CHECKOUT_TIMEOUT)
+
+        self._cupos = threading.BoundedSemaphore(self.max_size)
+        self._ociosas = deque()  # (conexión, momento en que se devolvió)
+        self._en_uso = {}        # id(conexión) -> momento del checkout
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'checkouts': 0,
+            'creadas': 0,
+            'reutilizadas': 0,
+            'descartadas': 0,
+            'expiradas': 0,
+            'timeouts': 0,
+            'espera_total_ms': 0.0,
+            'espera_max_ms': 0.0,
+            'uso_total_ms': 0.0,
+            'uso_max_ms': 0.0,
+        }
+
+    def _cerrar(self, conexion):
+        try:
+            conexion.close()
+        except Exception:
+            pass
+
+    def _expulsar_ociosas(self):
+        """Cierra las conexiones ociosas más de idle_timeout (llamar con el lock tomado)"""
+        limite = time.monotonic() - self.idle_timeout
+        while self._ociosas and self._ociosas[0][1] < limite:
+            conexion, _ = self._ociosas.popleft()
+            self._cerrar(conexion)
+            self.stats['expiradas'] += 1
+
+    def _viva(self, conexion):
+        """Ping de liveness"""
+        try:
+            cursor = conexion.cursor()
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def checkout(self):
+        """
+        Entrega una conexión del pool (reutilizada o nueva)
+
+        Raises:
+            PoolTimeoutError: Si no hay cupo libre dentro de checkout_timeout
+        """
+        inicio = time.perf_counter()
+        if not self._cupos.acquire(timeout=self.checkout_timeout):
+            with self._lock:
+                self.stats['timeouts'] += 1
+            raise PoolTimeoutError(
+                f"Pool '{self.nombre}': sin conexiones libres tras {self.checkout_timeout}s ({self.max_size} en uso)"
+            )
+
+        try:
+            conexion = None
+            while conexion is None:
+                with self._lock:
+                    self._expulsar_ociosas()
+                    candidata = self._ociosas.pop() if self._ociosas else None
+                if candidata is None:
+                    conexion = self.factory()
+                    with self._lock:
+                        self.stats['creadas'] += 1
+                    break
+                conexion, devuelta = candidata
+                if time.monotonic() - devuelta > self.ping_after and not self._viva(conexion):
+                    self._cerrar(conexion)
+                    conexion = None
+                    with self._lock:
+                        self.stats['descartadas'] += 1
+                    continue
+                with self._lock:
+                    self.stats['reutilizadas'] += 1
+        except Exception:
+            self._cupos.release()
+            raise
+
+        espera_ms = (time.perf_counter() - inicio) * 1000
+        observar_espera_conexion(espera_ms / 1000)
+        with self._lock:
+            self._en_uso[id(conexion)] = time.perf_counter()
+            self.stats['checkouts'] += 1
+            self.stats['espera_total_ms'] += espera_ms
+            self.stats['espera_max_ms'] = max(self.stats['espera_max_ms'], espera_ms)
+        return conexion
+
+    def checkin(self, conexion, descartar=False):
+        """
+        Devuelve una conexión al pool
+
+        Args:
+            descartar: Cerrarla en lugar de reutilizarla (p. ej. tras un error de red)
+        """
+        with self._lock:
+            inicio_uso = self._en_uso.pop(id(conexion), None)
+        if inicio_uso is None:
+            # No salió de este pool (o ya se devolvió): solo cerrarla
+            self._cerrar(conexion)
+            return
+
+        uso_ms = (time.perf_counter() - inicio_uso) * 1000
+
+        if not descartar:
+            try:
+                conexion.rollback()
+            except Exception:
+                descartar = True
+
+        with self._lock:
+            self.stats['uso_total_ms'] += uso_ms
+            self.stats['uso_max_ms'] = max(self.stats['uso_max_ms'], uso_ms)
+            if descartar:
+                self.stats['descartadas'] += 1
+            else:
+                self._ociosas.append((conexion, time.monotonic()))
+                self._expulsar_ociosas()
+        if descartar:
+            self._cerrar(conexion)
+        self._cupos.release()
+
+    @contextmanager
+    def conexion(self):
+        """Context manager: checkout al entrar y checkin al salir (descarta si hubo error de conexión)"""
+        conexion = self.checkout()
+        descartar = False
+        try:
+            yield conexion
+        except Exception as e:
+            descartar = not self._viva(conexion)
+            raise e
+        finally:
+            self.checkin(conexion, descartar=descartar)
+
+    def cerrar(self):
+        """Cierra las conexiones ociosas (las que están en uso se cierran al devolverse)"""
+        with self._lock:
+            ociosas = list(self._ociosas)
+            self._ociosas.clear()
+        for conexion, _ in ociosas:
+            self._cerrar(conexion)
+
+    def estadisticas(self):
+        """
+        Returns:
+            dict: Contadores y tiempos del pool (promedios por checkout)
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update({
+                'nombre': self.nombre,
+                'max_size': self.max_size,
+                'ociosas': len(self._ociosas),
+                'en_uso': len(self._en_uso),
+            })
+        checkouts = stats['checkouts'] or 1
+        stats['espera_promedio_ms'] = round(stats['espera_total_ms'] / checkouts, 2)
+        stats['uso_promedio_ms'] = round(stats['uso_total_ms'] / checkouts, 2)
+        return stats
+
+
+def obtener_pool(server, port, database, username, password, factory, max_size=None):
+    """
+    Pool del proceso para server/port/database/username. La contraseña forma parte
+    de la clave (como hash) para que un cambio de credenciales no reutilice
+    conexiones abiertas con las anteriores.
+
+    Args:
+        factory: Callable sin argumentos que abre una conexión nueva
+        max_size: Tamaño del pool si se crea ahora (por defecto SQL_POOL_MAX_SIZE)
+    """
+    huella = hashlib.sha256((password or '').encode('utf-8')).hexdigest()[:16]
+    clave = (server, str(port), database or '', username, huella)
+    with _pools_lock:
+        pool = _pools.get(clave)
+        if pool is None:
+            nombre = f"{username}@{server},{port}/{database or '(servidor)'}"
+            pool = ConnectionPool(factory, nombre, max_size=max_size)
+            _pools[clave] = pool
+            logger.info(f"Pool de conexiones creado: {nombre}")
+        return pool
+
+
+def estadisticas_pools():
+    """Estadísticas de todos los pools del proceso"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.estadisticas() for pool in pools]
+
+
+def cerrar_pools():
+    """Cierra las conexiones ociosas de todos los pools"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.cerrar()
@@ -0,0 +1,254 @@
+"""
+Parseo de CSV grandes en paralelo por rangos de bytes
+
+El archivo se divide en rangos de bytes alineados con el inicio de un registro y
+cada rango se parsea en un proceso del pool. Los bloques tipados vuelven en forma
+columnar (ver excel_parallel) y se entregan al cargador en el orden del archivo.
+Los tipos de columna se infieren una vez con las primeras filas del archivo y se
+pasan a cada trabajador (dtype=), para que todos los rangos lleguen con los
+mismos tipos que la tabla destino creada con el primero.
+
+Alinear un rango no basta con buscar el siguiente salto de línea: un campo entre
+comillas puede contener saltos de línea. En el inicio de un registro el número
+de comillas leídas desde el principio del archivo siempre es par (las comillas
+escapadas "" suman dos), así que para cada corte se cuenta la paridad de
+comillas desde el límite anterior (bytes.count, a velocidad de C) y se avanza
+hasta el primer salto de línea con paridad par.
+"""
+
+import io
+import os
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger('csv_parallel')
+
+# Tamaño objetivo de cada rango parseado por un proceso
+CSV_RANGE_BYTES = 64 * 1024 * 1024
+
+# Archivos desde este tamaño se parsean en paralelo
+DEFAULT_CSV_PARALLEL_MIN_BYTES = 256 * 1024 * 1024
+
+# Bloque de lectura al contar comillas
+_LECTURA_BYTES = 16 * 1024 * 1024
+
+
+def usar_parseo_paralelo(ruta, tamano=None):
+    """
+    Indica si el archivo (o los `tamano` bytes que se van a leer) es lo bastante
+    grande para parsearlo en paralelo
+    """
+    from django.conf import settings
+    minimo = getattr(settings, 'CSV_PARALLEL_MIN_BYTES', DEFAULT_CSV_PARALLEL_MIN_BYTES)
+    if tamano is None:
+        tamano = os.path.getsize(ruta)
+    return tamano >= minimo and workers_configurados() > 1
+
+
+def workers_configurados():
+    """Procesos del pool (settings.CSV_PARALLEL_WORKERS, por defecto los núcleos)"""
+    from django.conf import settings
+    return getattr(settings, 'CSV_PARALLEL_WORKERS', None) or os.cpu_count() or 1
+
+
+def _fin_de_registro(archivo, posicion, paridad):
+    """
+    Busca el final del registro que contiene `posicion`
+
+    Args:
+        archivo: Archivo abierto en modo binario
+        posicion: Offset desde el que se busca
+        paridad: Paridad (0/1) de las comillas leídas desde el último inicio de registro
+
+    Returns:
+        int: Offset del byte siguiente al salto de línea que cierra el registro
+             (o el tamaño del archivo si no hay más saltos de línea)
+    """
+    archivo.seek(posicion)
+    while True:
+        bloque = archivo.read(_LECTURA_BYTES)
+        if not bloque:
+            return posicion
+        actual = 0
+        while True:
+            salto = bloque.find(b'\n', actual)
+            if salto < 0:
+                paridad ^= bloque.count(b'"', actual) & 1
+                break
+            paridad ^= bloque.count(b'"', actual, salto) & 1
+            if paridad == 0:
+                return posicion + salto + 1
+            actual = salto + 1
+        posicion += len(bloque)
+
+
+def _paridad_comillas(archivo, inicio, fin):
+    """Paridad de las comillas en [inicio, fin)"""
+    archivo.seek(inicio)
+    paridad = 0
+    restante = fin - inicio
+    while restante > 0:
+        bloque = archivo.read(min(_LECTURA_BYTES, restante))
+        if not bloque:
+            break
+        paridad ^= bloque.count(b'"') & 1
+        restante -= len(bloque)
+    return paridad
+
+
+def fin_encabezado(ruta):
+    """Offset del primer byte después de la fila de encabezado"""
+    with open(ruta, 'rb') as archivo:
+        return _fin_de_registro(archivo, 0, 0)
+
+
+def fin_ultimo_registro(ruta, inicio):
+    """
+    Offset del final del último registro completo a partir de `inicio` (un inicio
+    de registro). Un registro a medio escribir al final del archivo queda fuera.
+
+    Returns:
+        int: Offset del byte siguiente al último salto de línea con paridad par
+             (inicio si no hay registros completos)
+    """
+    fin = inicio
+    paridad = 0
+    posicion = inicio
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(inicio)
+        while True:
+            bloque = archivo.read(_LECTURA_BYTES)
+            if not bloque:
+                return fin
+            actual = 0
+            while True:
+                salto = bloque.find(b'\n', actual)
+                if salto < 0:
+                    paridad ^= bloque.count(b'"', actual) & 1
+                    break
+                paridad ^= bloque.count(b'"', actual, salto) & 1
+                if paridad == 0:
+                    fin = posicion + salto + 1
+                actual = salto + 1
+            posicion += len(bloque)
+
+
+def calcular_rangos(ruta, tamano_rango=CSV_RANGE_BYTES, inicio=None, fin=None):
+    """
+    Divide el archivo (sin el encabezado) en rangos alineados con inicios de registro
+
+    Es un generador: los rangos se pueden enviar al pool mientras se calculan
+    los siguientes.
+
+    Args:
+        inicio: Offset de un inicio de registro (por defecto, tras el encabezado)
+        fin: Offset de un final de registro (por defecto, el final del archivo)
+
+    Yields:
+        Tuple[int, int]: (inicio, fin) en bytes, fin exclusivo
+    """
+    tamano = os.path.getsize(ruta) if fin is None else fin
+    with open(ruta, 'rb') as archivo:
+        if inicio is None:
+            inicio = _fin_de_registro(archivo, 0, 0)
+        while inicio < tamano:
+            objetivo = inicio + tamano_rango
+            if objetivo >= tamano:
+                yield inicio, tamano
+                return
+            corte = _fin_de_registro(archivo, objetivo, _paridad_comillas(archivo, inicio, objetivo))
+            yield inicio, min(corte, tamano)
+            inicio = corte
+
+
+def _parsear_rango(ruta, inicio, fin, nombres, columnas, tipos=None):
+    """
+    Parsea un rango de bytes en el proceso trabajador y lo devuelve en forma columnar
+
+    Args:
+        tipos: (dtype, parse_dates) de csv_stream.tipos_fijos, iguales para todos los rangos
+    """
+    import pandas as pd
+    from .excel_parallel import dataframe_a_columnas
+
+    dtype, fechas = tipos or ({}, [])
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(inicio)
+        datos = archivo.read(fin - inicio)
+
+    try:
+        df = pd.read_csv(
+            io.BytesIO(datos), header=None, names=nombres, usecols=columnas or None,
+            dtype=dtype or None, parse_dates=fechas or None
+        )
+    except pd.errors.EmptyDataError:
+        df = pd.DataFrame(columns=nombres).astype(dtype)
+    except (ValueError, TypeError) as e:
+        raise ValueError(
+            f"CSV '{ruta}': el rango de bytes {inicio}-{fin} no encaja en los tipos de columna inferidos ({str(e)})"
+        ) from e
+    if columnas:
+        df = df[columnas]
+    return dataframe_a_columnas(df)
+
+
+def iterar_bloques_paralelo(ruta, columnas=None, workers=None, tamano_rango=CSV_RANGE_BYTES, inicio=None, fin=None):
+    """
+    Parsea un CSV por rangos de bytes en un pool de procesos
+
+    Como mucho 2 × workers rangos están en vuelo a la vez, así que la memoria
+    queda acotada aunque el cargador sea más lento que el parseo. Con un solo
+    worker los rangos se parsean en el propio proceso. Siempre se entrega al
+    menos un bloque (vacío si no hay filas).
+
+    Args:
+        ruta: Ruta del archivo CSV
+        columnas: Lista opcional de columnas a leer
+        workers: Número de procesos (por defecto workers_configurados())
+        tamano_rango: Bytes objetivo por rango
+        inicio, fin: Parte del archivo a leer (ver calcular_rangos); el encabezado
+            se lee siempre del principio del archivo
+
+    Yields:
+        DataFrame: Bloques en el orden del archivo
+    """
+    import pandas as pd
+    from .excel_parallel import columnas_a_dataframe
+    from .csv_stream import inferir_tipos
+
+    with open(ruta, 'rb') as archivo:
+        encabezado = archivo.read(fin_encabezado(ruta))
+    nombres = list(pd.read_csv(io.BytesIO(encabezado), nrows=0).columns)
+    # Una sola inferencia para todos los rangos (también en modo 'tail': los tipos
+    # salen del principio del archivo, los mismos de la carga inicial)
+    tipos = inferir_tipos(ruta, columnas)
+    rangos = calcular_rangos(ruta, tamano_rango, inicio, fin)
+
+    workers = max(1, int(workers or workers_configurados()))
+    entregados = 0
+
+    if workers == 1:
+        for inicio_rango, fin_rango in rangos:
+            entregados += 1
+            yield columnas_a_dataframe(_parsear_rango(ruta, inicio_rango, fin_rango, nombres, columnas, tipos))
+    else:
+        logger.info(f"Parseando CSV '{ruta}' por rangos de {tamano_rango} bytes con {workers} procesos")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pendientes = deque()
+            try:
+                for inicio_rango, fin_rango in rangos:
+                    pendientes.append(pool.submit(_parsear_rango, ruta, inicio_rango, fin_rango, nombres, columnas, tipos))
+                    if len(pendientes) >= 2 * workers:
+                        entregados += 1
+                        yield columnas_a_dataframe(pendientes.popleft().result())
+                while pendientes:
+                    entregados += 1
+                    yield columnas_a_dataframe(pendientes.popleft().result())
+            finally:
+                for futuro in pendientes:
+                    futuro.cancel()
+
+    if not entregados:
+        yield pd.DataFrame(columns=columnas or nombres)
+    logger.info(f"CSV '{ruta}' parseado en {entregados} rangos")
@@ -0,0 +1,174 @@
+"""
+Lectura de archivos CSV por bloques
+
+Los CSV exportados de otros sistemas pueden pesar varios GB; leerlos completos
+con pd.read_csv y convertirlos a diccionarios multiplica la memoria. Aquí el
+archivo se recorre en bloques de tamaño fijo que se entregan como DataFrames al
+escritor masivo, de modo que la memoria queda acotada por el bloque.
+
+Con pyarrow instalado se usa su lector en streaming (pyarrow.csv.open_csv), que
+parsea cada bloque con varios hilos; pd.read_csv(engine='pyarrow') no admite
+chunksize. Sin pyarrow se usa el motor C de pandas con chunksize.
+
+Los tipos de columna se fijan una vez para todo el archivo (pyarrow con su primer
+bloque, pandas con tipos_fijos sobre las primeras filas): la tabla destino se crea
+con el primer bloque y los siguientes no pueden cambiar el tipo de una columna.
+"""
+
+import logging
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+logger = logging.getLogger('csv_stream')
+
+# Filas por bloque entregado al escritor (motor C de pandas)
+CSV_CHUNK_ROWS = 100000
+
+# Bytes por bloque del lector pyarrow (cada bloque se parsea con varios hilos)
+CSV_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+def motor_disponible():
+    """Motor de parseo que se usará: 'pyarrow' si está instalado, si no 'c'"""
+    return 'pyarrow' if pa_csv is not None else 'c'
+
+
+def tipos_fijos(df):
+    """
+    Tipos de las columnas de un bloque como argumentos de pd.read_csv, para leer
+    el resto del archivo con esos tipos en lugar de inferirlos en cada bloque
+
+    Los enteros pasan a Int64 y los booleanos a boolean (admiten vacíos en
+    bloques posteriores); las columnas sin ningún valor en la muestra se leen
+    como texto; las fechas se piden con parse_dates.
+
+    Returns:
+        Tuple[dict, list]: (dtype, parse_dates)
+    """
+    dtype = {}
+    fechas = []
+    for columna in df.columns:
+        tipo = df[columna].dtype
+        if df[columna].isna().all():
+            dtype[columna] = 'object'
+        elif pd.api.types.is_bool_dtype(tipo):
+            dtype[columna] = 'boolean'
+        elif pd.api.types.is_integer_dtype(tipo):
+            dtype[columna] = 'Int64'
+        elif pd.api.types.is_float_dtype(tipo):
+            dtype[columna] = 'float64'
+        elif pd.api.types.is_datetime64_any_dtype(tipo):
+            fechas.append(columna)
+        else:
+            dtype[columna] = 'object'
+    return dtype, fechas
+
+
+def inferir_tipos(ruta, columnas=None, filas=CSV_CHUNK_ROWS):
+    """tipos_fijos de las primeras `filas` filas del archivo"""
+    return tipos_fijos(pd.read_csv(ruta, nrows=filas, usecols=columnas or None))
+
+
+def _bloques_pandas(ruta, columnas, tamano_bloque, filas_omitidas=0, tipos=None):
+    """
+    Bloques con el motor C de pandas y los tipos fijados en `tipos` (por defecto
+    inferir_tipos). Las primeras filas_omitidas filas se parsean y descartan
+    (skiprows cuenta líneas físicas y fallaría con saltos de línea dentro de
+    campos entre comillas).
+    """
+    dtype, fechas = tipos or inferir_tipos(ruta, columnas, tamano_bloque)
+    with pd.read_csv(ruta, chunksize=tamano_bloque, usecols=columnas or None,
+                     dtype=dtype, parse_dates=fechas or None) as lector:
+        while True:
+            try:
+                bloque = next(lector)
+            except StopIteration:
+                break
+            except (ValueError, TypeError) as e:
+                raise ValueError(
+                    f"CSV '{ruta}': un bloque no encaja en los tipos de columna del primero ({str(e)})"
+                ) from e
+            if filas_omitidas:
+                descartar = min(filas_omitidas, len(bloque))
+                bloque = bloque.iloc[descartar:]
+                filas_omitidas -= descartar
+                if bloque.empty:
+                    continue
+            # usecols conserva el orden del archivo; se respeta el orden pedido
+            yield bloque[columnas] if columnas else bloque
+
+
+def _bloques_pyarrow(ruta, columnas, tamano_bloque):
+    """
+    Yields:
+        Tuple[DataFrame, int]: (bloque, filas entregadas hasta ahora incluido el bloque)
+    """
+    lector = pa_csv.open_csv(
+        ruta,
+        read_options=pa_csv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_BYTES),
+        convert_options=pa_csv.ConvertOptions(include_columns=columnas or None),
+    )
+    entregadas = 0
+    for lote in lector:
+        # Dividir lotes grandes para respetar el tamaño de bloque del escritor
+        for inicio in range(0, lote.num_rows, tamano_bloque):
+            parte = lote.slice(inicio, tamano_bloque)
+            entregadas += parte.num_rows
+            yield parte.to_pandas(), entregadas
+
+
+def iterar_bloques_csv(ruta, columnas=None, tamano_bloque=CSV_CHUNK_ROWS):
+    """
+    Recorre un CSV y entrega DataFrames de hasta tamano_bloque filas
+
+    El lector de pyarrow infiere los tipos con el primer bloque; si un bloque
+    posterior no encaja en esos tipos (p. ej. texto en una columna numérica) la
+    lectura continúa con el motor C de pandas desde la fila siguiente a la última
+    entregada, sin repetir ni perder filas, con los tipos del primer bloque: si
+    tampoco así encaja, se lanza ValueError. Siempre se entrega al menos un bloque
+    (vacío si el archivo no tiene filas) para que el consumidor conozca las columnas.
+
+    Args:
+        ruta: Ruta del archivo CSV
+        columnas: Lista opcional de columnas a leer (en el orden del archivo)
+        tamano_bloque: Filas por bloque
+
+    Yields:
+        DataFrame: Bloque de filas
+    """
+    entregadas = 0
+    bloques = 0
+    tipos = None
+
+    if pa_csv is not None:
+        try:
+            for bloque, entregadas in _bloques_pyarrow(ruta, columnas, tamano_bloque):
+                if not bloques:
+                    tipos = tipos_fijos(bloque)
+                bloques += 1
+                yield bloque
+        except pa.ArrowInvalid as e:
+            logger.warning(f"CSV '{ruta}': pyarrow no pudo convertir un bloque tras {entregadas} filas "
+                           f"({str(e)}); se continúa con el motor C de pandas")
+        else:
+            if not bloques:
+                yield pd.DataFrame(columns=columnas or pd.read_csv(ruta, nrows=0).columns)
+            logger.info(f"CSV '{ruta}' leído con pyarrow: {entregadas} filas en {bloques} bloques")
+            return
+
+    for bloque in _bloques_pandas(ruta, columnas, tamano_bloque, entregadas, tipos):
+        bloques += 1
+        entregadas += len(bloque)
+        yield bloque
+
+    if not bloques:
+        vacio = pd.read_csv(ruta, nrows=0, usecols=columnas or None)
+        yield vacio[columnas] if columnas else vacio
+    logger.info(f"CSV '{ruta}' leído por bloques: {entregadas} filas en {bloques} bloques")
@@ -0,0 +1,88 @@
+"""
+Checkpoints para la ingesta incremental de CSV que solo crecen (logs)
+
+Tras cada carga se guarda en MigrationProcess.last_checkpoint el offset en bytes
+del final del último registro cargado, las filas acumuladas y una huella del
+prefijo ya cargado. La siguiente ejecución verifica la huella y, si el prefijo
+no cambió, lee solo los bytes a partir del offset.
+
+Calcular el hash del prefijo completo obligaría a releer todo el archivo en
+cada ejecución (lo que se quiere evitar), así que la huella es un SHA-256 de
+ventanas del prefijo: el inicio (incluye el encabezado), el final (los últimos
+registros cargados) y varias ventanas equiespaciadas, junto con el offset. Un
+archivo reescrito, truncado o rotado cambia alguna de esas ventanas.
+"""
+
+import os
+import hashlib
+
+from django.utils import timezone
+
+# Clave dentro de last_checkpoint
+CLAVE_CHECKPOINT = 'csv_tail'
+
+# Bytes por ventana de la huella y número de ventanas intermedias
+VENTANA_BYTES = 64 * 1024
+VENTANAS_INTERMEDIAS = 8
+
+
+def huella_prefijo(ruta, offset):
+    """
+    SHA-256 de ventanas de los primeros `offset` bytes del archivo
+
+    Returns:
+        str: Huella en hexadecimal
+    """
+    digest = hashlib.sha256(str(offset).encode('ascii'))
+    if offset <= 0:
+        return digest.hexdigest()
+
+    inicios = {0, max(offset - VENTANA_BYTES, 0)}
+    paso = offset // (VENTANAS_INTERMEDIAS + 1)
+    if paso > VENTANA_BYTES:
+        inicios.update(paso * i for i in range(1, VENTANAS_INTERMEDIAS + 1))
+
+    with open(ruta, 'rb') as archivo:
+        for inicio in sorted(inicios):
+            archivo.seek(inicio)
+            digest.update(archivo.read(min(VENTANA_BYTES, offset - inicio)))
+    return digest.hexdigest()
+
+
+def crear_checkpoint(ruta, offset, filas):
+    """
+    Args:
+        ruta: Archivo CSV
+        offset: Final (en bytes) del último registro cargado
+        filas: Filas cargadas en total hasta ese offset
+
+    Returns:
+        dict: Checkpoint serializable para last_checkpoint
+    """
+    return {
+        'offset': offset,
+        'filas': filas,
+        'huella_prefijo': huella_prefijo(ruta, offset),
+        'archivo': os.path.basename(ruta),
+        'fecha': timezone.now().isoformat(),
+    }
+
+
+def verificar_checkpoint(ruta, checkpoint):
+    """
+    Indica si el archivo conserva intacto el prefijo cargado según el checkpoint
+
+    Returns:
+        Tuple[bool, str]: (válido, motivo si no lo es)
+    """
+    if not checkpoint or 'offset' not in checkpoint:
+        return False, 'sin checkpoint previo'
+
+    tamano = os.path.getsize(ruta)
+    if tamano < checkpoint['offset']:
+        return False, f"el archivo ({tamano} bytes) es más corto que el checkpoint ({checkpoint['offset']} bytes)"
+
+    if huella_prefijo(ruta, checkpoint['offset']) != checkpoint.get('huella_prefijo'):
+        return False, 'el contenido ya cargado cambió (archivo reescrito o rotado)'
+
+    return True, ''
@@ -50,28 +50,29 @@ class DataTransferService:
     def get_secure_connection(self, database_alias='destino'):
         """
         Context manager para conexiones seguras con manejo automático de recursos
+        
+        La conexión de Django es compartida por el hilo: no se cierra al salir (cada
+        lote volvería a pagar el login); solo se descarta si quedó inutilizable tras
+        un error. Django la cierra al final de la petición según CONN_MAX_AGE.
         """
         connection = None
         try:
             connection = connections[database_alias]
-            # Verificar que la conexión esté activa
-            if connection.connection is None:
-                connection.connect()
+            # Verificar que la conexión esté activa (la abre si hace falta)
+            connection.ensure_connection()
             
-            logger.info(f"Conexión establecida exitosamente a base de datos '{database_alias}'")
+            logger.debug(f"Conexión lista a base de datos '{database_alias}'")
             yield connection
             
         except Exception as e:
             logger.error(f"Error estableciendo conexión a '{database_alias}': {str(e)}")
-            raise ConnectionError(f"No se pudo conectar a la base de datos: {str(e)}")
-        
-        finally:
-            if connection and connection.connection:
+            if connection is not None and connection.connection is not None and not connection.in_atomic_block:
                 try:
-                    connection.close()
-                    logger.debug("Conexión cerrada correctamente")
-                except Exception as e:
-                    logger.warning(f"Error cerrando conexión: {str(e)}")
+                    if not connection.is_usable():
+                        connection.close()
+                except Exception as error_cierre:
+                    logger.warning(f"Error cerrando conexión: {str(error_cierre)}")
+            raise ConnectionError(f"No se pudo conectar a la base de datos: {str(e)}")
 
     def validate_transfer_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -0,0 +1,433 @@
+"""
+Carga de tablas en la base de datos destino según la estrategia del proceso
+
+- replace: elimina la tabla destino, la recrea y carga sobre ella (comportamiento original)
+- staging_swap: carga en una tabla staging oculta, copia ahí los índices de la tabla
+  destino y la intercambia con ella mediante sp_rename (operación solo de metadatos).
+  Los lectores nunca ven una tabla ausente o a medio llenar y, si la carga falla,
+  la tabla destino anterior queda intacta.
+- merge: carga en una staging y aplica un único MERGE por las columnas clave del
+  proceso: inserta las filas nuevas, actualiza solo las que cambiaron y conserva la
+  tabla destino con sus índices y estadísticas.
+- append: usada por la extracción incremental. Las filas nuevas se cargan en una
+  staging y se agregan a la tabla destino con un único INSERT ... SELECT al final,
+  de modo que una carga fallida no deja filas parciales que se duplicarían al reintentar.
+"""
+
+import time
+import uuid
+import logging
+import datetime
+from decimal import Decimal
+
+from .bulk_writer import BulkWriter
+
+logger = logging.getLogger('destination_loader')
+
+LOAD_REPLACE = 'replace'
+LOAD_STAGING_SWAP = 'staging_swap'
+LOAD_APPEND = 'append'
+LOAD_MERGE = 'merge'
+
+# Estrategias que cargan primero en una tabla staging
+ESTRATEGIAS_CON_STAGING = (LOAD_STAGING_SWAP, LOAD_APPEND, LOAD_MERGE)
+
+
+def sql_type_from_description(column_description):
+    """
+    Determina el tipo SQL Server destino a partir de una entrada de cursor.description
+    de pyodbc: (name, type_code, display_size, internal_size, precision, scale, null_ok)
+    
+    Returns:
+        str: Tipo SQL (p. ej. 'INT', 'DECIMAL(18,2)', 'NVARCHAR(50)')
+    """
+    _, type_code, _, internal_size, precision, scale, _ = column_description
+
+    if type_code is bool:
+        return 'BIT'
+    if type_code is int:
+        return 'BIGINT' if (precision or 0) > 10 else 'INT'
+    if type_code is float:
+        return 'FLOAT'
+    if type_code is Decimal:
+        precision = min(int(precision or 18), 38)
+        scale = min(int(scale or 0), precision)
+        return f'DECIMAL({precision},{scale})'
+    if type_code is datetime.datetime:
+        return 'DATETIME2'
+    if type_code is datetime.date:
+        return 'DATE'
+    if type_code is datetime.time:
+        return 'TIME'
+    if type_code is uuid.UUID:
+        return 'UNIQUEIDENTIFIER'
+    if type_code in (bytes, bytearray):
+        if not internal_size or internal_size > 8000:
+            return 'VARBINARY(MAX)'
+        return f'VARBINARY({int(internal_size)})'
+    if not internal_size or internal_size > 4000:
+        return 'NVARCHAR(MAX)'
+    return f'NVARCHAR({int(internal_size)})'
+
+
+def build_create_table_sql_from_description(table_name, columns, description):
+    """
+    Genera CREATE TABLE para la tabla destino usando los tipos reportados por el
+    driver en la consulta origen, sin necesidad de leer los datos primero
+
+    Args:
+        table_name: Nombre de la tabla a crear
+        columns: Nombres de columnas destino (ya limpios), en el orden de description
+        description: cursor.description de la consulta origen
+    """
+    columns_definitions = [
+        f'[{col}] {sql_type_from_description(desc)} NULL'
+        for col, desc in zip(columns, description)
+    ]
+    return f"""
+        CREATE TABLE [{table_name}] (
+            {', '.join(columns_definitions)}
+        )
+        """
+
+
+class DestinationLoadError(Exception):
+    """Excepción para errores durante la carga de una tabla destino"""
+    pass
+
+
+class DestinationTableLoader:
+    """
+    Orquesta DDL, escritura masiva y publicación de una tabla destino
+    """
+
+    STAGING_SUFFIX = '__staging'
+    # Columna IDENTITY de la staging en merge: orden de inserción de las filas
+    ORDEN_STAGING = '__orden_staging'
+    OLD_SUFFIX = '__old'
+    QUARANTINE_SUFFIX = '_Cuarentena'
+
+    def __init__(self, conn, table_name, strategy=LOAD_REPLACE, proceso_id=None, key_columns=None):
+        """
+        Args:
+            conn: Conexión pyodbc abierta a la base de datos destino (autocommit desactivado)
+            table_name: Nombre final de la tabla destino
+            strategy: Estrategia de carga (LOAD_REPLACE, LOAD_STAGING_SWAP, LOAD_APPEND o LOAD_MERGE)
+            proceso_id: UUID del proceso para la cuarentena
+            key_columns: Columnas destino que identifican una fila (obligatorias en LOAD_MERGE)
+        """
+        if strategy not in (LOAD_REPLACE, LOAD_STAGING_SWAP, LOAD_APPEND, LOAD_MERGE):
+            raise DestinationLoadError(f"Estrategia de carga no soportada: {strategy}")
+        if strategy == LOAD_MERGE and not key_columns:
+            raise DestinationLoadError(f"La estrategia merge requiere columnas clave para '{table_name}'")
+
+        self.conn = conn
+        self.table_name = table_name
+        self.strategy = strategy
+        self.proceso_id = proceso_id
+        self.key_columns = list(key_columns or [])
+        self.columns = []
+        self.duracion_swap_ms = None
+        self.estadisticas_merge = None
+
+    @property
+    def tabla_trabajo(self):
+        """Tabla sobre la que se escriben los datos durante la carga"""
+        if self.strategy in ESTRATEGIAS_CON_STAGING:
+            return f"{self.table_name}{self.STAGING_SUFFIX}"
+        return self.table_name
+
+    @property
+    def tabla_cuarentena(self):
+        """Tabla de cuarentena asociada a la tabla final (no a la staging)"""
+        return f"{self.table_name}{self.QUARANTINE_SUFFIX}"
+
+    def preparar(self, create_table_sql):
+        """
+        Crea la tabla de trabajo y confirma el DDL. En merge agrega a la staging
+        la columna IDENTITY ORDEN_STAGING para conocer el orden de inserción.
+
+        Args:
+            create_table_sql: CREATE TABLE generado para self.tabla_trabajo
+        """
+        cursor = self.conn.cursor()
+        try:
+            tabla = self.tabla_trabajo
+            cursor.execute(f"IF OBJECT_ID('{tabla}', 'U') IS NOT NULL DROP TABLE [{tabla}]")
+            cursor.execute(create_table_sql)
+            if self.strategy == LOAD_MERGE:
+                cursor.execute(f"ALTER TABLE [{tabla}] ADD [{self.ORDEN_STAGING}] BIGINT IDENTITY(1, 1) NOT NULL")
+            self.conn.commit()
+        finally:
+            cursor.close()
+
+        if self.strategy in ESTRATEGIAS_CON_STAGING:
+            print(f"📋 Tabla staging '{self.tabla_trabajo}' creada; '{self.table_name}' sigue disponible para lectura")
+
+    def crear_writer(self, columns, **kwargs):
+        """
+        Returns:
+            BulkWriter: Escritor sobre la tabla de trabajo con aislamiento de errores
+        """
+        self.columns = list(columns)
+        kwargs.setdefault('isolate_errors', True)
+        kwargs.setdefault('quarantine_table', self.tabla_cuarentena)
+        kwargs.setdefault('proceso_id', self.proceso_id)
+        return BulkWriter(self.conn, self.tabla_trabajo, columns, **kwargs)
+
+    def copiar_indices(self):
+        """
+        Recrea sobre la tabla de trabajo los índices de la tabla destino actual
+
+        Se ejecuta antes del intercambio para que el costo de indexar no afecte
+        a los lectores y la tabla publicada conserve los índices de la anterior.
+        Los nombres de índice son locales a la tabla, por lo que no colisionan con
+        los de la tabla que se reemplaza. Se copian los índices agrupados y no
+        agrupados (columnas clave con su orden, INCLUDE y filtro); la clave
+        primaria y las restricciones UNIQUE se recrean como índices únicos porque
+        las columnas de la staging admiten NULL. Un índice que no puede crearse
+        (columna que ya no existe, NVARCHAR(MAX) como clave, duplicados) se omite
+        con una advertencia sin detener la carga.
+
+        Returns:
+            list: Nombres de los índices creados
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT i.index_id, i.name, i.type_desc, i.is_unique, i.filter_definition,
+                       c.name, ic.is_descending_key, ic.is_included_column
+                FROM sys.indexes i
+                JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+                JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+                WHERE i.object_id = OBJECT_ID(?) AND i.type IN (1, 2)
+                  AND i.is_hypothetical = 0 AND i.is_disabled = 0
+                ORDER BY i.index_id, ic.is_included_column, ic.key_ordinal, ic.index_column_id
+            """, self.table_name)
+            filas = cursor.fetchall()
+
+            indices = {}
+            for index_id, nombre, tipo, unico, filtro, columna, descendente, incluida in filas:
+                indice = indices.setdefault(index_id, {
+                    'nombre': nombre, 'tipo': tipo, 'unico': unico, 'filtro': filtro,
+                    'claves': [], 'incluidas': [],
+                })
+                if incluida:
+                    indice['incluidas'].append(f'[{columna}]')
+                else:
+                    indice['claves'].append(f'[{columna}] DESC' if descendente else f'[{columna}]')
+
+            creados = []
+            # Primero el agrupado (index_id 1): crearlo después reconstruiría los no agrupados
+            for indice in sorted(indices.values(), key=lambda i: i['tipo'] != 'CLUSTERED'):
+                sql = (f"CREATE {'UNIQUE ' if indice['unico'] else ''}{indice['tipo']} INDEX "
+                       f"[{indice['nombre']}] ON [{self.tabla_trabajo}] ({', '.join(indice['claves'])})")
+                if indice['incluidas']:
+                    sql += f" INCLUDE ({', '.join(indice['incluidas'])})"
+                if indice['filtro']:
+                    sql += f" WHERE {indice['filtro']}"
+                try:
+                    cursor.execute(sql)
+                    self.conn.commit()
+                    creados.append(indice['nombre'])
+                except Exception as e:
+                    self.conn.rollback()
+                    logger.warning(f"No se copió el índice '{indice['nombre']}' de '{self.table_name}': {str(e)}")
+                    print(f"⚠️ Índice '{indice['nombre']}' no copiado a la nueva '{self.table_name}': {str(e)}")
+            return creados
+        finally:
+            cursor.close()
+
+    def finalizar(self):
+        """
+        Publica la tabla cargada. En staging_swap intercambia staging y destino
+        en una sola transacción corta; en append agrega la staging a la destino;
+        en merge la combina por columnas clave; en replace solo confirma.
+        """
+        if self.strategy == LOAD_APPEND:
+            self._agregar_staging()
+            return
+        if self.strategy == LOAD_MERGE:
+            self._merge_staging()
+            return
+        if self.strategy != LOAD_STAGING_SWAP:
+            self.conn.commit()
+            return
+
+        indices = self.copiar_indices()
+        if indices:
+            print(f"🗂️ {len(indices)} índices de '{self.table_name}' recreados en la staging antes del intercambio")
+
+        tabla_old = f"{self.table_name}{self.OLD_SUFFIX}"
+        cursor = self.conn.cursor()
+        inicio = time.perf_counter()
+        try:
+            cursor.execute(f"IF OBJECT_ID('{tabla_old}', 'U') IS NOT NULL DROP TABLE [{tabla_old}]")
+            cursor.execute(f"""
+                IF OBJECT_ID('{self.table_name}', 'U') IS NOT NULL
+                    EXEC sp_rename '{self.table_name}', '{tabla_old}'
+            """)
+            cursor.execute(f"EXEC sp_rename '{self.tabla_trabajo}', '{self.table_name}'")
+            cursor.execute(f"IF OBJECT_ID('{tabla_old}', 'U') IS NOT NULL DROP TABLE [{tabla_old}]")
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            raise DestinationLoadError(f"Error intercambiando staging con '{self.table_name}': {str(e)}")
+        finally:
+            cursor.close()
+
+        self.duracion_swap_ms = round((time.perf_counter() - inicio) * 1000, 2)
+        logger.info(f"Intercambio atómico de '{self.table_name}' en {self.duracion_swap_ms} ms")
+        print(f"🔁 Tabla '{self.table_name}' publicada por intercambio atómico en {self.duracion_swap_ms} ms")
+
+    def _agregar_staging(self):
+        """
+        Agrega las filas de la staging a la tabla destino en una sola transacción.
+        Si la tabla destino no existe se crea con la estructura de la staging.
+        """
+        cursor = self.conn.cursor()
+        try:
+            if self.columns:
+                columnas_sql = ', '.join(f'[{col}]' for col in self.columns)
+                insertar = (f"INSERT INTO [{self.table_name}] ({columnas_sql}) "
+                            f"SELECT {columnas_sql} FROM [{self.tabla_trabajo}]")
+            else:
+                insertar = f"INSERT INTO [{self.table_name}] SELECT * FROM [{self.tabla_trabajo}]"
+
+            cursor.execute(f"""
+                IF OBJECT_ID('{self.table_name}', 'U') IS NULL
+                    SELECT * INTO [{self.table_name}] FROM [{self.tabla_trabajo}]
+                ELSE
+                    {insertar}
+            """)
+            filas = cursor.rowcount
+            cursor.execute(f"DROP TABLE [{self.tabla_trabajo}]")
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            raise DestinationLoadError(f"Error agregando filas nuevas a '{self.table_name}': {str(e)}")
+        finally:
+            cursor.close()
+
+        print(f"➕ {filas} filas nuevas agregadas a '{self.table_name}'")
+
+    def _merge_staging(self):
+        """
+        Combina la staging con la tabla destino en una sola sentencia MERGE.
+
+        Las filas de la staging con la misma clave se reducen a la última insertada
+        según ORDEN_STAGING (MERGE no admite que varias filas origen coincidan con la
+        misma fila destino); las descartadas se informan como 'duplicados'. Una fila que
+        coincide solo se actualiza si alguna columna cambió; la comparación con
+        EXCEPT trata NULL = NULL como igual.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"SELECT COUNT(*) FROM [{self.tabla_trabajo}]")
+            filas_staging = cursor.fetchone()[0]
+
+            cursor.execute(f"SELECT CASE WHEN OBJECT_ID('{self.table_name}', 'U') IS NULL THEN 0 ELSE 1 END")
+            destino_existe = bool(cursor.fetchone()[0])
+
+            if not destino_existe or not self.columns:
+                # Primera carga: la staging se convierte en la tabla destino
+                if not destino_existe:
+                    cursor.execute(f"ALTER TABLE [{self.tabla_trabajo}] DROP COLUMN [{self.ORDEN_STAGING}]")
+                    cursor.execute(f"EXEC sp_rename '{self.tabla_trabajo}', '{self.table_name}'")
+                    insertados = filas_staging
+                else:
+                    cursor.execute(f"DROP TABLE [{self.tabla_trabajo}]")
+                    insertados = 0
+                self.conn.commit()
+                self.estadisticas_merge = {
+                    'insertados': insertados,
+                    'actualizados': 0,
+                    'sin_cambios': 0,
+                    'duplicados': 0,
+                }
+                return
+
+            faltantes = [col for col in self.key_columns if col not in self.columns]
+            if faltantes:
+                raise DestinationLoadError(f"Columnas clave no presentes en la carga: {', '.join(faltantes)}")
+
+            no_clave = [col for col in self.columns if col not in self.key_columns]
+            columnas_sql = ', '.join(f'[{col}]' for col in self.columns)
+            claves_sql = ', '.join(f'[{col}]' for col in self.key_columns)
+            condicion = ' AND '.join(f't.[{col}] = s.[{col}]' for col in self.key_columns)
+
+            cursor.execute(f"SELECT COUNT(*) FROM (SELECT DISTINCT {claves_sql} FROM [{self.tabla_trabajo}]) AS d")
+            claves_distintas = cursor.fetchone()[0]
+
+            clausula_update = ''
+            if no_clave:
+                columnas_s = ', '.join(f's.[{col}]' for col in no_clave)
+                columnas_t = ', '.join(f't.[{col}]' for col in no_clave)
+                asignaciones = ', '.join(f't.[{col}] = s.[{col}]' for col in no_clave)
+                clausula_update = f"""
+                WHEN MATCHED AND EXISTS (SELECT {columnas_s} EXCEPT SELECT {columnas_t}) THEN
+                    UPDATE SET {asignaciones}"""
+
+            cursor.execute(f"""
+                SET NOCOUNT ON;
+                DECLARE @acciones TABLE (accion NVARCHAR(10));
+                MERGE [{self.table_name}] WITH (HOLDLOCK) AS t
+                USING (
+                    SELECT {columnas_sql} FROM (
+                        SELECT *, ROW_NUMBER() OVER (PARTITION BY {claves_sql} ORDER BY [{self.ORDEN_STAGING}] DESC) AS [__fila]
+                        FROM [{self.tabla_trabajo}]
+                    ) AS d WHERE d.[__fila] = 1
+                ) AS s
+                ON {condicion}{clausula_update}
+                WHEN NOT MATCHED BY TARGET THEN
+                    INSERT ({columnas_sql}) VALUES ({', '.join(f's.[{col}]' for col in self.columns)})
+                OUTPUT $action INTO @acciones;
+                SELECT
+                    SUM(CASE WHEN accion = 'INSERT' THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN accion = 'UPDATE' THEN 1 ELSE 0 END)
+                FROM @acciones;
+                SET NOCOUNT OFF;
+            """)
+            insertados, actualizados = cursor.fetchone()
+            insertados, actualizados = insertados or 0, actualizados or 0
+
+            cursor.execute(f"DROP TABLE [{self.tabla_trabajo}]")
+            self.conn.commit()
+        except DestinationLoadError:
+            self.conn.rollback()
+            raise
+        except Exception as e:
+            self.conn.rollback()
+            raise DestinationLoadError(f"Error combinando staging con '{self.table_name}': {str(e)}")
+        finally:
+            # Un error en el lote deja NOCOUNT activo en la conexión (el SET NOCOUNT OFF
+            # final no se ejecutó); DestinationSession.checkin también lo restablece
+            try:
+                cursor.execute("SET NOCOUNT OFF")
+            except Exception:
+                pass
+            cursor.close()
+
+        self.estadisticas_merge = {
+            'insertados': insertados,
+            'actualizados': actualizados,
+            'sin_cambios': max(claves_distintas - insertados - actualizados, 0),
+            'duplicados': filas_staging - claves_distintas,
+        }
+        print(f"🔀 MERGE en '{self.table_name}': {insertados} insertadas, {actualizados} actualizadas, "
+              f"{self.estadisticas_merge['sin_cambios']} sin cambios")
+        if self.estadisticas_merge['duplicados']:
+            print(f"⚠️ {self.estadisticas_merge['duplicados']} filas con clave repetida en la carga; "
+                  f"se aplicó la última de cada clave")
+
+    def abortar(self):
+        """Revierte la transacción abierta y descarta la staging; la tabla destino no se toca"""
+        try:
+            self.conn.rollback()
+            if self.strategy in ESTRATEGIAS_CON_STAGING:
+                cursor = self.conn.cursor()
+                cursor.execute(f"IF OBJECT_ID('{self.tabla_trabajo}', 'U') IS NOT NULL DROP TABLE [{self.tabla_trabajo}]")
+                self.conn.commit()
+                cursor.close()
+        except Exception as e:
+            logger.warning(f"No se pudo descartar la staging '{self.tabla_trabajo}': {str(e)}")
@@ -0,0 +1,153 @@
+"""
+Sesión de conexiones a la base de datos destino durante una ejecución
+
+Cada hoja o tabla de un proceso se guardaba con su propia conexión pyodbc
+(cadena de conexión, login y cierre por tabla). La sesión toma las conexiones
+de un pool de connection_pool con la configuración de settings.DATABASES['destino'],
+de modo que una ejecución de 200 tablas reutiliza las mismas conexiones ya
+autenticadas, y también las ejecuciones siguientes mientras sigan ociosas.
+
+Por cada checkout se registra la tabla, la espera, el tiempo de uso y si hubo que
+abrir una conexión nueva; resumen() los agrega para el resultado de la ejecución.
+"""
+
+import time
+import logging
+
+from .connection_pool import obtener_pool
+
+logger = logging.getLogger('destination_session')
+
+# Conexiones del pool del destino (las cargas de una ejecución son secuenciales)
+DEFAULT_DESTINATION_POOL_SIZE = 2
+
+
+def configuracion_destino():
+    """
+    Returns:
+        dict: server (con puerto si está configurado), database, username, password
+    """
+    from django.conf import settings
+
+    destino_config = settings.DATABASES['destino']
+    server = destino_config.get('HOST', 'localhost')
+    port = destino_config.get('PORT')
+    return {
+        'server': f"{server},{port}" if port else server,
+        'database': destino_config.get('NAME', 'DestinoAutomatizacion'),
+        'username': destino_config.get('USER', ''),
+        'password': destino_config.get('PASSWORD', ''),
+    }
+
+
+def cadena_conexion_destino():
+    """Cadena de conexión ODBC a la base de datos destino"""
+    config = configuracion_destino()
+    return (
+        f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+        f"SERVER={config['server']};"
+        f"DATABASE={config['database']};"
+        f"UID={config['username']};"
+        f"PWD={config['password']};"
+        f"TrustServerCertificate=yes;"
+    )
+
+
+def abrir_conexion_destino():
+    """Abre una conexión pyodbc directa al destino (autocommit desactivado)"""
+    import pyodbc
+    return pyodbc.connect(cadena_conexion_destino())
+
+
+def pool_destino():
+    """Pool del proceso para la base de datos destino"""
+    from django.conf import settings
+
+    config = configuracion_destino()
+    return obtener_pool(
+        config['server'], '', config['database'], config['username'], config['password'],
+        factory=abrir_conexion_destino,
+        max_size=getattr(settings, 'DESTINATION_POOL_SIZE', DEFAULT_DESTINATION_POOL_SIZE),
+    )
+
+
+class DestinationSession:
+    """
+    Conexiones al destino para una ejecución de MigrationProcess
+
+    Uso:
+        sesion = DestinationSession(nombre_proceso)
+        conn = sesion.checkout('Hoja1')
+        ...
+        sesion.checkin(conn)
+        sesion.resumen()
+    """
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.pool = pool_destino()
+        self.checkouts = []
+        self._en_uso = {}  # id(conexión) -> (conexión, métricas del checkout en curso)
+
+    def checkout(self, tabla=None):
+        """Conexión del pool para cargar `tabla`"""
+        creadas_antes = self.pool.stats['creadas']
+        inicio = time.perf_counter()
+        conn = self.pool.checkout()
+        metricas = {
+            'tabla': tabla,
+            'espera_ms': round((time.perf_counter() - inicio) * 1000, 2),
+            'nueva': self.pool.stats['creadas'] > creadas_antes,
+            '_inicio_uso': time.perf_counter(),
+        }
+        self._en_uso[id(conn)] = (conn, metricas)
+        return conn
+
+    def checkin(self, conn, descartar=False):
+        """
+        Devuelve la conexión al pool (se hace rollback de lo no confirmado)
+
+        Las opciones de sesión que cambian los cargadores (SET NOCOUNT ON del MERGE)
+        se restablecen antes de devolverla: si quedaran activas, el siguiente uso
+        de la conexión leería rowcount == -1. Si no se pueden restablecer, la
+        conexión se descarta.
+        """
+        _, metricas = self._en_uso.pop(id(conn), (None, None))
+        if not descartar:
+            try:
+                conn.rollback()
+                cursor = conn.cursor()
+                cursor.execute("SET NOCOUNT OFF")
+                cursor.close()
+            except Exception as e:
+                logger.warning(f"Sesión destino '{self.nombre}': no se pudo restablecer la conexión ({str(e)}); se descarta")
+                descartar = True
+        self.pool.checkin(conn, descartar=descartar)
+        if metricas is not None:
+            metricas['uso_ms'] = round((time.perf_counter() - metricas.pop('_inicio_uso')) * 1000, 2)
+            metricas['descartada'] = descartar
+            self.checkouts.append(metricas)
+
+    def cerrar(self):
+        """Descarta las conexiones que quedaron tomadas (p. ej. tras una excepción)"""
+        for conn, _ in list(self._en_uso.values()):
+            logger.warning(f"Sesión destino '{self.nombre}': conexión sin devolver al terminar la ejecución")
+            self.checkin(conn, descartar=True)
+
+    def resumen(self):
+        """
+        Returns:
+            dict: checkouts, conexiones nuevas/reutilizadas, esperas y usos (ms) y detalle por tabla
+        """
+        total = len(self.checkouts)
+        nuevas = sum(1 for c in self.checkouts if c['nueva'])
+        esperas = [c['espera_ms'] for c in self.checkouts]
+        return {
+            'checkouts': total,
+            'conexiones_nuevas': nuevas,
+            'conexiones_reutilizadas': total - nuevas,
+            'espera_total_ms': round(sum(esperas), 2),
+            'espera_max_ms': max(esperas) if esperas else 0,
+            'uso_total_ms': round(sum(c['uso_ms'] for c in self.checkouts), 2),
+            'detalle': self.checkouts,
+        }
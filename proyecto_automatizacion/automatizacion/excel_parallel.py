@@ -0,0 +1,88 @@
+"""
+Lectura de hojas de Excel en paralelo con un pool de procesos
+
+Parsear Excel es CPU-bound y el GIL impide paralelizarlo con hilos. Cada proceso
+del pool abre el libro una sola vez (initializer) y parsea las hojas que se le
+asignan. El DataFrame vuelve al proceso principal en forma columnar compacta
+(nombres + un array numpy por columna) en lugar de pickle fila a fila, y las
+hojas se entregan en el orden en que terminan para que el escritor destino y
+los trackers las consuman mientras el resto se sigue parseando.
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+logger = logging.getLogger('excel_parallel')
+
+# Libro abierto en cada proceso del pool
+_libro_trabajador = None
+
+
+def _abrir_libro(ruta):
+    """Initializer del pool: abre el libro una vez por proceso"""
+    global _libro_trabajador
+    _libro_trabajador = pd.ExcelFile(ruta)
+
+
+def dataframe_a_columnas(df):
+    """
+    Convierte un DataFrame a una forma columnar compacta y serializable
+
+    Las columnas con tipos de extensión (Int64, boolean) viajan como su
+    ExtensionArray (datos + máscara) para no perder el tipo al volver.
+
+    Returns:
+        dict: {'columns': [...], 'arrays': [numpy.ndarray|ExtensionArray, ...]}
+    """
+    arrays = []
+    for i in range(df.shape[1]):
+        serie = df.iloc[:, i]
+        arrays.append(serie.array if pd.api.types.is_extension_array_dtype(serie.dtype) else serie.to_numpy())
+    return {
+        'columns': list(df.columns),
+        'arrays': arrays,
+    }
+
+
+def columnas_a_dataframe(datos):
+    """Reconstruye el DataFrame devuelto por dataframe_a_columnas"""
+    return pd.DataFrame(
+        {i: arreglo for i, arreglo in enumerate(datos['arrays'])}
+    ).set_axis(datos['columns'], axis=1)
+
+
+def _parsear_hoja(hoja):
+    """Parsea una hoja en el proceso trabajador y la devuelve en forma columnar"""
+    return dataframe_a_columnas(_libro_trabajador.parse(hoja))
+
+
+def iterar_hojas_en_paralelo(ruta, hojas, workers):
+    """
+    Parsea las hojas de un libro en un pool de procesos
+
+    Args:
+        ruta: Ruta del archivo Excel
+        hojas: Nombres de las hojas a leer
+        workers: Número máximo de procesos
+
+    Yields:
+        Tuple[str, DataFrame|None, Exception|None]: (hoja, datos, error) en orden de finalización
+    """
+    workers = max(1, min(int(workers), len(hojas), os.cpu_count() or 1))
+    logger.info(f"Parseando {len(hojas)} hojas con {workers} procesos")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_abrir_libro, initargs=(ruta,)) as pool:
+        futuros = {pool.submit(_parsear_hoja, hoja): hoja for hoja in hojas}
+        try:
+            for futuro in as_completed(futuros):
+                hoja = futuros[futuro]
+                try:
+                    yield hoja, columnas_a_dataframe(futuro.result()), None
+                except Exception as e:
+                    yield hoja, None, e
+        finally:
+            for futuro in futuros:
+                futuro.cancel()
@@ -0,0 +1,104 @@
+"""
+Lectura en streaming de hojas xlsx grandes
+
+pd.read_excel construye la hoja completa en memoria antes de poder limpiarla o
+insertarla. Para hojas cercanas al límite de 1.048.576 filas se recorren las
+filas con openpyxl en modo read-only (que no materializa la hoja) y se entregan
+DataFrames de tamaño fijo, de modo que la memoria queda acotada por el tamaño
+del bloque y no por el tamaño de la hoja.
+"""
+
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger('excel_stream')
+
+# Filas por bloque entregado al pipeline de limpieza y escritura
+EXCEL_STREAM_BLOCK_ROWS = 50000
+
+# A partir de este número de filas (según la dimensión de la hoja) se lee en streaming
+EXCEL_STREAMING_MIN_ROWS = 200000
+
+
+def nombres_columnas(encabezado):
+    """
+    Normaliza la fila de encabezado igual que pandas: celdas vacías como
+    'Unnamed: i' y nombres repetidos con sufijo '.1', '.2', ...
+    """
+    nombres = []
+    vistos = {}
+    for i, valor in enumerate(encabezado):
+        nombre = f'Unnamed: {i}' if valor is None or str(valor).strip() == '' else valor
+        if nombre in vistos:
+            vistos[nombre] += 1
+            nombre = f'{nombre}.{vistos[nombre]}'
+        else:
+            vistos[nombre] = 0
+        nombres.append(nombre)
+    return nombres
+
+
+def filas_estimadas(hoja):
+    """
+    Filas de datos según la dimensión guardada en la hoja (sin recorrerla)
+
+    Returns:
+        int|None: Filas sin el encabezado, o None si la hoja no guarda su dimensión
+    """
+    max_row = getattr(hoja, 'max_row', None)
+    if not max_row:
+        return None
+    return max(max_row - 1, 0)
+
+
+def iterar_bloques_hoja(hoja, tamano_bloque=EXCEL_STREAM_BLOCK_ROWS):
+    """
+    Recorre una hoja openpyxl read-only y entrega DataFrames de hasta tamano_bloque filas
+
+    La primera fila se usa como encabezado. Las filas totalmente vacías al final de
+    la hoja se descartan (como hace pandas); las intermedias se conservan.
+    Siempre se entrega al menos un bloque (vacío si la hoja no tiene datos) para
+    que el consumidor conozca las columnas.
+
+    Args:
+        hoja: Worksheet de openpyxl (load_workbook(read_only=True, data_only=True))
+        tamano_bloque: Filas por bloque
+
+    Yields:
+        DataFrame: Bloque de filas con los nombres de columna del encabezado
+    """
+    filas = hoja.iter_rows(values_only=True)
+    encabezado = next(filas, None)
+    if encabezado is None:
+        yield pd.DataFrame()
+        return
+
+    columnas = nombres_columnas(encabezado)
+    ancho = len(columnas)
+
+    bloque = []
+    vacias_pendientes = 0
+    entregados = 0
+
+    for fila in filas:
+        fila = tuple(fila[:ancho]) + (None,) * (ancho - len(fila))
+        if all(valor is None for valor in fila):
+            vacias_pendientes += 1
+            continue
+
+        # Las filas vacías intermedias se conservan al encontrar una fila con datos
+        bloque.extend([(None,) * ancho] * vacias_pendientes)
+        vacias_pendientes = 0
+        bloque.append(fila)
+
+        if len(bloque) >= tamano_bloque:
+            entregados += len(bloque)
+            yield pd.DataFrame.from_records(bloque, columns=columnas)
+            bloque = []
+
+    if bloque or not entregados:
+        entregados += len(bloque)
+        yield pd.DataFrame.from_records(bloque, columns=columnas)
+
+    logger.info(f"Hoja '{hoja.title}' leída en streaming: {entregados} filas")
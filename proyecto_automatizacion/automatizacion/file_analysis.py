@@ -0,0 +1,271 @@
+"""
+Pre-análisis en segundo plano de archivos subidos
+
+Al subir un Excel/CSV se encola en un pool de hilos acotado
+(settings.FILE_ANALYSIS_WORKERS) el cálculo de hojas, columnas con tipo, vista
+previa, número de filas y estadísticas por columna (nulos / no nulos), que se
+guardan en DataSource.analysis_metadata. Las vistas de selección leen esos
+metadatos en lugar de parsear el archivo en la petición; mientras el análisis
+corre, el endpoint de estado informa el progreso.
+
+Si el análisis no avanza en settings.FILE_ANALYSIS_STALE_SECONDS (el proceso que
+lo ejecutaba murió o la cola está saturada), verificar_vencimiento lo marca como
+fallido y las vistas vuelven a la lectura directa de metadatos del archivo.
+
+Como efecto secundario las hojas pequeñas analizadas quedan en la caché columnar
+(file_cache), así que la primera ejecución del proceso tampoco vuelve a parsearlas;
+las grandes (y los CSV) se recorren por bloques sin cargarlas completas.
+"""
+
+import json
+import logging
+import threading
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger('file_analysis')
+
+# Nombre lógico de la "hoja" de un CSV en los metadatos (el mismo que usan las vistas)
+HOJA_CSV = 'csv_data'
+
+DEFAULT_FILE_ANALYSIS_WORKERS = 2
+DEFAULT_FILE_ANALYSIS_STALE_SECONDS = 600
+
+# Pool de hilos del proceso, creado al primer análisis
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _obtener_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = getattr(settings, 'FILE_ANALYSIS_WORKERS', DEFAULT_FILE_ANALYSIS_WORKERS)
+            _executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix='analisis-fuente')
+        return _executor
+
+
+def iniciar_analisis(source):
+    """
+    Marca la fuente como pendiente y encola el análisis en el pool al
+    confirmarse la transacción actual (para que el hilo vea el registro)
+
+    Args:
+        source: DataSource de tipo 'excel' o 'csv'
+    """
+    from .models import DataSource
+
+    ahora = timezone.now()
+    DataSource.objects.filter(pk=source.pk).update(
+        analysis_status='pending', analysis_progress=0, analysis_error=None, analysis_updated_at=ahora
+    )
+    source.analysis_status = 'pending'
+    source.analysis_progress = 0
+    source.analysis_updated_at = ahora
+
+    transaction.on_commit(lambda: _obtener_executor().submit(analizar_fuente, source.pk))
+
+
+def verificar_vencimiento(source):
+    """
+    Marca como fallido un análisis pendiente o en curso que no avanza desde hace
+    más de FILE_ANALYSIS_STALE_SECONDS, para que las vistas dejen de esperarlo
+
+    Args:
+        source: DataSource (se actualiza en memoria si vence)
+
+    Returns:
+        bool: True si el análisis se dio por vencido
+    """
+    from .models import DataSource
+
+    if source.analysis_status not in ('pending', 'running'):
+        return False
+
+    limite = getattr(settings, 'FILE_ANALYSIS_STALE_SECONDS', DEFAULT_FILE_ANALYSIS_STALE_SECONDS)
+    corte = timezone.now() - timedelta(seconds=limite)
+    if source.analysis_updated_at and source.analysis_updated_at > corte:
+        return False
+
+    error = f'El análisis no avanzó en {limite} s; se leen los metadatos directamente del archivo'
+    # Condicional: si el análisis avanzó entre la lectura y ahora, no se toca
+    vencido = DataSource.objects.filter(
+        pk=source.pk, analysis_status=source.analysis_status, analysis_updated_at=source.analysis_updated_at
+    ).update(analysis_status='failed', analysis_error=error)
+    if vencido:
+        logger.warning(f"Fuente {source.pk}: {error}")
+        source.analysis_status = 'failed'
+        source.analysis_error = error
+    return bool(vencido)
+
+
+def _actualizar(source_id, **campos):
+    from .models import DataSource
+    DataSource.objects.filter(pk=source_id).update(analysis_updated_at=timezone.now(), **campos)
+
+
+def _serializable(valor):
+    """Convierte fechas y tipos numpy a valores aceptados por JSONField"""
+    return json.loads(json.dumps(valor, default=str))
+
+
+def _estadisticas_columnas(df, nombres):
+    """
+    Estadísticas por columna sobre los datos sin limpiar
+
+    Args:
+        df: DataFrame original (con NaN)
+        nombres: Nombres de columna ya limpios, en el mismo orden
+
+    Returns:
+        dict: {columna: {'tipo', 'nulos', 'no_nulos'}}
+    """
+    no_nulos = df.notna().sum()
+    return {
+        nombre: {
+            'tipo': df.iloc[:, i].dtype.name,
+            'nulos': int(len(df) - no_nulos.iloc[i]),
+            'no_nulos': int(no_nulos.iloc[i]),
+        }
+        for i, nombre in enumerate(nombres)
+    }
+
+
+def _acumular_estadisticas(acumulado, parciales):
+    for columna, valores in parciales.items():
+        if columna not in acumulado:
+            acumulado[columna] = dict(valores)
+        else:
+            acumulado[columna]['nulos'] += valores['nulos']
+            acumulado[columna]['no_nulos'] += valores['no_nulos']
+
+
+def _analizar_hoja_excel(processor, hoja, datos):
+    """
+    Completa los metadatos de una hoja con el número exacto de filas y las
+    estadísticas por columna. Las hojas pequeñas se parsean completas (y quedan
+    en la caché); las grandes se recorren en bloques acotados.
+    """
+    from .excel_stream import EXCEL_STREAMING_MIN_ROWS, iterar_bloques_hoja
+
+    nombres = [columna['name'] for columna in datos['columns']]
+
+    if datos['total_rows'] < EXCEL_STREAMING_MIN_ROWS or processor.excel_file.engine != 'openpyxl':
+        df = processor._read_sheet(hoja)
+        filas = len(df)
+        estadisticas = _estadisticas_columnas(df, nombres)
+    else:
+        filas = 0
+        estadisticas = {}
+        for bloque in iterar_bloques_hoja(processor.excel_file.book[hoja]):
+            filas += len(bloque)
+            _acumular_estadisticas(estadisticas, _estadisticas_columnas(bloque, nombres))
+
+    datos['total_rows'] = filas
+    if datos['preview']:
+        datos['preview']['total_rows'] = filas
+    datos['column_stats'] = estadisticas
+    datos['row_count_exact'] = True
+
+
+def _analizar_excel(source):
+    from .utils import ExcelProcessor
+
+    processor = ExcelProcessor(source.file_path)
+    if not processor.load_file():
+        raise ValueError('No se pudo cargar el archivo Excel')
+
+    try:
+        hojas = processor.get_sheet_names()
+        # Pasada rápida: columnas, vista previa y filas según la dimensión
+        sheets_data = processor.get_workbook_metadata()
+        _actualizar(source.pk, analysis_progress=10)
+
+        for i, hoja in enumerate(hojas, start=1):
+            try:
+                _analizar_hoja_excel(processor, hoja, sheets_data[hoja])
+            except Exception as e:
+                logger.warning(f"Fuente {source.pk}: sin estadísticas para la hoja '{hoja}': {str(e)}")
+            _actualizar(source.pk, analysis_progress=10 + int(89 * i / max(len(hojas), 1)))
+    finally:
+        processor.excel_file.close()
+
+    return {'sheets': hojas, 'sheets_data': sheets_data}
+
+
+def _analizar_csv(source):
+    from .utils import CSVProcessor
+    from .csv_stream import iterar_bloques_csv
+
+    processor = CSVProcessor(source.file_path)
+    columns = processor.get_columns()
+    preview = processor.get_preview()
+    _actualizar(source.pk, analysis_progress=50)
+
+    # Conteo y estadísticas por bloques: el CSV nunca se carga completo
+    nombres = [columna['name'] for columna in columns]
+    filas = 0
+    estadisticas = {}
+    for bloque in iterar_bloques_csv(source.file_path):
+        filas += len(bloque)
+        _acumular_estadisticas(estadisticas, _estadisticas_columnas(bloque, nombres))
+
+    if preview:
+        preview['total_rows'] = filas
+    datos = {
+        'columns': columns,
+        'preview': preview,
+        'total_rows': filas,
+        'column_count': len(columns),
+        'column_stats': estadisticas,
+        'row_count_exact': True,
+    }
+    return {'sheets': [HOJA_CSV], 'sheets_data': {HOJA_CSV: datos}}
+
+
+def analizar_fuente(source_id):
+    """
+    Analiza el archivo de una fuente y guarda los metadatos en el DataSource
+
+    Se ejecuta en un hilo del pool; los errores quedan en analysis_error y las
+    vistas vuelven a la lectura directa del archivo.
+    """
+    from .models import DataSource
+
+    try:
+        # Solo si sigue pendiente: un análisis dado por vencido mientras esperaba
+        # en la cola ya no se ejecuta
+        iniciado = DataSource.objects.filter(pk=source_id, analysis_status='pending').update(
+            analysis_status='running', analysis_progress=0, analysis_updated_at=timezone.now()
+        )
+        if not iniciado:
+            logger.info(f"Pre-análisis de la fuente {source_id} descartado (ya no está pendiente)")
+            return
+        source = DataSource.objects.get(pk=source_id)
+        logger.info(f"Pre-análisis de la fuente {source_id} ({source.name}) iniciado")
+
+        if source.source_type == 'excel':
+            metadatos = _analizar_excel(source)
+        elif source.source_type == 'csv':
+            metadatos = _analizar_csv(source)
+        else:
+            raise ValueError(f"Tipo de fuente sin pre-análisis: {source.source_type}")
+
+        _actualizar(
+            source_id,
+            analysis_status='completed',
+            analysis_progress=100,
+            analysis_metadata=_serializable(metadatos),
+            analyzed_at=timezone.now(),
+        )
+        logger.info(f"Pre-análisis de la fuente {source_id} completado: {len(metadatos['sheets'])} hojas")
+    except Exception as e:
+        logger.error(f"Error en el pre-análisis de la fuente {source_id}: {str(e)}")
+        _actualizar(source_id, analysis_status='failed', analysis_error=str(e))
+    finally:
+        # El hilo tiene su propia conexión a la BD de Django
+        connections.close_all()
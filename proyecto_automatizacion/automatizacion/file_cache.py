@@ -0,0 +1,249 @@
+"""
+Caché columnar de archivos subidos (Excel/CSV) direccionada por contenido
+
+La primera vez que se parsea una hoja (o un CSV) el DataFrame se guarda en disco
+en formato Arrow IPC (Feather v2, sin compresión) bajo TEMP_DIR/parsed_cache, con
+clave hash SHA-256 del archivo + nombre de hoja. Las vistas previas, listados de
+columnas y ejecuciones posteriores leen ese archivo con memory-map en lugar de
+volver a abrir el xlsx. El tamaño total se acota con expulsión LRU (por fecha de
+último uso).
+
+Solo se cachean hojas de menos de PARSED_FILE_CACHE_MAX_ROWS filas (por defecto
+el umbral de lectura en streaming): las hojas grandes se leen por bloques durante
+la ejecución y entregarlas completas desde la caché rompería ese límite de memoria.
+
+pyarrow es opcional: sin él la caché queda desactivada y todo se parsea como antes.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+from .metrics import consulta_cache
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+logger = logging.getLogger('file_cache')
+
+# Tamaño máximo de la caché en disco (bytes)
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+# Nombre lógico de la "hoja" para archivos CSV
+HOJA_CSV = '__csv__'
+
+_hashes = {}
+_lock = threading.Lock()
+
+
+def max_filas_cache():
+    """Filas a partir de las cuales una hoja no se guarda ni se lee desde la caché"""
+    from .excel_stream import EXCEL_STREAMING_MIN_ROWS
+    return getattr(settings, 'PARSED_FILE_CACHE_MAX_ROWS', EXCEL_STREAMING_MIN_ROWS)
+
+
+def cache_disponible():
+    """Indica si pyarrow está instalado y la caché puede usarse"""
+    return feather is not None
+
+
+def directorio_cache():
+    """Directorio de la caché (TEMP_DIR/parsed_cache)"""
+    directorio = Path(settings.TEMP_DIR) / 'parsed_cache'
+    directorio.mkdir(parents=True, exist_ok=True)
+    return directorio
+
+
+def hash_archivo(ruta):
+    """
+    SHA-256 del contenido del archivo. Se memoriza por (ruta, tamaño, mtime) para
+    no releer el archivo en cada petición del flujo de configuración.
+    """
+    estado = os.stat(ruta)
+    clave = (os.path.abspath(ruta), estado.st_size, estado.st_mtime_ns)
+    with _lock:
+        if clave in _hashes:
+            return _hashes[clave]
+
+    digest = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(1024 * 1024), b''):
+            digest.update(bloque)
+
+    with _lock:
+        _hashes[clave] = digest.hexdigest()
+    return _hashes[clave]
+
+
+def _ruta_hoja(hash_contenido, hoja):
+    nombre_hoja = hashlib.sha1(str(hoja).encode('utf-8')).hexdigest()[:16]
+    return directorio_cache() / f'{hash_contenido}_{nombre_hoja}.arrow'
+
+
+def _ruta_metadatos(hash_contenido):
+    return directorio_cache() / f'{hash_contenido}.json'
+
+
+def _marcar_uso(ruta):
+    """Actualiza la fecha de modificación, usada como último uso para la LRU"""
+    try:
+        os.utime(ruta, None)
+    except OSError:
+        pass
+
+
+def leer_hoja(ruta_archivo, hoja, columnas=None):
+    """
+    Lee una hoja desde la caché
+
+    Args:
+        ruta_archivo: Archivo original (Excel/CSV)
+        hoja: Nombre de la hoja (HOJA_CSV para CSV)
+        columnas: Lista opcional de columnas a leer
+
+    Returns:
+        DataFrame|None: Datos en caché, o None si no están, la caché está
+        desactivada o la hoja guardada supera max_filas_cache()
+    """
+    if not cache_disponible():
+        return None
+
+    try:
+        ruta = _ruta_hoja(hash_archivo(ruta_archivo), hoja)
+        if not ruta.exists():
+            consulta_cache('archivos', False)
+            return None
+        # memory_map: num_rows se conoce sin materializar la tabla
+        tabla = feather.read_table(str(ruta), columns=columnas, memory_map=True)
+        if tabla.num_rows >= max_filas_cache():
+            # Entrada de una versión anterior sin límite: se descarta
+            ruta.unlink(missing_ok=True)
+            consulta_cache('archivos', False)
+            return None
+        _marcar_uso(ruta)
+        consulta_cache('archivos', True)
+        return tabla.to_pandas()
+    except Exception as e:
+        logger.warning(f"No se pudo leer la caché de '{hoja}': {str(e)}")
+        return None
+
+
+def guardar_hoja(ruta_archivo, hoja, df):
+    """
+    Guarda un DataFrame en la caché. Los DataFrames que Arrow no puede representar
+    (columnas con tipos mezclados, nombres de columna no textuales) no se guardan.
+
+    Returns:
+        bool: True si se guardó
+    """
+    if not cache_disponible():
+        return False
+    if len(df) >= max_filas_cache():
+        return False
+    if not all(isinstance(col, str) for col in df.columns) or df.columns.duplicated().any():
+        return False
+
+    try:
+        ruta = _ruta_hoja(hash_archivo(ruta_archivo), hoja)
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        temporal = ruta.with_suffix(f'.tmp{os.getpid()}')
+        feather.write_feather(tabla, str(temporal), compression='uncompressed')
+        os.replace(temporal, ruta)
+    except Exception as e:
+        logger.info(f"Hoja '{hoja}' no se guardó en caché: {str(e)}")
+        return False
+
+    expulsar_lru()
+    return True
+
+
+def obtener_hoja(ruta_archivo, hoja, parsear):
+    """
+    Devuelve la hoja desde la caché o la parsea con `parsear()` y la guarda
+
+    Args:
+        parsear: Callable sin argumentos que devuelve el DataFrame completo
+    """
+    df = leer_hoja(ruta_archivo, hoja)
+    if df is not None:
+        return df
+
+    df = parsear()
+    guardar_hoja(ruta_archivo, hoja, df)
+    return df
+
+
+def leer_metadatos(ruta_archivo):
+    """
+    Returns:
+        dict: Metadatos del archivo en caché (p. ej. 'sheet_names'), vacío si no hay
+    """
+    if not cache_disponible():
+        return {}
+    try:
+        ruta = _ruta_metadatos(hash_archivo(ruta_archivo))
+        if not ruta.exists():
+            return {}
+        _marcar_uso(ruta)
+        return json.loads(ruta.read_text(encoding='utf-8'))
+    except Exception:
+        return {}
+
+
+def guardar_metadatos(ruta_archivo, **valores):
+    """Agrega valores a los metadatos en caché del archivo"""
+    if not cache_disponible():
+        return
+    try:
+        ruta = _ruta_metadatos(hash_archivo(ruta_archivo))
+        metadatos = leer_metadatos(ruta_archivo)
+        metadatos.update(valores)
+        temporal = ruta.with_suffix(f'.tmp{os.getpid()}')
+        temporal.write_text(json.dumps(metadatos, default=str), encoding='utf-8')
+        os.replace(temporal, ruta)
+    except Exception as e:
+        logger.info(f"No se pudieron guardar metadatos en caché: {str(e)}")
+
+
+def expulsar_lru(max_bytes=None):
+    """
+    Elimina los archivos menos usados hasta que la caché quede bajo el límite
+
+    Args:
+        max_bytes: Límite en bytes (por defecto settings.PARSED_FILE_CACHE_MAX_BYTES)
+    """
+    if max_bytes is None:
+        max_bytes = getattr(settings, 'PARSED_FILE_CACHE_MAX_BYTES', DEFAULT_CACHE_MAX_BYTES)
+
+    archivos = []
+    for ruta in directorio_cache().iterdir():
+        if ruta.suffix.startswith('.tmp'):
+            continue
+        try:
+            estado = ruta.stat()
+        except OSError:
+            continue
+        archivos.append((estado.st_mtime, estado.st_size, ruta))
+
+    total = sum(tamano for _, tamano, _ in archivos)
+    if total <= max_bytes:
+        return
+
+    for _, tamano, ruta in sorted(archivos):
+        try:
+            ruta.unlink()
+            total -= tamano
+            logger.info(f"Caché: expulsado {ruta.name} ({tamano} bytes)")
+        except OSError:
+            continue
+        if total <= max_bytes:
+            break
@@ -8,20 +8,31 @@ import datetime
 import time
 from django.db import transaction
 
+from ..metrics import observar_escritura_tracker
+
 class ProcessTracker:
     """
     Clase para gestionar el seguimiento y registro de un proceso completo,
     minimizando las entradas en la base de datos mediante la actualización
     de un único registro para todo el ciclo de vida del proceso.
+    
+    En modo asíncrono los cambios del registro se encolan en el TrackerSink del
+    proceso (ver tracker_sink) en lugar de escribirse en cada llamada.
     """
     
-    def __init__(self, nombre_proceso):
+    # Campos que modifican las actualizaciones del registro
+    CAMPOS_ACTUALIZACION = ('Estado', 'ParametrosEntrada', 'DuracionSegundos', 'ProcesoID', 'MensajeError')
+    
+    def __init__(self, nombre_proceso, asincrono=None):
         """
         Inicializa un nuevo seguimiento de proceso con registro único
         
         Args:
             nombre_proceso (str): Nombre o identificador del proceso
+            asincrono (bool, optional): Escribir a través del TrackerSink
+                (por defecto settings.PROCESS_TRACKER_ASYNC)
         """
+        from django.conf import settings
         # Importar desde el modelo principal, no desde logs/
         from automatizacion.logs.models_logs import ProcesoLog
         self.nombre_proceso = nombre_proceso
@@ -30,6 +41,10 @@ class ProcessTracker:
         self.historial = []
         self.ProcesoLog = ProcesoLog
         self._registro = None  # Almacenará la referencia al registro en la BD
+        self.estadisticas_merge = {}  # Conteos de MERGE por tabla destino
+        if asincrono is None:
+            asincrono = getattr(settings, 'PROCESS_TRACKER_ASYNC', False)
+        self.asincrono = asincrono
         self._estados = {
             'INICIADO': 'Proceso iniciado',
             'EN_PROGRESO': 'En progreso',
@@ -58,6 +73,43 @@ class ProcessTracker:
         
         self.historial.append(entrada)
     
+    def _guardar_registro(self, crear=False, final=False, urgente=False):
+        """
+        Persiste el registro: save() inmediato en modo síncrono o cambio encolado
+        en el TrackerSink en modo asíncrono
+        
+        Args:
+            crear (bool): Es la creación del registro
+            final (bool): Último cambio del ciclo de vida
+            urgente (bool): En modo asíncrono, escribir ya y esperar (errores)
+        """
+        if not self.asincrono:
+            inicio = time.perf_counter()
+            if crear:
+                self._registro.save(using='logs')
+            else:
+                with transaction.atomic():
+                    self._registro.save(using='logs')
+            observar_escritura_tracker('sincrono', time.perf_counter() - inicio)
+            return
+        
+        from .tracker_sink import obtener_sink
+        
+        if crear:
+            campos = {
+                campo.attname: getattr(self._registro, campo.attname)
+                for campo in self._registro._meta.concrete_fields if not campo.primary_key
+            }
+        else:
+            campos = {campo: getattr(self._registro, campo) for campo in self.CAMPOS_ACTUALIZACION}
+        obtener_sink().encolar(self.proceso_id, campos, crear=crear, final=final, urgente=urgente)
+    
+    def vaciar(self):
+        """En modo asíncrono, escribe ya los cambios pendientes (de todos los trackers)"""
+        if self.asincrono:
+            from .tracker_sink import obtener_sink
+            obtener_sink().flush()
+    
     def _actualizar_estado(self, estado, detalles=None, error=None):
         """
         Actualiza el estado del proceso en la base de datos de manera eficiente
@@ -70,19 +122,19 @@ class ProcessTracker:
         self._actualizar_historial(estado, detalles, error)
         
         if self._registro:
-            with transaction.atomic():
-                # Actualizar el registro existente en lugar de crear uno nuevo
-                duracion = time.time() - self.tiempo_inicio
-                self._registro.Estado = self._estados.get(estado, estado)[:20]
-                self._registro.DuracionSegundos = int(duracion)
-                self._registro.ParametrosEntrada = json.dumps({
-                    'proceso_unique_id': self.proceso_id,
-                    'historial': self.historial[-3:],  # Solo los últimos 3 eventos
-                    'estado_actual': estado
-                })
-                if error:
-                    self._registro.MensajeError = str(error)[:1000]  # Limitar tamaño
-                self._registro.save(using='logs')
+            # Actualizar el registro existente en lugar de crear uno nuevo
+            duracion = time.time() - self.tiempo_inicio
+            self._registro.Estado = self._estados.get(estado, estado)[:20]
+            self._registro.DuracionSegundos = int(duracion)
+            self._registro.ParametrosEntrada = json.dumps({
+                'proceso_unique_id': self.proceso_id,
+                'historial': self.historial[-3:],  # Solo los últimos 3 eventos
+                'estado_actual': estado
+            })
+            if error:
+                self._registro.MensajeError = str(error)[:1000]  # Limitar tamaño
+            # Los errores se escriben de inmediato también en modo asíncrono
+            self._guardar_registro(final=(estado == 'ERROR'), urgente=bool(error))
     
     def _obtener_parametros(self, parametros_adicionales=None):
         """
@@ -149,7 +201,7 @@ class ProcessTracker:
                 NombreProceso=self.nombre_proceso[:255]  # Nombre del proceso del frontend
             )
             print(f"DEBUG: Guardando registro usando base de datos 'logs'...")
-            self._registro.save(using='logs')
+            self._guardar_registro(crear=True)
             print(f"DEBUG: Registro guardado exitosamente con parámetros optimizados")
         
         return proceso_id_str
@@ -170,21 +222,51 @@ class ProcessTracker:
         
         # Solo actualizar el registro existente, NO crear uno nuevo
         if self._registro:
-            with transaction.atomic():
-                # Actualizar registro existente en lugar de crear uno nuevo
-                self._registro.Estado = f"{estado}"[:20]  # Solo el estado actual
-                self._registro.ParametrosEntrada = json.dumps(self._obtener_parametros())
-                self._registro.DuracionSegundos = duracion
-                self._registro.ProcesoID = self.proceso_id  # Asegurar que el ProcesoID esté presente
-                # Siempre poner mensaje más presentable, incluso para estados intermedios
-                if detalles:
-                    self._registro.MensajeError = detalles
-                else:
-                    self._registro.MensajeError = f"Estado actualizado a: {estado}"
-                self._registro.save(using='logs')
+            # Actualizar registro existente en lugar de crear uno nuevo
+            self._registro.Estado = f"{estado}"[:20]  # Solo el estado actual
+            self._registro.ParametrosEntrada = json.dumps(self._obtener_parametros())
+            self._registro.DuracionSegundos = duracion
+            self._registro.ProcesoID = self.proceso_id  # Asegurar que el ProcesoID esté presente
+            # Siempre poner mensaje más presentable, incluso para estados intermedios
+            if detalles:
+                self._registro.MensajeError = detalles
+            else:
+                self._registro.MensajeError = f"Estado actualizado a: {estado}"
+            self._guardar_registro()
         
         return self.proceso_id
     
+    def registrar_merge(self, tabla, estadisticas):
+        """
+        Registra el resultado de un MERGE en una tabla destino
+        
+        Args:
+            tabla (str): Tabla destino combinada
+            estadisticas (dict): Conteos 'insertados', 'actualizados', 'sin_cambios' y
+                'duplicados' (filas con clave repetida descartadas antes del MERGE)
+        
+        Returns:
+            str: ID del proceso
+        """
+        self.estadisticas_merge[tabla] = estadisticas
+        detalles = (f"MERGE {tabla}: {estadisticas.get('insertados', 0)} insertadas, "
+                    f"{estadisticas.get('actualizados', 0)} actualizadas, "
+                    f"{estadisticas.get('sin_cambios', 0)} sin cambios")
+        if estadisticas.get('duplicados'):
+            detalles += f", {estadisticas['duplicados']} duplicadas descartadas"
+        return self.actualizar_estado('MERGE', detalles)
+    
+    def resumen_merge(self):
+        """
+        Returns:
+            dict: Totales de insertadas, actualizadas, sin cambios y duplicadas de todas las tablas
+        """
+        totales = {'insertados': 0, 'actualizados': 0, 'sin_cambios': 0, 'duplicados': 0}
+        for estadisticas in self.estadisticas_merge.values():
+            for clave in totales:
+                totales[clave] += estadisticas.get(clave, 0)
+        return totales
+    
     def finalizar_exito(self, detalles=None):
         """
         Registra la finalización exitosa de un proceso
@@ -200,15 +282,14 @@ class ProcessTracker:
         
         # Solo actualizar el registro existente
         if self._registro:
-            with transaction.atomic():
-                # Finalizar el registro existente
-                self._registro.Estado = "Completado"[:20]
-                self._registro.ParametrosEntrada = json.dumps(self._obtener_parametros())
-                self._registro.DuracionSegundos = duracion
-                self._registro.ProcesoID = self.proceso_id  # Asegurar que el ProcesoID esté presente
-                # En caso de éxito, poner mensaje más presentable en lugar de NULL
-                self._registro.MensajeError = detalles if detalles else "Proceso completado exitosamente"
-                self._registro.save(using='logs')
+            # Finalizar el registro existente
+            self._registro.Estado = "Completado"[:20]
+            self._registro.ParametrosEntrada = json.dumps(self._obtener_parametros())
+            self._registro.DuracionSegundos = duracion
+            self._registro.ProcesoID = self.proceso_id  # Asegurar que el ProcesoID esté presente
+            # En caso de éxito, poner mensaje más presentable en lugar de NULL
+            self._registro.MensajeError = detalles if detalles else "Proceso completado exitosamente"
+            self._guardar_registro(final=True)
         
         return self.proceso_id
     
@@ -242,14 +323,13 @@ class ProcessTracker:
         
         # Solo actualizar el registro existente
         if self._registro:
-            with transaction.atomic():
-                # Finalizar el registro existente
-                self._registro.Estado = estado[:20]
-                self._registro.ParametrosEntrada = json.dumps(self._obtener_parametros())
-                self._registro.DuracionSegundos = duracion
-                self._registro.ProcesoID = self.proceso_id  # Asegurar que el ProcesoID esté presente
-                self._registro.MensajeError = detalles if detalles else f"Proceso finalizado con estado: {estado}"
-                self._registro.save(using='logs')
+            # Finalizar el registro existente
+            self._registro.Estado = estado[:20]
+            self._registro.ParametrosEntrada = json.dumps(self._obtener_parametros())
+            self._registro.DuracionSegundos = duracion
+            self._registro.ProcesoID = self.proceso_id  # Asegurar que el ProcesoID esté presente
+            self._registro.MensajeError = detalles if detalles else f"Proceso finalizado con estado: {estado}"
+            self._guardar_registro(final=True, urgente=(estado == 'ERROR'))
         
         return self.proceso_id
 
@@ -0,0 +1,197 @@
+"""
+Escritura asíncrona y agrupada de los registros de ProcessTracker
+
+En modo síncrono cada iniciar / actualizar_estado / finalizar_* hace un save()
+contra la base de datos 'logs' en el camino crítico de cada hoja o tabla. Con
+settings.PROCESS_TRACKER_ASYNC (o ProcessTracker(..., asincrono=True)) los
+cambios se encolan en memoria y un hilo los escribe en bloque:
+
+- Los cambios de un mismo registro (clave: ProcesoID de la ejecución) se combinan;
+  solo se escribe el último valor de cada campo. Si el registro aún no se creó,
+  las actualizaciones se combinan con la creación en un solo INSERT.
+- Cada vaciado crea los registros nuevos y actualiza los existentes con
+  bulk_update (una sentencia por conjunto de campos) dentro de una transacción.
+- Los errores se vacían de inmediato (finalizar_error espera la escritura) y
+  lo pendiente se vacía al terminar el proceso (atexit).
+- Si un vaciado falla (también tras reintentar con una conexión nueva), sus
+  cambios vuelven a la cola combinados con los que llegaron mientras tanto y se
+  reintentan en el ciclo siguiente y al salir; un registro que falla
+  MAX_REINTENTOS_VACIADO veces seguidas se descarta con un error en el log.
+"""
+
+import time
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+
+from django.db import connections, transaction
+
+from ..metrics import observar_escritura_tracker
+
+logger = logging.getLogger('tracker_sink')
+
+DEFAULT_FLUSH_INTERVAL = 1.0  # segundos entre vaciados del hilo escritor
+
+# LogID recordados (un registro puede recibir cambios después de finalizar,
+# p. ej. finalizar('ERROR') seguido de finalizar_error)
+MAX_LOG_IDS = 10000
+
+# Vaciados fallidos seguidos antes de descartar los cambios de un registro
+MAX_REINTENTOS_VACIADO = 10
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+class TrackerSink:
+    """
+    Cola en memoria de cambios de ProcesoLog con vaciado en segundo plano
+    """
+
+    def __init__(self, intervalo=DEFAULT_FLUSH_INTERVAL):
+        self.intervalo = intervalo
+        self._pendientes = {}           # ProcesoID -> {'crear', 'campos', 'final'}
+        self._log_ids = OrderedDict()   # ProcesoID -> LogID de los registros ya creados
+        self._lock = threading.Lock()
+        self._escritura = threading.Lock()
+        self._despertar = threading.Event()
+        self.stats = {'eventos': 0, 'escrituras': 0, 'vaciados': 0, 'errores': 0, 'descartados': 0}
+
+        self._hilo = threading.Thread(target=self._bucle, name='tracker-sink', daemon=True)
+        self._hilo.start()
+
+    def encolar(self, proceso_id, campos, crear=False, final=False, urgente=False):
+        """
+        Encola un cambio del registro de la ejecución `proceso_id`
+
+        Args:
+            campos: dict {campo: valor} (en una creación, todos los campos)
+            crear: El cambio es la creación del registro
+            final: Cambio de finalización (despierta al hilo escritor)
+            urgente: Escribir ya y esperar a que termine (errores)
+        """
+        with self._lock:
+            self.stats['eventos'] += 1
+            pendiente = self._pendientes.get(proceso_id)
+            if pendiente is None:
+                self._pendientes[proceso_id] = {'crear': crear, 'campos': dict(campos), 'final': final}
+            else:
+                pendiente['campos'].update(campos)
+                pendiente['crear'] = pendiente['crear'] or crear
+                pendiente['final'] = pendiente['final'] or final
+
+        if urgente:
+            self.flush()
+        elif final:
+            self._despertar.set()
+
+    def _bucle(self):
+        while True:
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error vaciando registros de procesos: {str(e)}")
+
+    def flush(self):
+        """Escribe todo lo pendiente en el hilo que llama (bloquea hasta terminar)"""
+        from .models_logs import ProcesoLog
+
+        with self._escritura:
+            with self._lock:
+                lote, self._pendientes = self._pendientes, {}
+            if not lote:
+                return
+
+            inicio = time.perf_counter()
+            try:
+                self._escribir(ProcesoLog, lote)
+            except Exception as e:
+                # Conexión caída: reintentar una vez con una conexión nueva
+                logger.warning(f"Reintentando escritura de {len(lote)} registros de procesos: {str(e)}")
+                connections['logs'].close()
+                try:
+                    self._escribir(ProcesoLog, lote)
+                except Exception as e:
+                    self._reencolar(lote, e)
+                    return
+
+            observar_escritura_tracker('asincrono', time.perf_counter() - inicio)
+            with self._lock:
+                self.stats['vaciados'] += 1
+                self.stats['escrituras'] += len(lote)
+
+    def _reencolar(self, lote, error):
+        """
+        Devuelve a la cola los cambios de un vaciado fallido; los que llegaron
+        mientras tanto son más recientes y prevalecen campo a campo
+        """
+        descartados = 0
+        with self._lock:
+            self.stats['errores'] += 1
+            for proceso_id, pendiente in lote.items():
+                intentos = pendiente.get('intentos', 0) + 1
+                if intentos >= MAX_REINTENTOS_VACIADO:
+                    descartados += 1
+                    continue
+                nuevo = self._pendientes.get(proceso_id)
+                if nuevo is not None:
+                    pendiente['campos'].update(nuevo['campos'])
+                    pendiente['crear'] = pendiente['crear'] or nuevo['crear']
+                    pendiente['final'] = pendiente['final'] or nuevo['final']
+                pendiente['intentos'] = intentos
+                self._pendientes[proceso_id] = pendiente
+            self.stats['descartados'] += descartados
+
+        logger.error(f"No se pudieron escribir {len(lote)} cambios de registros de procesos; "
+                     f"se reintentan en el próximo vaciado: {str(error)}")
+        if descartados:
+            logger.error(f"Se descartan los cambios de {descartados} registros de procesos "
+                         f"tras {MAX_REINTENTOS_VACIADO} vaciados fallidos")
+
+    def _escribir(self, ProcesoLog, lote):
+        nuevos = []
+        actualizaciones = {}  # campos -> [instancias]
+        for proceso_id, pendiente in lote.items():
+            if pendiente['crear']:
+                nuevos.append((proceso_id, ProcesoLog(**pendiente['campos'])))
+                continue
+            log_id = self._log_ids.get(proceso_id)
+            if log_id is None:
+                logger.warning(f"Registro de proceso {proceso_id} sin crear; se omite su actualización")
+                continue
+            campos = tuple(sorted(pendiente['campos']))
+            actualizaciones.setdefault(campos, []).append(ProcesoLog(LogID=log_id, **pendiente['campos']))
+
+        with transaction.atomic(using='logs'):
+            # save() por registro nuevo: se necesita el LogID para las actualizaciones siguientes
+            for proceso_id, registro in nuevos:
+                registro.save(using='logs')
+            for campos, registros in actualizaciones.items():
+                ProcesoLog.objects.using('logs').bulk_update(registros, list(campos))
+
+        # Solo tras el commit: si la transacción se revierte, los LogID no existen
+        for proceso_id, registro in nuevos:
+            self._log_ids[proceso_id] = registro.LogID
+        while len(self._log_ids) > MAX_LOG_IDS:
+            self._log_ids.popitem(last=False)
+
+    def estadisticas(self):
+        """Eventos recibidos, registros escritos, vaciados, errores y registros descartados"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['pendientes'] = len(self._pendientes)
+        return stats
+
+
+def obtener_sink():
+    """Sink del proceso (se crea al primer uso y se vacía al salir)"""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            from django.conf import settings
+            _sink = TrackerSink(getattr(settings, 'PROCESS_TRACKER_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL))
+            atexit.register(_sink.flush)
+        return _sink
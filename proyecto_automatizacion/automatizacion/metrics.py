@@ -0,0 +1,494 @@
+"""
+Métricas de la canalización y de las vistas en formato Prometheus
+
+Contadores e histogramas que se actualizan en el mismo proceso, sin consultas
+ni E/S en el camino crítico (un incremento bajo lock por evento), y se exponen
+en /automatizacion/metrics/:
+
+- opav_filas_extraidas_total / opav_filas_cargadas_total por tipo de origen
+- opav_lote_insercion_segundos: cada executemany de BulkWriter
+- opav_espera_conexion_segundos: espera de checkout en los pools de conexiones
+- opav_escritura_tracker_segundos: escrituras de ProcessTracker (síncronas o del TrackerSink)
+- opav_vista_segundos: latencia de las vistas instrumentadas con @medir_vista
+- opav_cache_consultas_total por caché y resultado (acierto/fallo); la tasa de
+  aciertos es sum(rate(...{resultado="acierto"})) / sum(rate(...))
+
+Con varios workers de gunicorn la configuración soportada es exportar
+PROMETHEUS_MULTIPROC_DIR (directorio vacío al arrancar, compartido por todos los
+workers) antes de iniciar el servidor; el endpoint suma entonces los valores de
+todos los workers, responda el que responda:
+
+- con prometheus_client instalado se usa su modo multiproceso; llamar a
+  marcar_worker_terminado(pid) desde el hook child_exit de gunicorn,
+- sin prometheus_client cada worker vuelca sus valores acumulados en
+  <directorio>/opav_<pid>_<inicio>.json desde un hilo cada INTERVALO_VOLCADO_SEGUNDOS (y al
+  terminar), y el endpoint suma todos los archivos. Los de workers terminados se
+  conservan para que los contadores no retrocedan.
+
+Sin PROMETHEUS_MULTIPROC_DIR cada worker expone solo sus propios valores, con la
+etiqueta pid, y el endpoint registra una advertencia: sirve para un solo proceso
+(runserver, un worker), no para sumar varios.
+"""
+
+import os
+import glob
+import json
+import time
+import atexit
+import bisect
+import logging
+import functools
+import threading
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
+    multiprocess = None
+
+logger = logging.getLogger('metrics')
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+BUCKETS_LOTE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BUCKETS_ESPERA = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+BUCKETS_ESCRITURA = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+BUCKETS_VISTA = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Cada cuánto vuelca un worker sus valores al directorio compartido (sin prometheus_client)
+INTERVALO_VOLCADO_SEGUNDOS = 5
+
+
+def directorio_multiproceso():
+    """Directorio compartido por los workers (PROMETHEUS_MULTIPROC_DIR) o None"""
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR') or None
+
+
+# --- Registro mínimo sin prometheus_client ---------------------------------
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _formatear_etiquetas(nombres, valores, extra=None):
+    pares = list(zip(nombres, valores)) + (extra or [])
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in pares) + '}'
+
+
+def _con_pid(nombres, valores, pid):
+    """Antepone la etiqueta pid (si hay) a las de la serie"""
+    if pid is None:
+        return nombres, valores
+    return ('pid',) + tuple(nombres), (pid,) + tuple(valores)
+
+
+def _formatear_numero(valor):
+    return repr(float(valor)) if valor != float('inf') else '+Inf'
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._hijos = {}
+        self._lock = threading.Lock()
+        _metricas.append(self)
+
+    def labels(self, *valores, **por_nombre):
+        if por_nombre:
+            valores = tuple(por_nombre[nombre] for nombre in self.etiquetas)
+        clave = tuple(str(v) for v in valores)
+        hijo = self._hijos.get(clave)
+        if hijo is None:
+            with self._lock:
+                hijo = self._hijos.setdefault(clave, self._nuevo_hijo())
+        return hijo
+
+    def _hijo_sin_etiquetas(self):
+        return self.labels()
+
+    def series(self):
+        """Valores actuales de este proceso: {valores de etiquetas: datos}"""
+        return {valores: hijo.datos() for valores, hijo in list(self._hijos.items())}
+
+    def _reiniciar(self):
+        self._lock = threading.Lock()
+        for hijo in self._hijos.values():
+            hijo.reiniciar()
+
+
+class _ValorContador:
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.valor = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, cantidad=1):
+        if not _volcado['activo']:
+            _iniciar_volcado()
+        with self._lock:
+            self.valor += cantidad
+
+    def datos(self):
+        return self.valor
+
+
+class _Contador(_Metrica):
+    tipo = 'counter'
+
+    def _nuevo_hijo(self):
+        return _ValorContador()
+
+    def inc(self, cantidad=1):
+        self._hijo_sin_etiquetas().inc(cantidad)
+
+    @staticmethod
+    def sumar(datos, otros):
+        return datos + otros
+
+    def exportar(self, series, pid=None):
+        lineas = []
+        for valores, valor in series.items():
+            nombres, valores = _con_pid(self.etiquetas, valores, pid)
+            lineas.append(f'{self.nombre}_total{_formatear_etiquetas(nombres, valores)} '
+                          f'{_formatear_numero(valor)}')
+        return lineas
+
+
+class _ValorHistograma:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.conteos = [0] * (len(self.buckets) + 1)
+        self.suma = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, valor):
+        if not _volcado['activo']:
+            _iniciar_volcado()
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            self.conteos[indice] += 1
+            self.suma += valor
+
+    def datos(self):
+        with self._lock:
+            return [list(self.conteos), self.suma]
+
+
+class _Histograma(_Metrica):
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_LOTE):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(nombre, ayuda, etiquetas)
+
+    def _nuevo_hijo(self):
+        return _ValorHistograma(self.buckets)
+
+    def observe(self, valor):
+        self._hijo_sin_etiquetas().observe(valor)
+
+    @staticmethod
+    def sumar(datos, otros):
+        return [[a + b for a, b in zip(datos[0], otros[0])], datos[1] + otros[1]]
+
+    def exportar(self, series, pid=None):
+        lineas = []
+        for valores, (conteos, suma) in series.items():
+            nombres, valores = _con_pid(self.etiquetas, valores, pid)
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + (float('inf'),), conteos):
+                acumulado += conteo
+                etiquetas = _formatear_etiquetas(nombres, valores, [('le', _formatear_numero(limite))])
+                lineas.append(f'{self.nombre}_bucket{etiquetas} {_formatear_numero(acumulado)}')
+            etiquetas = _formatear_etiquetas(nombres, valores)
+            lineas.append(f'{self.nombre}_count{etiquetas} {_formatear_numero(acumulado)}')
+            lineas.append(f'{self.nombre}_sum{etiquetas} {_formatear_numero(suma)}')
+        return lineas
+
+
+_metricas = []
+
+
+def _exportar_registro_minimo(series_por_metrica=None, pid=None):
+    """
+    Args:
+        series_por_metrica: {nombre: series} a exportar; por defecto las de este proceso
+        pid: Etiqueta pid para las series (None si son la suma de los workers)
+    """
+    lineas = []
+    for metrica in _metricas:
+        series = metrica.series() if series_por_metrica is None else series_por_metrica.get(metrica.nombre, {})
+        # Igual que prometheus_client: los contadores se declaran con el sufijo _total
+        nombre = f'{metrica.nombre}_total' if metrica.tipo == 'counter' else metrica.nombre
+        lineas.append(f'# HELP {nombre} {metrica.ayuda}')
+        lineas.append(f'# TYPE {nombre} {metrica.tipo}')
+        lineas.extend(metrica.exportar(series, pid))
+    return ('\n'.join(lineas) + '\n').encode('utf-8')
+
+
+# --- Volcado al directorio compartido (sin prometheus_client) ---------------
+
+# 'activo' se pone en True al primer evento del proceso (o si no hace falta volcar);
+# así los procesos que no registran nada (p. ej. los del pool de parseo) no escriben
+_volcado = {'activo': False, 'lock': threading.Lock(), 'archivo': None}
+
+
+def _archivo_volcado(directorio):
+    """
+    Archivo de este proceso; el instante de inicio evita que un pid reutilizado
+    reemplace el archivo de un worker terminado (sus contadores retrocederían)
+    """
+    if _volcado['archivo'] is None:
+        _volcado['archivo'] = os.path.join(directorio, f'opav_{os.getpid()}_{time.time_ns()}.json')
+    return _volcado['archivo']
+
+
+def _volcar(directorio):
+    """Escribe los valores acumulados de este proceso (reemplazo atómico del archivo)"""
+    ruta = _archivo_volcado(directorio)
+    contenido = {
+        metrica.nombre: [[list(valores), datos] for valores, datos in metrica.series().items()]
+        for metrica in _metricas
+    }
+    temporal = f'{ruta}.tmp'
+    with open(temporal, 'w', encoding='utf-8') as archivo:
+        json.dump(contenido, archivo)
+    os.replace(temporal, ruta)
+
+
+def _volcar_sin_fallar(directorio):
+    try:
+        _volcar(directorio)
+    except Exception as e:
+        logger.warning(f"No se pudieron volcar las métricas en {directorio}: {str(e)}")
+
+
+def _bucle_volcado(directorio):
+    while True:
+        time.sleep(INTERVALO_VOLCADO_SEGUNDOS)
+        _volcar_sin_fallar(directorio)
+
+
+def _iniciar_volcado():
+    """Arranca (una vez por proceso) el hilo que vuelca los valores al directorio compartido"""
+    with _volcado['lock']:
+        if _volcado['activo']:
+            return
+        _volcado['activo'] = True
+        directorio = directorio_multiproceso()
+        if prometheus_client is not None or directorio is None:
+            return
+        threading.Thread(target=_bucle_volcado, args=(directorio,), name='metricas-volcado', daemon=True).start()
+        atexit.register(_volcar_sin_fallar, directorio)
+
+
+def _reiniciar_en_hijo():
+    """
+    Tras un fork (gunicorn con preload, pools de procesos) el hijo no hereda los
+    valores del padre, que ya los vuelca en su propio archivo, ni su hilo de volcado
+    """
+    _volcado['activo'] = False
+    _volcado['lock'] = threading.Lock()
+    _volcado['archivo'] = None
+    for metrica in _metricas:
+        metrica._reiniciar()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_en_hijo)
+
+
+def _leer_volcados(directorio):
+    """
+    Returns:
+        dict: {nombre: series} con la suma de los archivos de todos los workers
+    """
+    por_nombre = {metrica.nombre: metrica for metrica in _metricas}
+    suma = {nombre: {} for nombre in por_nombre}
+    for ruta in glob.glob(os.path.join(directorio, 'opav_*.json')):
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                contenido = json.load(archivo)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Se omite el archivo de métricas {ruta}: {str(e)}")
+            continue
+        for nombre, series in contenido.items():
+            metrica = por_nombre.get(nombre)
+            if metrica is None:
+                continue
+            destino = suma[nombre]
+            for valores, datos in series:
+                clave = tuple(valores)
+                destino[clave] = metrica.sumar(destino[clave], datos) if clave in destino else datos
+    return suma
+
+
+# --- Definición de métricas ----------------------------------------------
+
+def _contador(nombre, ayuda, etiquetas=()):
+    if prometheus_client is not None:
+        return prometheus_client.Counter(nombre, ayuda, etiquetas)
+    return _Contador(nombre, ayuda, etiquetas)
+
+
+def _histograma(nombre, ayuda, etiquetas=(), buckets=BUCKETS_LOTE):
+    if prometheus_client is not None:
+        return prometheus_client.Histogram(nombre, ayuda, etiquetas, buckets=buckets)
+    return _Histograma(nombre, ayuda, etiquetas, buckets=buckets)
+
+
+FILAS_EXTRAIDAS = _contador('opav_filas_extraidas', 'Filas leídas del origen', ['tipo_origen'])
+FILAS_CARGADAS = _contador('opav_filas_cargadas', 'Filas insertadas en el destino', ['tipo_origen'])
+LOTE_INSERCION = _histograma(
+    'opav_lote_insercion_segundos', 'Duración de cada lote de inserción (executemany)', buckets=BUCKETS_LOTE
+)
+ESPERA_CONEXION = _histograma(
+    'opav_espera_conexion_segundos', 'Espera del checkout de una conexión del pool', buckets=BUCKETS_ESPERA
+)
+ESCRITURA_TRACKER = _histograma(
+    'opav_escritura_tracker_segundos', 'Duración de las escrituras de ProcessTracker en la base de logs',
+    ['modo'], buckets=BUCKETS_ESCRITURA
+)
+VISTA = _histograma('opav_vista_segundos', 'Latencia de las vistas instrumentadas', ['vista'], buckets=BUCKETS_VISTA)
+CACHE_CONSULTAS = _contador(
+    'opav_cache_consultas', 'Consultas a las cachés por resultado (acierto o fallo)', ['cache', 'resultado']
+)
+
+
+# --- API usada por la aplicación -----------------------------------------
+
+def filas_extraidas(tipo_origen, filas):
+    if filas:
+        FILAS_EXTRAIDAS.labels(tipo_origen or 'desconocido').inc(filas)
+
+
+def filas_cargadas(tipo_origen, filas):
+    if filas:
+        FILAS_CARGADAS.labels(tipo_origen or 'desconocido').inc(filas)
+
+
+def observar_lote_insercion(segundos):
+    LOTE_INSERCION.observe(segundos)
+
+
+def observar_espera_conexion(segundos):
+    ESPERA_CONEXION.observe(segundos)
+
+
+def observar_escritura_tracker(modo, segundos):
+    """modo: 'sincrono' (save por evento) o 'asincrono' (vaciado del TrackerSink)"""
+    ESCRITURA_TRACKER.labels(modo).observe(segundos)
+
+
+def consulta_cache(cache, acierto):
+    CACHE_CONSULTAS.labels(cache, 'acierto' if acierto else 'fallo').inc()
+
+
+def medir_vista(nombre):
+    """
+    Decorador que registra la latencia de una vista en opav_vista_segundos
+
+    Ejemplo:
+        @medir_vista('list_processes')
+        def list_processes(request):
+            ...
+    """
+    def decorator(view_func):
+        histograma = VISTA.labels(nombre)
+
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return view_func(request, *args, **kwargs)
+            finally:
+                histograma.observe(time.perf_counter() - inicio)
+        return wrapper
+    return decorator
+
+
+def multiproceso_activo():
+    """True si el endpoint suma los valores de todos los workers"""
+    return directorio_multiproceso() is not None
+
+
+def pid_serie():
+    """
+    Valor de la etiqueta pid de las series exportadas por este worker; None si
+    el endpoint suma los workers y las series no la llevan
+    """
+    return None if multiproceso_activo() else str(os.getpid())
+
+
+class _RegistroConPid:
+    """Registro de prometheus_client cuyas muestras llevan además la etiqueta pid"""
+
+    def __init__(self, registro, pid):
+        self.registro = registro
+        self.pid = pid
+
+    def collect(self):
+        for familia in self.registro.collect():
+            familia.samples = [
+                muestra._replace(labels={'pid': self.pid, **muestra.labels}) for muestra in familia.samples
+            ]
+            yield familia
+
+
+_advertencia_emitida = []
+
+
+def _advertir_sin_multiproceso():
+    if not _advertencia_emitida:
+        _advertencia_emitida.append(True)
+        logger.warning(
+            "PROMETHEUS_MULTIPROC_DIR no está definido: /metrics expone solo los valores del worker "
+            "que responde. Con varios workers de gunicorn los totales no son correctos; definir un "
+            "directorio compartido y vacío al arrancar."
+        )
+
+
+def marcar_worker_terminado(pid):
+    """
+    Para el hook child_exit de gunicorn: descarta los valores en vivo del worker
+    que terminó (los contadores se conservan)
+    """
+    if multiproceso_activo() and prometheus_client is not None:
+        multiprocess.mark_process_dead(pid)
+
+
+def exportar():
+    """
+    Returns:
+        Tuple[bytes, str]: (cuerpo en formato de texto de Prometheus, content type)
+    """
+    directorio = directorio_multiproceso()
+    if directorio is None:
+        _advertir_sin_multiproceso()
+
+    if prometheus_client is None:
+        if directorio is None:
+            return _exportar_registro_minimo(pid=pid_serie()), CONTENT_TYPE
+        # Los valores de este worker al día; los demás, con hasta INTERVALO_VOLCADO_SEGUNDOS de atraso
+        if _volcado['activo']:
+            _volcar_sin_fallar(directorio)
+        return _exportar_registro_minimo(_leer_volcados(directorio)), CONTENT_TYPE
+
+    if directorio is not None:
+        registro = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = _RegistroConPid(prometheus_client.REGISTRY, pid_serie())
+    return prometheus_client.generate_latest(registro), prometheus_client.CONTENT_TYPE_LATEST
@@ -0,0 +1,92 @@
+"""
+Buffer de registros de MigrationLog durante una ejecución
+
+MigrationLog.log hacía un INSERT por mensaje de etapa contra la base de datos de
+la aplicación. Mientras MigrationProcess.run() está en curso, los registros de
+ese proceso se acumulan aquí y se escriben con bulk_create:
+
+- el primero de la ejecución, en el momento: list_processes muestra la ejecución
+  en curso a partir del último registro del proceso,
+- al llegar a settings.MIGRATION_LOG_BUFFER_SIZE registros pendientes,
+- al terminar la ejecución (run() llama a vaciar() en su finally).
+
+Los niveles de ERRORES_INMEDIATOS se escriben en el momento junto con lo
+pendiente, para que un fallo quede registrado aunque el proceso muera después.
+No se vacía al cambiar de etapa: cada etapa de una ejecución registra uno o dos
+mensajes, así que eso volvía a ser casi un INSERT por mensaje.
+La hora de cada registro es la del evento, no la de la escritura.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger('migration_log_buffer')
+
+DEFAULT_MIGRATION_LOG_BUFFER_SIZE = 500
+
+# Niveles que se escriben sin esperar al final de la ejecución
+ERRORES_INMEDIATOS = ('error', 'critical')
+
+
+class MigrationLogBuffer:
+    """
+    Registros de MigrationLog pendientes de una ejecución
+
+    Uso:
+        buffer = MigrationLogBuffer()
+        process._log_buffer = buffer   # MigrationLog.log agrega aquí
+        ...
+        buffer.vaciar()
+    """
+
+    def __init__(self, maximo=None):
+        if maximo is None:
+            from django.conf import settings
+            maximo = getattr(settings, 'MIGRATION_LOG_BUFFER_SIZE', DEFAULT_MIGRATION_LOG_BUFFER_SIZE)
+        self.maximo = maximo
+        self._pendientes = []
+        self._lock = threading.Lock()
+        self.stats = {'registros': 0, 'escrituras': 0, 'errores': 0}
+
+    def agregar(self, registro):
+        """
+        Agrega un MigrationLog sin guardar; vacía si es el primero de la
+        ejecución, un error o se llenó el buffer
+        """
+        with self._lock:
+            self._pendientes.append(registro)
+            self.stats['registros'] += 1
+            primero = self.stats['registros'] == 1
+            lleno = len(self._pendientes) >= self.maximo
+        if primero or lleno or registro.level in ERRORES_INMEDIATOS:
+            self.vaciar()
+        return registro
+
+    def vaciar(self):
+        """Escribe lo pendiente con un solo bulk_create"""
+        from .models import MigrationLog
+
+        with self._lock:
+            lote, self._pendientes = self._pendientes, []
+        if not lote:
+            return 0
+
+        try:
+            MigrationLog.objects.bulk_create(lote)
+        except Exception as e:
+            # Los registros de ejecución no deben tumbar la migración
+            with self._lock:
+                self.stats['errores'] += 1
+            logger.error(f"Se descartan {len(lote)} registros de MigrationLog: {str(e)}")
+            return 0
+
+        with self._lock:
+            self.stats['escrituras'] += 1
+        return len(lote)
+
+    def estadisticas(self):
+        """Registros recibidos, escrituras (bulk_create), errores y pendientes"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['pendientes'] = len(self._pendientes)
+        return stats
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automatizacion', '0007_migrationprocess_column_mappings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='migrationprocess',
+            name='load_strategy',
+            field=models.CharField(choices=[('replace', 'Reemplazar (eliminar y recrear la tabla)'), ('staging_swap', 'Tabla staging con intercambio atómico')], default='replace', max_length=20),
+        ),
+    ]
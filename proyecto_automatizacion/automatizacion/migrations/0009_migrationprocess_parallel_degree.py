@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automatizacion', '0008_migrationprocess_load_strategy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='migrationprocess',
+            name='parallel_degree',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.23 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automatizacion', '0009_migrationprocess_parallel_degree'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='migrationprocess',
+            name='extraction_mode',
+            field=models.CharField(choices=[('full', 'Completa (todas las filas en cada ejecución)'), ('incremental', 'Incremental por marca de agua')], default='full', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='migrationprocess',
+            name='watermark_column',
+            field=models.CharField(blank=True, max_length=128, null=True),
+        ),
+        migrations.AddField(
+            model_name='migrationprocess',
+            name='watermark_state',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
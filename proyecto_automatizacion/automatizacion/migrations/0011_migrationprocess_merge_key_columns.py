@@ -0,0 +1,23 @@
+# Generated by Django 4.2.23 on 2026-10-17 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automatizacion', '0010_migrationprocess_incremental_extraction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='migrationprocess',
+            name='merge_key_columns',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='migrationprocess',
+            name='load_strategy',
+            field=models.CharField(choices=[('replace', 'Reemplazar (eliminar y recrear la tabla)'), ('staging_swap', 'Tabla staging con intercambio atómico'), ('merge', 'Combinar (MERGE por columnas clave)')], default='replace', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-17 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automatizacion', '0011_migrationprocess_merge_key_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='migrationprocess',
+            name='sheet_workers',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.23 on 2026-10-17 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automatizacion', '0012_migrationprocess_sheet_workers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasource',
+            name='analysis_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pendiente'), ('running', 'Analizando'), ('completed', 'Completado'), ('failed', 'Fallido')], max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='datasource',
+            name='analysis_progress',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='datasource',
+            name='analysis_metadata',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='datasource',
+            name='analysis_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='datasource',
+            name='analyzed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
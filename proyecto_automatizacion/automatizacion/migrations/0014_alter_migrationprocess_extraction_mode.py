@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-17 15:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automatizacion', '0013_datasource_analysis'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='migrationprocess',
+            name='extraction_mode',
+            field=models.CharField(choices=[('full', 'Completa (todas las filas en cada ejecución)'), ('incremental', 'Incremental por marca de agua'), ('tail', 'Solo filas agregadas al final (CSV que solo crece)')], default='full', max_length=20),
+        ),
+    ]
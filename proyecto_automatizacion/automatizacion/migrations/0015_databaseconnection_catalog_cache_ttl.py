@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-17 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automatizacion', '0014_alter_migrationprocess_extraction_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='databaseconnection',
+            name='catalog_cache_ttl',
+            field=models.PositiveIntegerField(blank=True, help_text='Segundos que se cachean bases de datos, tablas y columnas (vacío = CATALOG_CACHE_TTL, 0 = sin caché)', null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:42
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automatizacion', '0015_databaseconnection_catalog_cache_ttl'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='migrationlog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
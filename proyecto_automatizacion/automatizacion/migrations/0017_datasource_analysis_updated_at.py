@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-17 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automatizacion', '0016_alter_migrationlog_timestamp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasource',
+            name='analysis_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.db import models
 import json
 from django.utils import timezone
 
+from . import metrics
+
 class DataSourceType(models.Model):
     """
     Define el tipo de origen de datos (Excel, CSV, SQL Server)
@@ -28,6 +30,12 @@ class DatabaseConnection(models.Model):
     # Campo para almacenar todas las bases de datos disponibles
     available_databases = models.JSONField(null=True, blank=True)
     
+    # TTL de la caché de catálogo (ver catalog_cache)
+    catalog_cache_ttl = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text='Segundos que se cachean bases de datos, tablas y columnas (vacío = CATALOG_CACHE_TTL, 0 = sin caché)'
+    )
+    
     def __str__(self):
         if self.selected_database:
             return f"{self.name} - {self.server}/{self.selected_database}"
@@ -55,14 +63,40 @@ class DataSource(models.Model):
         ('sql', 'SQL Server'),
     ]
     
+    ANALYSIS_STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('running', 'Analizando'),
+        ('completed', 'Completado'),
+        ('failed', 'Fallido'),
+    ]
+    
     name = models.CharField(max_length=255)
     source_type = models.CharField(max_length=20, choices=TYPE_CHOICES)
     file_path = models.CharField(max_length=255, blank=True, null=True)  # Solo para archivos
     connection = models.ForeignKey(DatabaseConnection, on_delete=models.SET_NULL, null=True, blank=True)  # Solo para SQL
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Pre-análisis en segundo plano de archivos subidos (hojas, columnas, tipos, filas)
+    analysis_status = models.CharField(max_length=20, choices=ANALYSIS_STATUS_CHOICES, blank=True, null=True)
+    analysis_progress = models.PositiveSmallIntegerField(default=0)
+    analysis_metadata = models.JSONField(null=True, blank=True)
+    analysis_error = models.TextField(blank=True, null=True)
+    analyzed_at = models.DateTimeField(null=True, blank=True)
+    analysis_updated_at = models.DateTimeField(null=True, blank=True)  # último avance del análisis
+    
     def __str__(self):
         return f"{self.name} ({self.get_source_type_display()})"
+    
+    def get_analysis_metadata(self):
+        """
+        Metadatos del pre-análisis si ya terminó
+        
+        Returns:
+            dict|None: {'sheets': [...], 'sheets_data': {...}} o None si no hay análisis completo
+        """
+        if self.analysis_status == 'completed' and self.analysis_metadata:
+            return self.analysis_metadata
+        return None
 
 class MigrationProcess(models.Model):
     """
@@ -81,6 +115,23 @@ class MigrationProcess(models.Model):
         ('failed', 'Fallido'),
     ]
     
+    LOAD_STRATEGY_CHOICES = [
+        ('replace', 'Reemplazar (eliminar y recrear la tabla)'),
+        ('staging_swap', 'Tabla staging con intercambio atómico'),
+        ('merge', 'Combinar (MERGE por columnas clave)'),
+    ]
+    
+    EXTRACTION_MODE_CHOICES = [
+        ('full', 'Completa (todas las filas en cada ejecución)'),
+        ('incremental', 'Incremental por marca de agua'),
+        ('tail', 'Solo filas agregadas al final (CSV que solo crece)'),
+    ]
+    
+    # Máximo de conexiones de lectura simultáneas por tabla SQL
+    MAX_PARALLEL_DEGREE = 16
+    # Máximo de procesos para parsear hojas de Excel
+    MAX_SHEET_WORKERS = 16
+    
     name = models.CharField(max_length=255, unique=True)
     description = models.TextField(blank=True, null=True)
     source = models.ForeignKey(DataSource, on_delete=models.CASCADE, related_name='processes')
@@ -100,6 +151,15 @@ class MigrationProcess(models.Model):
     target_db_name = models.CharField(max_length=100, default='DestinoAutomatizacion')
     target_db_connection = models.ForeignKey(DatabaseConnection, on_delete=models.SET_NULL, null=True, blank=True, related_name='target_processes')
     target_table = models.CharField(max_length=100, blank=True, null=True)  # Tabla de destino
+    load_strategy = models.CharField(max_length=20, choices=LOAD_STRATEGY_CHOICES, default='replace')  # Cómo se publica cada tabla destino
+    merge_key_columns = models.JSONField(null=True, blank=True)  # Dict de columnas clave para MERGE: {'tabla': ['col1', 'col2']}
+    parallel_degree = models.PositiveSmallIntegerField(default=1)  # Conexiones de lectura en paralelo por tabla SQL (1 = secuencial)
+    sheet_workers = models.PositiveSmallIntegerField(default=1)  # Procesos para parsear hojas de Excel en paralelo (1 = secuencial)
+    
+    # Extracción incremental
+    extraction_mode = models.CharField(max_length=20, choices=EXTRACTION_MODE_CHOICES, default='full')
+    watermark_column = models.CharField(max_length=128, blank=True, null=True)  # Fecha de modificación, identidad o rowversion
+    watermark_state = models.JSONField(null=True, blank=True)  # {'tabla/hoja': {'tipo': ..., 'valor': ...}} última marca cargada
     
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -118,14 +178,20 @@ class MigrationProcess(models.Model):
         Ejecuta el proceso de migración guardado - PROCESA DATOS REALES DEL ORIGEN
         ✅ CORREGIDO: Usa ProcessTracker para generar IDs consistentes entre ProcesoLog y tabla dinámica
         """
-        from .data_transfer_service import data_transfer_service
         from .logs.process_tracker import ProcessTracker
+        from .migration_log_buffer import MigrationLogBuffer
+        from .run_timeline import RunTimeline
         import json
         
         self.status = 'running'
         self.last_run = timezone.now()
         self.save()
         
+        # Registros de MigrationLog de la ejecución: se escriben en bloque por etapa
+        self._log_buffer = MigrationLogBuffer()
+        # Tiempos por etapa de cada hoja/tabla (se guardan en el registro final)
+        self._timeline = RunTimeline()
+        
         # Crear log de inicio del proceso
         MigrationLog.log(
             process=self,
@@ -156,6 +222,10 @@ class MigrationProcess(models.Model):
             # NUEVA LÓGICA: Procesar según tipo de fuente
             tiempo_inicio = timezone.now()
             
+            # Conexiones al destino reutilizadas entre hojas/tablas durante toda la ejecución
+            from .destination_session import DestinationSession
+            self._sesion_destino = DestinationSession(self.name)
+            
             if self.source.source_type == 'excel':
                 # EXCEL: Procesar cada hoja por separado con tabla independiente
                 success, result_info = self._process_excel_sheets_individually(tracker, proceso_id, tiempo_inicio, parametros_proceso)
@@ -163,74 +233,20 @@ class MigrationProcess(models.Model):
                 # SQL: Procesar cada tabla por separado con tabla independiente
                 success, result_info = self._process_sql_tables_individually(tracker, proceso_id, tiempo_inicio, parametros_proceso)
             else:
-                # CSV: Usar lógica original (una sola tabla)
-                datos_origen = self._extract_source_data()
-                tiempo_fin = timezone.now()
-                duracion_extraccion = (tiempo_fin - tiempo_inicio).total_seconds()
-                
-                # Calcular estadísticas de los datos extraídos
-                registros_procesados = len(datos_origen) if isinstance(datos_origen, list) else 1
-                
-                # Crear log de extracción de datos
-                MigrationLog.log(
-                    process=self,
-                    stage='data_extraction',
-                    message=f'Datos extraídos de {self.source.source_type if self.source else "origen"}',
-                    level='info',
-                    rows=registros_procesados,
-                    duration=int(duracion_extraccion * 1000),
-                    user='sistema'
-                )
-                
-                # Actualizar estado del proceso
-                tracker.actualizar_estado('PROCESANDO_DATOS', 
-                    f'Extrayendo {registros_procesados} registros de {self.source.source_type if self.source else "origen"}')
-                
-                # Crear resumen de los datos procesados (NO los datos completos)
-                resumen_procesamiento = self._crear_resumen_datos(
-                    datos_origen, 
-                    duracion_extraccion, 
-                    registros_procesados
-                )
-                
-                # Preparar metadatos del proceso
-                metadata = {
-                    'migration_process_id': self.id,
-                    'process_name': self.name,
-                    'source_type': self.source.source_type if self.source else 'unknown',
-                    'source_id': self.source.id if self.source else None,
-                    'execution_timestamp': tiempo_inicio.isoformat(),
-                    'selected_tables': self.selected_tables,
-                    'selected_sheets': self.selected_sheets,
-                    'selected_columns': self.selected_columns,
-                    'target_db_name': self.target_db_name,
-                    'extraction_duration_seconds': duracion_extraccion
-                }
-                
-                # Actualizar estado antes de transferencia
-                tracker.actualizar_estado('TRANSFIRIENDO', 'Insertando datos en tabla dinámica')
-                
-                # Crear log de transferencia de datos
-                MigrationLog.log(
-                    process=self,
-                    stage='data_loading',
-                    message='Iniciando transferencia de datos a tabla dinámica',
-                    level='info',
-                    user='sistema'
-                )
-                
-                # CORRECCIÓN 3: Usar el mismo proceso_id del tracker en la transferencia
-                success, result_info = data_transfer_service.transfer_to_dynamic_table(
-                    process_name=self.name,
-                    proceso_id=proceso_id,  # ✅ Mismo UUID generado por ProcessTracker
-                    datos_procesados=resumen_procesamiento,
-                    usuario_responsable='sistema_automatizado',
-                    metadata=metadata,
-                    recreate_table=True,  # Cada ejecución limpia y recrea los datos
-                    estado_proceso='COMPLETADO',
-                    tipo_operacion=f'MIGRACION_{self.name.upper().replace(" ", "_")}',
-                    registros_afectados=registros_procesados
-                )
+                # CSV: Lectura por bloques hacia una tabla destino tipada
+                success, result_info = self._process_csv_file(tracker, proceso_id, tiempo_inicio, parametros_proceso)
+            
+            resumen_sesion = self._sesion_destino.resumen()
+            result_info['sesion_destino'] = resumen_sesion
+            print(f"🔌 Conexiones destino: {resumen_sesion['checkouts']} checkouts, "
+                  f"{resumen_sesion['conexiones_nuevas']} nuevas, espera total {resumen_sesion['espera_total_ms']} ms")
+            
+            resumen_timeline = self._timeline.resumen()
+            result_info['timeline'] = resumen_timeline
+            print("⏱️ Tiempos por etapa: " + ", ".join(
+                f"{etapa['etiqueta']} {etapa['segundos']:.2f}s ({etapa['porcentaje']}%)"
+                for etapa in resumen_timeline['por_etapa']
+            ))
             
             if success:
                 self.status = 'completed'
@@ -252,6 +268,7 @@ class MigrationProcess(models.Model):
                         level='success',
                         rows=total_registros,
                         duration=int(duracion_total * 1000),
+                        details=self._detalles_timeline(),
                         user='sistema'
                     )
                     
@@ -282,6 +299,7 @@ class MigrationProcess(models.Model):
                         level='success',
                         rows=total_registros,
                         duration=int(duracion_total * 1000),
+                        details=self._detalles_timeline(),
                         user='sistema'
                     )
                     
@@ -302,7 +320,7 @@ class MigrationProcess(models.Model):
                     # CSV: Una sola tabla
                     table_name = result_info.get('table_name', 'Desconocida')
                     resultado_id = result_info.get('resultado_id', 'N/A')
-                    registros_procesados = len(datos_origen) if 'datos_origen' in locals() and isinstance(datos_origen, list) else 1
+                    registros_procesados = result_info.get('records_inserted', 0)
                     
                     detalles_exito = f"Tabla: {table_name}, ResultadoID: {resultado_id}, Registros: {registros_procesados}"
                     
@@ -313,6 +331,7 @@ class MigrationProcess(models.Model):
                         message=detalles_exito,
                         level='success',
                         rows=registros_procesados,
+                        details=self._detalles_timeline(),
                         user='sistema'
                     )
                     
@@ -353,6 +372,7 @@ class MigrationProcess(models.Model):
                     message='Error durante la transferencia de datos',
                     level='error',
                     error=error_completo,
+                    details=self._detalles_timeline(),
                     user='sistema'
                 )
                 
@@ -370,6 +390,7 @@ class MigrationProcess(models.Model):
                 message='Error general durante la ejecución del proceso',
                 level='critical',
                 error=str(e),
+                details=self._detalles_timeline(),
                 user='sistema'
             )
             
@@ -379,8 +400,85 @@ class MigrationProcess(models.Model):
             print(f"❌ Error ejecutando proceso {self.name}: {str(e)}")
             raise e
         finally:
+            # Registros de ProcessTracker pendientes (modo asíncrono) al terminar la ejecución
+            if 'tracker' in locals():
+                tracker.vaciar()
+            sesion_destino = getattr(self, '_sesion_destino', None)
+            if sesion_destino is not None:
+                sesion_destino.cerrar()
+                self._sesion_destino = None
+            log_buffer = getattr(self, '_log_buffer', None)
+            if log_buffer is not None:
+                log_buffer.vaciar()
+                self._log_buffer = None
+            self._timeline = None
             self.save()
     
+    def _detalles_timeline(self):
+        """details del registro final de la ejecución con la línea de tiempo por etapas"""
+        timeline = getattr(self, '_timeline', None)
+        if not timeline:
+            return None
+        return {'timeline': timeline.resumen()}
+    
+    def _span(self, etapa, objetivo=None, filas=0, bytes=0):
+        """
+        Mide un bloque como etapa de la hoja/tabla `objetivo` (ver run_timeline);
+        fuera de run() no registra nada
+        """
+        from contextlib import nullcontext
+        
+        timeline = getattr(self, '_timeline', None)
+        if timeline is None:
+            return nullcontext({'filas': filas, 'bytes': bytes})
+        return timeline.span(etapa, objetivo, filas=filas, bytes=bytes)
+    
+    def _registrar_span(self, etapa, objetivo=None, segundos=0.0, filas=0, bytes=0):
+        """Agrega a la línea de tiempo una medición ya tomada"""
+        timeline = getattr(self, '_timeline', None)
+        if timeline is not None:
+            timeline.registrar(etapa, objetivo, segundos, filas=filas, bytes=bytes)
+    
+    def _medir_lectura(self, lotes, objetivo):
+        """
+        Recorre un iterable de lotes (DataFrames o listas de filas) registrando el
+        tiempo que tarda en llegar cada uno como etapa de lectura del objetivo
+        """
+        import time
+        import pandas as pd
+        from .run_timeline import bytes_dataframe
+        
+        iterador = iter(lotes)
+        try:
+            while True:
+                desde = time.perf_counter()
+                try:
+                    lote = next(iterador)
+                except StopIteration:
+                    return
+                self._registrar_span(
+                    'lectura', objetivo, time.perf_counter() - desde, filas=len(lote),
+                    bytes=bytes_dataframe(lote) if isinstance(lote, pd.DataFrame) else 0
+                )
+                metrics.filas_extraidas(self.source.source_type, len(lote))
+                yield lote
+        finally:
+            # Cerrar el iterador de origen (pools de procesos, cursores) aunque se corte antes
+            cerrar = getattr(iterador, 'close', None)
+            if cerrar is not None:
+                cerrar()
+    
+    def _registrar_spans_escritura(self, objetivo, estadisticas_insercion, bytes=0):
+        """Materialización de filas e inserción medidas por BulkWriter (y filas cargadas en las métricas)"""
+        if not estadisticas_insercion:
+            return
+        filas = estadisticas_insercion['registros_insertados']
+        metrics.filas_cargadas(self.source.source_type, filas)
+        self._registrar_span('materializacion', objetivo,
+                             estadisticas_insercion.get('segundos_materializacion', 0.0), filas=filas, bytes=bytes)
+        self._registrar_span('insercion', objetivo,
+                             estadisticas_insercion['segundos_insercion'], filas=filas, bytes=bytes)
+    
     def _crear_resumen_datos(self, datos_origen, duracion_extraccion, registros_procesados):
         """
         Crea un resumen JSON de los datos procesados en lugar de guardar todos los datos
@@ -500,8 +598,28 @@ class MigrationProcess(models.Model):
                 return {'error': 'No hay hojas seleccionadas'}
             
             data = []
+            # Leer cada hoja desde la caché columnar o, si no está, desde el libro abierto
+            # una sola vez: descompresión y shared strings se procesan una vez por archivo
+            from . import file_cache
+            
+            libros = []
+            
+            def parsear(sheet_name):
+                if not libros:
+                    libros.append(pd.ExcelFile(self.source.file_path))
+                return libros[0].parse(sheet_name)
+            
+            try:
+                hojas = {
+                    sheet_name: file_cache.obtener_hoja(self.source.file_path, sheet_name, lambda: parsear(sheet_name))
+                    for sheet_name in selected_sheets
+                }
+            finally:
+                for libro in libros:
+                    libro.close()
+            
             for sheet_name in selected_sheets:
-                df = pd.read_excel(self.source.file_path, sheet_name=sheet_name)
+                df = hojas.pop(sheet_name)
                 
                 # Filtrar columnas si están especificadas
                 if self.selected_columns:
@@ -532,8 +650,10 @@ class MigrationProcess(models.Model):
         """
         from .data_transfer_service import data_transfer_service
         from .logs.process_tracker import ProcessTracker
+        from .run_timeline import bytes_dataframe
         import pandas as pd
         import json
+        import time
         import logging
         
         # Configurar logging a archivo
@@ -584,9 +704,22 @@ class MigrationProcess(models.Model):
             
             main_tracker.actualizar_estado('PROCESANDO_HOJAS', f'Procesando {len(selected_sheets)} hojas de Excel por separado')
             
+            # Hojas parseadas una a una desde el libro abierto una vez, o en un pool de
+            # procesos si sheet_workers > 1; cada hoja se consume en cuanto está lista
+            hojas_leidas = self._iter_excel_sheets(selected_sheets)
+            
             # PROCESAR CADA HOJA POR SEPARADO
-            for sheet_name in selected_sheets:
+            marca_lectura = time.perf_counter()
+            for sheet_name, df_hoja, error_lectura in hojas_leidas:
                 hoja_inicio = timezone.now()
+                # Lectura de la hoja completa: lo que tardó en llegar desde el libro o el pool
+                # (las hojas grandes por bloques se miden al recorrer cada bloque)
+                if isinstance(df_hoja, pd.DataFrame):
+                    self._registrar_span(
+                        'lectura', sheet_name, time.perf_counter() - marca_lectura,
+                        filas=len(df_hoja), bytes=bytes_dataframe(df_hoja)
+                    )
+                    metrics.filas_extraidas('excel', len(df_hoja))
                 logger.info(f"🚀 Procesando hoja Excel: '{sheet_name}'")
                 print(f"🚀 Procesando hoja Excel: '{sheet_name}'")
                 
@@ -607,36 +740,8 @@ class MigrationProcess(models.Model):
                     proceso_id_hoja = tracker_hoja.iniciar(parametros_hoja)
                     
                     # 2. Extraer datos específicos de esta hoja
-                    print(f"📊 DEBUG: Leyendo hoja '{sheet_name}' desde {self.source.file_path}")
-                    df = pd.read_excel(self.source.file_path, sheet_name=sheet_name)
-                    print(f"📊 DEBUG: Hoja leída. Shape original: {df.shape}, Columnas: {list(df.columns)}")
-                    
-                    # Aplicar limpieza de datos (nombres de columnas y valores NaN)
-                    df = self._clean_excel_dataframe(df)
-                    print(f"📊 DEBUG: Después de limpieza. Shape: {df.shape}, Columnas: {list(df.columns)}")
-                    
-                    # Filtrar columnas si están especificadas para esta hoja
-                    if self.selected_columns:
-                        selected_cols = (self.selected_columns.get(sheet_name, []) if isinstance(self.selected_columns, dict) 
-                                       else json.loads(self.selected_columns).get(sheet_name, [])) if self.selected_columns else []
-                        print(f"📊 DEBUG: Columnas seleccionadas para '{sheet_name}': {selected_cols}")
-                        if selected_cols:
-                            df = df[selected_cols]
-                            print(f"📊 DEBUG: Después de filtrar columnas. Shape: {df.shape}, Columnas: {list(df.columns)}")
-                    
-                    # Convertir a diccionarios para transferencia
-                    datos_hoja = df.to_dict('records')
-                    registros_hoja = len(datos_hoja)
-                    print(f"📊 DEBUG: Datos convertidos. Registros: {registros_hoja}")
-                    
-                    tracker_hoja.actualizar_estado('EXTRAYENDO_DATOS', f'Extraídos {registros_hoja} registros de la hoja {sheet_name}')
-                    
-                    # 3. Calcular duración de procesamiento
-                    hoja_fin = timezone.now()
-                    duracion_hoja = (hoja_fin - hoja_inicio).total_seconds()
-                    
-                    # 4. Transferir DATOS REALES de esta hoja a su tabla individual
-                    tracker_hoja.actualizar_estado('TRANSFIRIENDO', f'Creando tabla individual para hoja {sheet_name}')
+                    if error_lectura:
+                        raise error_lectura
                     
                     # Generar nombre de tabla con nomenclatura dinámica: Proceso_Hoja
                     nombre_tabla_destino = f"{self.name}_{sheet_name}".replace(' ', '_').replace('-', '_')
@@ -645,14 +750,62 @@ class MigrationProcess(models.Model):
                     nombre_tabla_destino = re.sub(r'[^\w]', '_', nombre_tabla_destino)
                     nombre_tabla_destino = re.sub(r'_+', '_', nombre_tabla_destino).strip('_')
                     
-                    # ✅ GUARDAR DATOS REALES DEL DATAFRAME (NO METADATOS)
-                    success_hoja, result_info_hoja = self._save_dataframe_to_destination(
-                        df_datos=df,  # DataFrame con los datos reales
-                        nombre_tabla_destino=nombre_tabla_destino,  # Nombre dinámico de la tabla
-                        proceso_id=proceso_id_hoja,
-                        usuario_responsable='sistema_automatizado',
-                        source_table_name=sheet_name  # Pasar nombre de hoja para aplicar mapeos
-                    )
+                    # Estado de la extracción incremental de la hoja (marca anterior, nueva y estrategia)
+                    estado_incremental = self._init_excel_incremental(sheet_name)
+                    
+                    if isinstance(df_hoja, pd.DataFrame):
+                        print(f"📊 DEBUG: Hoja leída. Shape original: {df_hoja.shape}, Columnas: {list(df_hoja.columns)}")
+                        
+                        # Limpieza, columnas seleccionadas y filtro incremental
+                        df = self._prepare_excel_block(df_hoja, sheet_name, estado_incremental)
+                        registros_hoja = len(df)
+                        print(f"📊 DEBUG: Hoja preparada. Shape: {df.shape}, Columnas: {list(df.columns)}")
+                        
+                        tracker_hoja.actualizar_estado('EXTRAYENDO_DATOS', f'Extraídos {registros_hoja} registros de la hoja {sheet_name}')
+                        
+                        # 3. Calcular duración de procesamiento
+                        hoja_fin = timezone.now()
+                        duracion_hoja = (hoja_fin - hoja_inicio).total_seconds()
+                        
+                        # 4. Transferir DATOS REALES de esta hoja a su tabla individual
+                        tracker_hoja.actualizar_estado('TRANSFIRIENDO', f'Creando tabla individual para hoja {sheet_name}')
+                        
+                        # ✅ GUARDAR DATOS REALES DEL DATAFRAME (NO METADATOS)
+                        success_hoja, result_info_hoja = self._save_dataframe_to_destination(
+                            df_datos=df,  # DataFrame con los datos reales
+                            nombre_tabla_destino=nombre_tabla_destino,  # Nombre dinámico de la tabla
+                            proceso_id=proceso_id_hoja,
+                            usuario_responsable='sistema_automatizado',
+                            source_table_name=sheet_name,  # Pasar nombre de hoja para aplicar mapeos
+                            load_strategy=estado_incremental['estrategia']
+                        )
+                    else:
+                        # Hoja grande: se lee, limpia y escribe por bloques con memoria acotada
+                        tracker_hoja.actualizar_estado('TRANSFIRIENDO', f'Transfiriendo hoja {sheet_name} por bloques')
+                        bloques = (
+                            self._prepare_excel_block(bloque, sheet_name, estado_incremental)
+                            for bloque in self._medir_lectura(df_hoja, sheet_name)
+                        )
+                        primer_bloque = next(bloques)
+                        success_hoja, result_info_hoja = self._save_dataframe_chunks_to_destination(
+                            primer_bloque=primer_bloque,
+                            bloques=bloques,
+                            nombre_tabla_destino=nombre_tabla_destino,
+                            proceso_id=proceso_id_hoja,
+                            usuario_responsable='sistema_automatizado',
+                            source_table_name=sheet_name,
+                            load_strategy=estado_incremental['estrategia'],
+                            enteros_exactos=False
+                        )
+                        registros_hoja = result_info_hoja.get('records_read', 0)
+                        duracion_hoja = (timezone.now() - hoja_inicio).total_seconds()
+                    
+                    marca_nueva_hoja = estado_incremental['marca_nueva']
+                    if success_hoja and marca_nueva_hoja is not None:
+                        self._save_watermark(sheet_name, marca_nueva_hoja)
+                    if success_hoja and result_info_hoja.get('estadisticas_merge'):
+                        tracker_hoja.registrar_merge(nombre_tabla_destino, result_info_hoja['estadisticas_merge'])
+                        main_tracker.estadisticas_merge[nombre_tabla_destino] = result_info_hoja['estadisticas_merge']
                     
                     # DEBUG: Logging adicional para detectar el problema
                     # Debug logging removido para producción
@@ -740,6 +893,8 @@ class MigrationProcess(models.Model):
                     })
                     
                     print(f"❌ Error procesando hoja '{sheet_name}': {str(e_hoja)}")
+                finally:
+                    marca_lectura = time.perf_counter()
             
             # CONSOLIDAR RESULTADOS FINALES
             tiempo_fin_total = timezone.now()
@@ -769,6 +924,15 @@ class MigrationProcess(models.Model):
             # Actualizar estado del tracker principal
             if success_general:
                 estado_final = f"Excel procesado: {hojas_exitosas}/{len(selected_sheets)} hojas exitosas, {total_registros_procesados} registros totales"
+                if main_tracker.estadisticas_merge:
+                    resumen_merge = main_tracker.resumen_merge()
+                    result_info_consolidado['estadisticas_merge'] = resumen_merge
+                    estado_final += (f" (MERGE: {resumen_merge['insertados']} insertadas, "
+                                     f"{resumen_merge['actualizados']} actualizadas, "
+                                     f"{resumen_merge['sin_cambios']} sin cambios")
+                    if resumen_merge['duplicados']:
+                        estado_final += f", {resumen_merge['duplicados']} duplicadas descartadas"
+                    estado_final += ")"
                 main_tracker.actualizar_estado('COMPLETADO', estado_final)
                 
                 # Crear log de éxito para procesamiento Excel completo
@@ -826,6 +990,315 @@ class MigrationProcess(models.Model):
                 'hojas_con_error': len(selected_sheets) if 'selected_sheets' in locals() else 0,
                 'process_type': 'excel_multi_sheet_error'
             }
+        finally:
+            if 'hojas_leidas' in locals():
+                hojas_leidas.close()
+    
+    def _init_excel_incremental(self, sheet_name):
+        """
+        Estado inicial de la extracción incremental de una hoja
+        
+        Returns:
+            dict: activo, marca_anterior, marca_nueva y estrategia de carga
+        """
+        activo = self._is_incremental()
+        marca_anterior = self._get_watermark(sheet_name) if activo else None
+        return {
+            'activo': activo,
+            'marca_anterior': marca_anterior,
+            'marca_nueva': None,
+            'estrategia': self._incremental_load_strategy() if marca_anterior is not None else None,
+        }
+    
+    def _prepare_excel_block(self, df, sheet_name, estado_incremental):
+        """
+        Limpia un DataFrame (hoja completa o bloque), aplica las columnas seleccionadas
+        y el filtro incremental, acumulando la nueva marca de agua en estado_incremental
+        """
+        import json
+        from .watermark import filtrar_dataframe_por_marca
+        from .run_timeline import bytes_dataframe
+        
+        with self._span('limpieza', sheet_name, filas=len(df)) as tramo:
+            # Aplicar limpieza de datos (nombres de columnas y valores NaN)
+            df = self._clean_excel_dataframe(df)
+            
+            # Filtrar columnas si están especificadas para esta hoja
+            if self.selected_columns:
+                selected_cols = (self.selected_columns.get(sheet_name, []) if isinstance(self.selected_columns, dict) 
+                               else json.loads(self.selected_columns).get(sheet_name, [])) if self.selected_columns else []
+                if selected_cols:
+                    df = df[selected_cols]
+            tramo['bytes'] = bytes_dataframe(df)
+        
+        # Extracción incremental: solo filas posteriores a la marca de agua de la hoja
+        if estado_incremental['activo']:
+            if self.watermark_column not in df.columns:
+                print(f"⚠️ Columna de marca de agua '{self.watermark_column}' no existe en la hoja '{sheet_name}'; carga completa")
+                estado_incremental.update({'activo': False, 'marca_anterior': None, 'estrategia': None})
+                return df
+            
+            df, marca_bloque = filtrar_dataframe_por_marca(df, self.watermark_column, estado_incremental['marca_anterior'])
+            if marca_bloque is not None and (estado_incremental['marca_nueva'] is None or marca_bloque > estado_incremental['marca_nueva']):
+                estado_incremental['marca_nueva'] = marca_bloque
+        
+        return df
+    
+    def _iter_excel_sheets(self, selected_sheets):
+        """
+        Lee las hojas seleccionadas del archivo Excel de la fuente
+        
+        Con sheet_workers <= 1 el libro se abre una sola vez y las hojas se parsean
+        en orden; con más workers se parsean en un pool de procesos y se entregan
+        en el orden en que terminan.
+        
+        Yields:
+            Tuple[str, DataFrame|None, Exception|None]: (hoja, datos, error de lectura)
+        """
+        import pandas as pd
+        
+        workers = self.sheet_workers or 1
+        if workers > 1 and len(selected_sheets) > 1:
+            yield from self._iter_excel_sheets_parallel(selected_sheets, workers)
+            return
+        
+        # Abrir el libro una sola vez por ejecución (y solo si alguna hoja no está en la
+        # caché columnar): la estructura del archivo (zip, shared strings, estilos) se
+        # procesa una vez y cada hoja se lee desde aquí
+        from . import file_cache
+        
+        libro_excel = None
+        try:
+            for sheet_name in selected_sheets:
+                # La caché solo guarda hojas bajo el umbral de streaming: las grandes
+                # no se encuentran aquí y siguen a _stream_large_sheet
+                df = file_cache.leer_hoja(self.source.file_path, sheet_name)
+                if df is not None:
+                    print(f"📊 DEBUG: Hoja '{sheet_name}' leída desde caché columnar")
+                    yield sheet_name, df, None
+                    continue
+                
+                print(f"📊 DEBUG: Leyendo hoja '{sheet_name}' desde {self.source.file_path}")
+                try:
+                    if libro_excel is None:
+                        libro_excel = pd.ExcelFile(self.source.file_path)
+                    # Hojas muy grandes se entregan como iterador de bloques (memoria acotada)
+                    bloques = self._stream_large_sheet(libro_excel, sheet_name)
+                    if bloques is not None:
+                        df = bloques
+                    else:
+                        df = libro_excel.parse(sheet_name)
+                        file_cache.guardar_hoja(self.source.file_path, sheet_name, df)
+                except Exception as e:
+                    yield sheet_name, None, e
+                else:
+                    yield sheet_name, df, None
+        finally:
+            if libro_excel is not None:
+                libro_excel.close()
+    
+    def _iter_excel_sheets_parallel(self, selected_sheets, workers):
+        """
+        Variante de _iter_excel_sheets con pool de procesos
+        
+        Las hojas que superan EXCEL_STREAMING_MIN_ROWS no se envían al pool (un
+        trabajador las parsearía completas y las devolvería enteras al proceso
+        principal): se leen en streaming desde el libro abierto aquí, después de
+        las hojas del pool.
+        
+        Yields:
+            Tuple[str, DataFrame|iterator|None, Exception|None]: (hoja, datos, error de lectura)
+        """
+        import pandas as pd
+        from .excel_parallel import iterar_hojas_en_paralelo
+        
+        try:
+            libro_excel = pd.ExcelFile(self.source.file_path)
+        except Exception as e:
+            for sheet_name in selected_sheets:
+                yield sheet_name, None, e
+            return
+        
+        try:
+            grandes = {}
+            for sheet_name in selected_sheets:
+                try:
+                    bloques = self._stream_large_sheet(libro_excel, sheet_name)
+                except Exception:
+                    # El error se informa al leer la hoja en el pool
+                    bloques = None
+                if bloques is not None:
+                    grandes[sheet_name] = bloques
+            pequenas = [sheet_name for sheet_name in selected_sheets if sheet_name not in grandes]
+            
+            if len(pequenas) > 1:
+                print(f"⚡ Parseando {len(pequenas)} hojas en paralelo (hasta {workers} procesos)")
+                yield from iterar_hojas_en_paralelo(self.source.file_path, pequenas, workers)
+            elif pequenas:
+                try:
+                    df = libro_excel.parse(pequenas[0])
+                except Exception as e:
+                    yield pequenas[0], None, e
+                else:
+                    yield pequenas[0], df, None
+            
+            for sheet_name, bloques in grandes.items():
+                yield sheet_name, bloques, None
+        finally:
+            libro_excel.close()
+    
+    def _stream_large_sheet(self, libro_excel, sheet_name):
+        """
+        Si la hoja supera EXCEL_STREAMING_MIN_ROWS según su dimensión, devuelve un
+        iterador de DataFrames por bloques leídos en streaming desde el libro abierto
+        
+        Returns:
+            iterator|None: Bloques de la hoja, o None para leerla completa con pandas
+        """
+        from .excel_stream import iterar_bloques_hoja, filas_estimadas, EXCEL_STREAMING_MIN_ROWS
+        
+        if libro_excel.engine != 'openpyxl':
+            return None
+        
+        hoja = libro_excel.book[sheet_name]
+        filas = filas_estimadas(hoja)
+        if filas is None or filas < EXCEL_STREAMING_MIN_ROWS:
+            return None
+        
+        print(f"🌊 Hoja '{sheet_name}' con ~{filas:,} filas: lectura en streaming por bloques")
+        return iterar_bloques_hoja(hoja)
+    
+    def _get_csv_selection(self):
+        """
+        Columnas seleccionadas de un CSV. Se guardan como lista o como dict con una
+        sola clave (nombre lógico del CSV), que es también la clave de column_mappings.
+        
+        Returns:
+            Tuple[str, list]: (clave de origen, columnas seleccionadas o [] para todas)
+        """
+        import json
+        
+        seleccion = self.selected_columns
+        if isinstance(seleccion, str):
+            seleccion = json.loads(seleccion) if seleccion else []
+        
+        if isinstance(seleccion, dict) and seleccion:
+            clave = next(iter(seleccion))
+            return clave, seleccion[clave] or []
+        if isinstance(seleccion, list):
+            return 'csv_data', seleccion
+        return 'csv_data', []
+    
+    def _process_csv_file(self, tracker, proceso_id, tiempo_inicio, parametros_proceso):
+        """
+        Procesa un archivo CSV leyéndolo por bloques (rangos de bytes en un pool de
+        procesos si es grande; si no, pyarrow multihilo o el motor C de pandas) y
+        escribiendo cada bloque en una tabla destino tipada con el
+        mismo escritor masivo que Excel y SQL. La memoria queda acotada por el
+        tamaño del bloque, no por el del archivo.
+        
+        Returns:
+            Tuple[bool, Dict]: (éxito, información_resultado)
+        """
+        import re
+        from .utils import CSVProcessor
+        from .csv_parallel import usar_parseo_paralelo, workers_configurados, iterar_bloques_paralelo
+        from .csv_stream import motor_disponible
+        
+        if not self.source.file_path:
+            return False, {'success': False, 'error': 'No hay archivo CSV configurado', 'process_type': 'csv_file'}
+        
+        clave_origen, columnas = self._get_csv_selection()
+        
+        nombre_tabla_destino = re.sub(r'[^\w]', '_', self.name.replace(' ', '_').replace('-', '_'))
+        nombre_tabla_destino = re.sub(r'_+', '_', nombre_tabla_destino).strip('_')
+        
+        # Modo 'tail': solo los bytes agregados desde el último checkpoint
+        plan_cola = self._plan_csv_tail()
+        if plan_cola:
+            bytes_nuevos = plan_cola['fin'] - plan_cola['inicio']
+            if bytes_nuevos <= 0:
+                print(f"✅ CSV sin filas nuevas desde el último checkpoint")
+                return True, {
+                    'success': True,
+                    'table_name': nombre_tabla_destino,
+                    'records_inserted': 0,
+                    'records_read': 0,
+                    'proceso_id': proceso_id,
+                    'process_type': 'csv_file',
+                    'resultado_id': 'N/A',
+                    'duracion_total': (timezone.now() - tiempo_inicio).total_seconds(),
+                }
+            workers = workers_configurados() if usar_parseo_paralelo(self.source.file_path, bytes_nuevos) else 1
+            modo_lectura = f'de {bytes_nuevos:,} bytes desde el byte {plan_cola["inicio"]:,} ({workers} procesos)'
+        elif usar_parseo_paralelo(self.source.file_path):
+            modo_lectura = f'en paralelo por rangos de bytes ({workers_configurados()} procesos)'
+        else:
+            modo_lectura = f'por bloques (motor {motor_disponible()})'
+        
+        MigrationLog.log(
+            process=self,
+            stage='data_extraction',
+            message=f'Iniciando lectura del CSV {modo_lectura}',
+            level='info',
+            user='sistema'
+        )
+        tracker.actualizar_estado('TRANSFIRIENDO', f'Transfiriendo CSV por bloques a la tabla {nombre_tabla_destino}')
+        print(f"🌊 CSV '{self.source.file_path}': lectura {modo_lectura}")
+        
+        try:
+            if plan_cola:
+                bloques = iterar_bloques_paralelo(
+                    self.source.file_path, columnas, workers,
+                    inicio=plan_cola['inicio'], fin=plan_cola['fin']
+                )
+            else:
+                bloques = CSVProcessor(self.source.file_path).iter_data_chunks(columnas)
+            bloques = self._medir_lectura(bloques, clave_origen)
+            primer_bloque = next(bloques)
+        except Exception as e:
+            return False, {
+                'success': False,
+                'error': f'Error leyendo CSV: {str(e)}',
+                'table_name': nombre_tabla_destino,
+                'process_type': 'csv_file'
+            }
+        
+        success, result_info = self._save_dataframe_chunks_to_destination(
+            primer_bloque=primer_bloque,
+            bloques=bloques,
+            nombre_tabla_destino=nombre_tabla_destino,
+            proceso_id=proceso_id,
+            usuario_responsable='sistema_automatizado',
+            source_table_name=clave_origen,
+            load_strategy=plan_cola['load_strategy'] if plan_cola else None
+        )
+        bloques.close()
+        
+        if success and plan_cola:
+            self._save_csv_checkpoint(
+                plan_cola['fin'], plan_cola['filas_previas'] + result_info.get('records_read', 0)
+            )
+        
+        duracion = (timezone.now() - tiempo_inicio).total_seconds()
+        result_info.update({
+            'process_type': 'csv_file',
+            'resultado_id': result_info.get('resultado_id', 'N/A'),
+            'duracion_total': duracion,
+        })
+        
+        if success:
+            MigrationLog.log(
+                process=self,
+                stage='data_loading',
+                message=f"CSV transferido a '{nombre_tabla_destino}' en {result_info.get('lotes_lectura', 0)} bloques",
+                level='info',
+                rows=result_info.get('records_inserted', 0),
+                duration=int(duracion * 1000),
+                user='sistema'
+            )
+        
+        return success, result_info
     
     def _extract_csv_data(self):
         """Extrae datos de archivo CSV"""
@@ -836,7 +1309,10 @@ class MigrationProcess(models.Model):
             if not self.source.file_path:
                 return {'error': 'No hay archivo CSV configurado'}
             
-            df = pd.read_csv(self.source.file_path)
+            from . import file_cache
+            df = file_cache.obtener_hoja(
+                self.source.file_path, file_cache.HOJA_CSV, lambda: pd.read_csv(self.source.file_path)
+            )
             
             # Filtrar columnas si están especificadas
             if self.selected_columns:
@@ -858,148 +1334,403 @@ class MigrationProcess(models.Model):
         except Exception as e:
             return {'error': f'Error procesando CSV: {str(e)}'}
     
-    def _extract_sql_data(self):
-        """Extrae datos de base de datos SQL"""
-        from .utils import SQLServerConnector
+    def _get_selected_sql_tables_list(self):
+        """
+        Normaliza selected_tables a lista (acepta lista, JSON string o string simple)
+        """
         import json
-        import pyodbc
         
-        try:
-            if not self.source.connection:
-                return {'error': 'No hay conexión SQL configurada'}
+        if isinstance(self.selected_tables, list):
+            return self.selected_tables
+        if isinstance(self.selected_tables, str):
+            try:
+                # Intentar parsearlo como JSON array
+                return json.loads(self.selected_tables)
+            except json.JSONDecodeError:
+                # Si falla JSON parsing, tratarlo como string simple
+                return [self.selected_tables]
+        return self.selected_tables if self.selected_tables else []
+    
+    def _get_validated_sql_tables(self):
+        """
+        Obtiene las tablas SQL seleccionadas que existen en el origen. Si no hay
+        tablas seleccionadas o ninguna existe, usa la tabla de prueba como fallback.
+        
+        La validación es una sola consulta de catálogo; las filas estimadas y las
+        columnas de cada tabla quedan en self._sql_table_metadata para la extracción.
+        
+        Returns:
+            Tuple[list, str]: (tablas_validas, mensaje_error o None)
+        """
+        from .sql_validation import validate_tables, ensure_test_table
+        
+        self._sql_table_metadata = {}
+        selected_tables = self._get_selected_sql_tables_list()
+        
+        # Verificar si hay tablas seleccionadas
+        if not selected_tables:
+            print(f"⚠️ No hay tablas seleccionadas en proceso '{self.name}', intentando usar tabla de prueba...")
+            TEST_TABLE_NAME = ensure_test_table(self.source.connection)
+            if not TEST_TABLE_NAME:
+                return [], 'No hay tablas seleccionadas y no se pudo crear tabla de prueba'
+            selected_tables = [TEST_TABLE_NAME]
+            self.selected_tables = selected_tables
+            self.save()
+            print(f"✅ Configurado proceso para usar tabla de prueba: {TEST_TABLE_NAME}")
+            return selected_tables, None
+        
+        # Verificar si las tablas seleccionadas realmente existen
+        validacion = validate_tables(self.source.connection, selected_tables)
+        valid_tables = validacion['valid']
+        self._sql_table_metadata = validacion['tables']
+        
+        if not valid_tables:
+            print(f"⚠️ Ninguna de las tablas seleccionadas existe en la BD. Intentando usar tabla de prueba...")
+            TEST_TABLE_NAME = ensure_test_table(self.source.connection)
+            if not TEST_TABLE_NAME:
+                return [], 'Las tablas seleccionadas no existen y no se pudo crear tabla de prueba'
+            selected_tables = [TEST_TABLE_NAME]
+            self.selected_tables = selected_tables
+            self.save()
+            print(f"✅ Configurado proceso para usar tabla de prueba: {TEST_TABLE_NAME}")
+            return selected_tables, None
+        
+        # Actualizar a solo tablas válidas si es diferente
+        if len(valid_tables) != len(selected_tables):
+            print(f"⚠️ Solo {len(valid_tables)} de {len(selected_tables)} tablas existen. Actualizando selección...")
+            self.selected_tables = valid_tables
+            self.save()
+        
+        return valid_tables, None
+    
+    def _parse_sql_table_ref(self, table_info):
+        """
+        Determina identificador, esquema y referencia segura de una tabla seleccionada
+        
+        Args:
+            table_info: dict ({'full_name'|'name': ...}) o string 'esquema.tabla'
             
-            # Obtener tablas seleccionadas - manejar tanto lista como JSON string
-            if isinstance(self.selected_tables, list):
-                selected_tables = self.selected_tables
-            elif isinstance(self.selected_tables, str):
-                try:
-                    # Intentar parsearlo como JSON array
-                    selected_tables = json.loads(self.selected_tables)
-                except json.JSONDecodeError:
-                    # Si falla JSON parsing, tratarlo como string simple
-                    selected_tables = [self.selected_tables]
-            else:
-                selected_tables = self.selected_tables if self.selected_tables else []
-            
-            # Si no hay tablas seleccionadas o las tablas seleccionadas no existen,
-            # intentar usar la tabla de prueba
-            from .sql_validation import get_valid_tables, ensure_test_table
-            
-            # Variable para seguimiento si se usa tabla de prueba
-            using_fallback = False
-            
-            # Verificar si hay tablas seleccionadas
-            if not selected_tables:
-                print(f"⚠️ No hay tablas seleccionadas en proceso '{self.name}', intentando usar tabla de prueba...")
-                TEST_TABLE_NAME = ensure_test_table(self.source.connection)
-                if TEST_TABLE_NAME:
-                    selected_tables = [TEST_TABLE_NAME]
-                    self.selected_tables = selected_tables
-                    self.save()
-                    using_fallback = True
-                    print(f"✅ Configurado proceso para usar tabla de prueba: {TEST_TABLE_NAME}")
-                else:
-                    return {'error': 'No hay tablas seleccionadas y no se pudo crear tabla de prueba'}
+        Returns:
+            dict|None: full_name, schema, base_name, table_key, safe_ref
+        """
+        if isinstance(table_info, dict):
+            full_name = table_info.get('full_name') or table_info.get('name')
+        elif isinstance(table_info, str):
+            full_name = table_info
+        else:
+            full_name = None
+        
+        if not full_name:
+            return None
+        
+        full_name = str(full_name).strip()
+        schema_name = None
+        base_table_name = full_name
+        
+        if '.' in full_name:
+            parts = [p for p in full_name.split('.') if p]
+            if len(parts) >= 2:
+                schema_name = parts[-2]
+                base_table_name = parts[-1]
             else:
-                # Verificar si las tablas seleccionadas realmente existen
-                valid_tables = get_valid_tables(self.source.connection, selected_tables)
-                
-                if not valid_tables:
-                    print(f"⚠️ Ninguna de las tablas seleccionadas existe en la BD. Intentando usar tabla de prueba...")
-                    TEST_TABLE_NAME = ensure_test_table(self.source.connection)
-                    if TEST_TABLE_NAME:
-                        selected_tables = [TEST_TABLE_NAME]
-                        self.selected_tables = selected_tables
-                        self.save()
-                        using_fallback = True
-                        print(f"✅ Configurado proceso para usar tabla de prueba: {TEST_TABLE_NAME}")
-                    else:
-                        return {'error': 'Las tablas seleccionadas no existen y no se pudo crear tabla de prueba'}
-                else:
-                    # Actualizar a solo tablas válidas si es diferente
-                    if len(valid_tables) != len(selected_tables):
-                        print(f"⚠️ Solo {len(valid_tables)} de {len(selected_tables)} tablas existen. Actualizando selección...")
-                        selected_tables = valid_tables
-                        self.selected_tables = selected_tables
-                        self.save()
-            
-            connection = self.source.connection
-            connector = SQLServerConnector(
-                connection.server,
-                connection.username,
-                connection.password,
-                connection.port
-            )
-            
-            # Conectar a la base de datos
-            if not connector.select_database(connection.selected_database):
-                return {'error': f'No se pudo conectar a la base de datos {connection.selected_database}'}
-            
-            all_data = []
-            
-            for table_info in selected_tables:
-                # Determinar identificador y esquema de la tabla
-                if isinstance(table_info, dict):
-                    full_name = table_info.get('full_name') or table_info.get('name')
-                elif isinstance(table_info, str):
-                    full_name = table_info
-                else:
-                    full_name = None
-
-                if not full_name:
-                    continue
-
-                full_name = str(full_name).strip()
-                schema_name = None
-                base_table_name = full_name
+                base_table_name = parts[-1]
+        
+        if schema_name:
+            table_key = f"{schema_name}.{base_table_name}"
+            safe_table_ref = f"[{schema_name}].[{base_table_name}]"
+        else:
+            table_key = base_table_name
+            safe_table_ref = f"[{base_table_name}]"
+        
+        return {
+            'full_name': full_name,
+            'schema': schema_name,
+            'base_name': base_table_name,
+            'table_key': table_key,
+            'safe_ref': safe_table_ref
+        }
+    
+    def _get_sql_table_metadata(self, table_ref):
+        """
+        Metadatos de catálogo de una tabla obtenidos al validar la selección
+        
+        Returns:
+            dict|None: schema, name, row_estimate, columns y signature (ver validate_tables)
+        """
+        metadatos = getattr(self, '_sql_table_metadata', None) or {}
+        return metadatos.get(table_ref['full_name']) or metadatos.get(table_ref['table_key'])
+    
+    def _get_selected_sql_columns(self, table_ref):
+        """Columnas seleccionadas de una tabla origen (lista vacía = todas)"""
+        import json
+        
+        if not self.selected_columns:
+            return []
+        # Manejar tanto diccionario como JSON string para selected_columns
+        if isinstance(self.selected_columns, dict):
+            cols_dict = self.selected_columns
+        elif isinstance(self.selected_columns, str):
+            cols_dict = json.loads(self.selected_columns)
+        else:
+            cols_dict = {}
+        
+        return (
+            cols_dict.get(table_ref['table_key'])
+            or cols_dict.get(table_ref['full_name'])
+            or cols_dict.get(table_ref['base_name'], [])
+        )
+    
+    def _build_sql_select(self, table_ref):
+        """
+        Construye el SELECT de una tabla origen respetando las columnas seleccionadas
+        
+        Args:
+            table_ref: dict devuelto por _parse_sql_table_ref
+        """
+        selected_cols = self._get_selected_sql_columns(table_ref)
+        
+        if selected_cols:
+            columns = ', '.join([f'[{col}]' for col in selected_cols])
+            return f"SELECT {columns} FROM {table_ref['safe_ref']}"
+        return f"SELECT * FROM {table_ref['safe_ref']}"
 
-                if '.' in full_name:
-                    parts = [p for p in full_name.split('.') if p]
-                    if len(parts) >= 2:
-                        schema_name = parts[-2]
-                        base_table_name = parts[-1]
-                    else:
-                        base_table_name = parts[-1]
+    def _is_incremental(self):
+        """Indica si el proceso extrae solo filas nuevas según la marca de agua"""
+        return self.extraction_mode == 'incremental' and bool(self.watermark_column)
+    
+    def _get_watermark(self, source_name):
+        """Última marca de agua cargada para una tabla/hoja (None si nunca se cargó)"""
+        from .watermark import deserializar_marca
+        return deserializar_marca((self.watermark_state or {}).get(source_name))
+    
+    def _save_watermark(self, source_name, value):
+        """Guarda la nueva marca de agua de una tabla/hoja tras una carga exitosa"""
+        from .watermark import serializar_marca
+        
+        marca = serializar_marca(value)
+        if marca is None:
+            return
+        state = dict(self.watermark_state or {})
+        state[source_name] = marca
+        self.watermark_state = state
+        self.save(update_fields=['watermark_state'])
+        print(f"   🔖 Marca de agua de '{source_name}' actualizada a {marca['valor']}")
+    
+    def _incremental_load_strategy(self):
+        """
+        Estrategia de carga para las filas nuevas de una ejecución incremental:
+        merge si el proceso está configurado así (filas modificadas), si no append
+        """
+        from .destination_loader import LOAD_APPEND, LOAD_MERGE
+        return LOAD_MERGE if self.load_strategy == LOAD_MERGE else LOAD_APPEND
+    
+    def _plan_csv_tail(self):
+        """
+        Prepara la lectura de un CSV que solo crece: si el prefijo cargado según
+        last_checkpoint sigue intacto se leen solo los bytes nuevos y se agregan;
+        si no (primera carga o archivo reescrito) se carga el archivo completo
+        reemplazando la tabla con staging_swap, sin importar la estrategia del
+        proceso: con append un archivo reescrito duplicaría todas las filas.
+        En ambos casos la lectura termina en el último registro completo.
+        
+        Returns:
+            dict|None: inicio, fin, filas_previas y load_strategy; None si el
+            proceso no está en modo 'tail'
+        """
+        from .csv_parallel import fin_encabezado, fin_ultimo_registro
+        from .csv_tail import CLAVE_CHECKPOINT, verificar_checkpoint
+        from .destination_loader import LOAD_STAGING_SWAP
+        
+        if self.extraction_mode != 'tail':
+            return None
+        
+        ruta = self.source.file_path
+        checkpoint = (self.last_checkpoint or {}).get(CLAVE_CHECKPOINT)
+        valido, motivo = verificar_checkpoint(ruta, checkpoint)
+        
+        if valido:
+            inicio = checkpoint['offset']
+            filas_previas = checkpoint.get('filas', 0)
+            estrategia = self._incremental_load_strategy()
+            print(f"🔖 CSV: checkpoint válido en el byte {inicio:,} ({filas_previas:,} filas cargadas); se leen solo las filas nuevas")
+        else:
+            inicio = fin_encabezado(ruta)
+            filas_previas = 0
+            # La tabla debe quedar igual al archivo, al que corresponderá el nuevo checkpoint
+            estrategia = LOAD_STAGING_SWAP
+            if checkpoint:
+                print(f"⚠️ CSV: checkpoint descartado ({motivo}); carga completa")
+                MigrationLog.log(
+                    process=self,
+                    stage='data_extraction',
+                    message=f'Checkpoint de CSV descartado: {motivo}. Se recarga el archivo completo',
+                    level='warning',
+                    user='sistema'
+                )
+        
+        return {
+            'inicio': inicio,
+            'fin': fin_ultimo_registro(ruta, inicio),
+            'filas_previas': filas_previas,
+            'load_strategy': estrategia,
+        }
+    
+    def _save_csv_checkpoint(self, offset, filas):
+        """Guarda en last_checkpoint el offset y las filas cargadas del CSV"""
+        from .csv_tail import CLAVE_CHECKPOINT, crear_checkpoint
+        
+        checkpoint = dict(self.last_checkpoint or {})
+        checkpoint[CLAVE_CHECKPOINT] = crear_checkpoint(self.source.file_path, offset, filas)
+        self.last_checkpoint = checkpoint
+        self.save(update_fields=['last_checkpoint'])
+        print(f"   🔖 Checkpoint de CSV actualizado: byte {offset:,}, {filas:,} filas")
+    
+    def _plan_sql_incremental(self, connector, table_ref):
+        """
+        Prepara la lectura incremental de una tabla SQL: solo filas con marca de agua
+        mayor que la última cargada y menor o igual al máximo actual. Fijar el máximo
+        antes de leer evita perder filas que se escriban durante la extracción.
+        
+        Returns:
+            dict|None: consulta, params, load_strategy y nueva marca; None si el
+            proceso no es incremental
+        """
+        if not self._is_incremental():
+            return None
+        
+        columna = self.watermark_column
+        consulta = self._build_sql_select(table_ref)
+        marca_anterior = self._get_watermark(table_ref['table_key'])
+        marca_nueva = connector.get_column_max(table_ref['schema'] or 'dbo', table_ref['base_name'], columna)
+        
+        if marca_anterior is None:
+            # Primera carga: todas las filas hasta el máximo actual, con la estrategia configurada
+            print(f"   🔖 {table_ref['table_key']}: sin marca de agua previa, carga completa hasta {marca_nueva}")
+            if marca_nueva is None:
+                return {'consulta': consulta, 'params': None, 'load_strategy': None, 'marca_nueva': None}
+            return {
+                'consulta': f"{consulta} WHERE [{columna}] <= ? OR [{columna}] IS NULL",
+                'params': (marca_nueva,),
+                'load_strategy': None,
+                'marca_nueva': marca_nueva
+            }
+        
+        print(f"   🔖 {table_ref['table_key']}: filas con [{columna}] > {marca_anterior}")
+        if marca_nueva is None:
+            marca_nueva = marca_anterior
+        return {
+            'consulta': f"{consulta} WHERE [{columna}] > ? AND [{columna}] <= ?",
+            'params': (marca_anterior, marca_nueva),
+            'load_strategy': self._incremental_load_strategy(),
+            'marca_nueva': marca_nueva
+        }
+    
+    def _stream_sql_table(self, connector, table_ref):
+        """
+        Abre la lectura en streaming de una tabla origen. Si parallel_degree > 1 y la
+        tabla tiene clave primaria simple entera o de fecha, el rango de la clave se
+        divide en tramos leídos en paralelo, cada uno con su propia conexión.
+        
+        Args:
+            connector: SQLServerConnector conectado a la base de datos origen
+            table_ref: dict devuelto por _parse_sql_table_ref
+            
+        Returns:
+            Tuple[tuple, iterable]: (cursor.description, lotes de tuplas)
+        """
+        from .utils import SQLServerConnector, SQL_FETCH_BATCH_SIZE
+        from .parallel_extractor import (
+            ParallelRangeExtractor, calcular_tramos, TIPOS_CLAVE_ENTERA, TIPOS_CLAVE_FECHA, TRAMOS_MIN_FILAS
+        )
+        
+        consulta = self._build_sql_select(table_ref)
+        grado = self.parallel_degree or 1
+        
+        # Tablas pequeñas según la estimación del catálogo: no compensa abrir tramos
+        metadatos = self._get_sql_table_metadata(table_ref)
+        if grado > 1 and metadatos and metadatos['row_estimate'] is not None \
+                and metadatos['row_estimate'] < TRAMOS_MIN_FILAS:
+            grado = 1
+        
+        clave = None
+        if grado > 1:
+            clave = connector.get_range_key(
+                table_ref['schema'] or 'dbo',
+                table_ref['base_name'],
+                TIPOS_CLAVE_ENTERA + TIPOS_CLAVE_FECHA
+            )
+        
+        tramos = calcular_tramos(clave['min'], clave['max'], grado) if clave else []
+        if len(tramos) < 2:
+            if grado > 1:
+                print(f"   ℹ️ {table_ref['table_key']}: sin clave primaria simple entera/fecha, lectura secuencial")
+            return connector.stream_query(consulta)
+        
+        # Estructura de columnas sin leer filas
+        descripcion, lotes_vacios = connector.stream_query(f"{consulta} WHERE 1 = 0")
+        lotes_vacios.close()
+        
+        connection = self.source.connection
+        
+        def crear_conector():
+            # Conexión dedicada: cada tramo la mantiene durante toda la lectura y
+            # parallel_degree puede superar el tamaño del pool
+            conector_tramo = SQLServerConnector(
+                connection.server,
+                connection.username,
+                connection.password,
+                connection.port,
+                use_pool=False
+            )
+            if not conector_tramo.select_database(connection.selected_database):
+                raise Exception(f'No se pudo conectar a la base de datos {connection.selected_database}')
+            return conector_tramo
+        
+        print(f"   ⚡ {table_ref['table_key']}: {len(tramos)} tramos en paralelo por "
+              f"[{clave['column']}] ({clave['min']} .. {clave['max']})")
+        
+        extractor = ParallelRangeExtractor(
+            crear_conector, consulta, clave['column'], tramos, SQL_FETCH_BATCH_SIZE
+        )
+        return descripcion, extractor.iterar_lotes()
 
-                if schema_name:
-                    table_key = f"{schema_name}.{base_table_name}"
-                    safe_table_ref = f"[{schema_name}].[{base_table_name}]"
-                else:
-                    table_key = base_table_name
-                    safe_table_ref = f"[{base_table_name}]"
+    def _extract_sql_data(self):
+        """Extrae datos de base de datos SQL"""
+        from .utils import SQLServerConnector
+        
+        try:
+            if not self.source.connection:
+                return {'error': 'No hay conexión SQL configurada'}
+            
+            # Tablas seleccionadas que existen (o tabla de prueba como fallback)
+            selected_tables, error_tablas = self._get_validated_sql_tables()
+            if error_tablas:
+                return {'error': error_tablas}
+            
+            connection = self.source.connection
+            connector = SQLServerConnector(
+                connection.server,
+                connection.username,
+                connection.password,
+                connection.port
+            )
+            
+            # Conectar a la base de datos
+            if not connector.select_database(connection.selected_database):
+                return {'error': f'No se pudo conectar a la base de datos {connection.selected_database}'}
+            
+            all_data = []
+            
+            for table_info in selected_tables:
+                table_ref = self._parse_sql_table_ref(table_info)
+                if not table_ref:
+                    continue
+                table_key = table_ref['table_key']
 
                 # Obtener datos de la tabla
                 try:
                     cursor = connector.conn.cursor()
-                    
-                    # Construir consulta SELECT
-                    if self.selected_columns:
-                        # Manejar tanto diccionario como JSON string para selected_columns
-                        if isinstance(self.selected_columns, dict):
-                            selected_cols = (
-                                self.selected_columns.get(table_key)
-                                or self.selected_columns.get(full_name)
-                                or self.selected_columns.get(base_table_name, [])
-                            )
-                        elif isinstance(self.selected_columns, str):
-                            cols_dict = json.loads(self.selected_columns)
-                            selected_cols = (
-                                cols_dict.get(table_key)
-                                or cols_dict.get(full_name)
-                                or cols_dict.get(base_table_name, [])
-                            )
-                        else:
-                            selected_cols = []
-                        
-                        if selected_cols:
-                            columns = ', '.join([f'[{col}]' for col in selected_cols])
-                            query = f"SELECT {columns} FROM {safe_table_ref}"
-                        else:
-                            query = f"SELECT * FROM {safe_table_ref}"
-                    else:
-                        query = f"SELECT * FROM {safe_table_ref}"
-                    
-                    cursor.execute(query)
+                    cursor.execute(self._build_sql_select(table_ref))
                     
                     # Obtener nombres de columnas
                     column_names = [column[0] for column in cursor.description]
@@ -1023,7 +1754,7 @@ class MigrationProcess(models.Model):
                     # Agregar entrada de metadatos para la tabla
                     all_data.append({
                         'table_name': table_key,
-                        'schema': schema_name,
+                        'schema': table_ref['schema'],
                         'columns': column_names,
                         'row_count': len(rows),
                         'metadata': True
@@ -1039,28 +1770,12 @@ class MigrationProcess(models.Model):
             # Si no se agregó ninguna entrada (por ejemplo, tabla vacía), crear metadatos mínimos
             if all_data == []:
                 for table_info in selected_tables:
-                    if isinstance(table_info, dict):
-                        full_name = table_info.get('full_name') or table_info.get('name')
-                    else:
-                        full_name = table_info
-                    if not full_name:
+                    table_ref = self._parse_sql_table_ref(table_info)
+                    if not table_ref:
                         continue
-                    meta_schema = None
-                    base_name = full_name
-                    if '.' in full_name:
-                        parts = [p for p in full_name.split('.') if p]
-                        if len(parts) >= 2:
-                            meta_schema = parts[-2]
-                            base_name = parts[-1]
-                        else:
-                            base_name = parts[-1]
-                    if meta_schema:
-                        table_key_meta = f"{meta_schema}.{base_name}"
-                    else:
-                        table_key_meta = base_name
                     all_data.append({
-                        'table_name': table_key_meta,
-                        'schema': meta_schema,
+                        'table_name': table_ref['table_key'],
+                        'schema': table_ref['schema'],
                         'columns': [],
                         'row_count': 0,
                         'metadata': True
@@ -1081,6 +1796,10 @@ class MigrationProcess(models.Model):
         Procesa cada tabla SQL por separado, creando una tabla destino individual
         para cada tabla origen con los datos reales de la tabla (NO metadatos del proceso)
         
+        La extracción es en streaming: cada tabla se lee con fetchmany en lotes de
+        tamaño fijo que van directo al escritor de su tabla destino, de modo que la
+        memoria no depende del tamaño de la tabla origen.
+        
         Args:
             tracker: Instancia de ProcessTracker para logging
             proceso_id: UUID del proceso
@@ -1090,9 +1809,10 @@ class MigrationProcess(models.Model):
         Returns:
             Tuple[bool, Dict]: (éxito, información_resultado)
         """
-        import pandas as pd
-        import json
         from django.utils import timezone
+        from .utils import SQLServerConnector
+        
+        connector = None
         
         try:
             # Asegurarse de que exista la tabla de prueba antes de intentar extracción
@@ -1113,143 +1833,134 @@ class MigrationProcess(models.Model):
             if not TEST_TABLE_NAME:
                 print("⚠️ No se pudo crear la tabla de prueba, pero intentaremos continuar...")
             
-            # Extraer datos de todas las tablas SQL
-            datos_sql = self._extract_sql_data()
-            tiempo_extraccion = timezone.now()
-            duracion_extraccion = (tiempo_extraccion - tiempo_inicio).total_seconds()
-            
-            if isinstance(datos_sql, dict) and 'error' in datos_sql:
-                # Si hay error con las tablas seleccionadas, intentar usar tabla de prueba
-                if datos_sql['error'] == 'No hay tablas seleccionadas' and TEST_TABLE_NAME:
-                    print(f"⚠️ Usando tabla de prueba {TEST_TABLE_NAME} como fallback...")
-                    self.selected_tables = [TEST_TABLE_NAME]
-                    self.save()
-                    
-                    # Reintentar extracción con la tabla de prueba
-                    datos_sql = self._extract_sql_data()
-                    if isinstance(datos_sql, dict) and 'error' in datos_sql:
-                        return False, {
-                            'success': False,
-                            'error': f"Error incluso con tabla de prueba: {datos_sql['error']}",
-                            'process_type': 'sql_processing'
-                        }
-                else:
-                    return False, {
-                        'success': False,
-                        'error': datos_sql['error'],
-                        'process_type': 'sql_processing'
-                    }
-            
-            # Agrupar datos por tabla
-            tablas_data = {}
-            total_registros = 0
-            tablas_con_error = []
-            tablas_columnas = {}
-            
-            for registro in datos_sql:
-                if registro.get('metadata'):
-                    nombre_tabla_meta = registro.get('table_name')
-                    if nombre_tabla_meta:
-                        tablas_columnas[nombre_tabla_meta] = registro.get('columns', [])
-                        if registro.get('row_count', 0) == 0 and nombre_tabla_meta not in tablas_data:
-                            tablas_data[nombre_tabla_meta] = []
-                    continue
-                
-                if 'error' in registro:
-                    print(f"⚠️  Error en tabla {registro.get('table_name', 'desconocida')}: {registro['error']}")
-                    # Guardar errores de tablas para reportar después
-                    tablas_con_error.append({
-                        'tabla': registro.get('table_name', 'desconocida'),
-                        'error': registro['error']
-                    })
-                    continue
-                    
-                table_name = registro.get('table_name')
-                if not table_name:
-                    continue
-                
-                if table_name not in tablas_data:
-                    tablas_data[table_name] = []
-                
-                # Eliminar campos de control para obtener datos limpios
-                datos_limpios = {k: v for k, v in registro.items() 
-                               if k not in ['table_name', 'row_index']}
-                tablas_data[table_name].append(datos_limpios)
-                total_registros += 1
-                
-            # Si todas las tablas tienen errores y no hay datos válidos, reportar error
-            if tablas_con_error and len(tablas_con_error) == len(datos_sql):
-                error_msg = f"Error en todas las tablas seleccionadas"
-                if len(tablas_con_error) == 1:
-                    error_msg = f"Error en tabla {tablas_con_error[0]['tabla']}: {tablas_con_error[0]['error']}"
+            # Tablas seleccionadas que existen (o tabla de prueba como fallback)
+            selected_tables, error_tablas = self._get_validated_sql_tables()
+            if error_tablas:
                 return False, {
                     'success': False,
-                    'error': error_msg,
-                    'process_type': 'sql_processing',
-                    'tablas_con_error': tablas_con_error
+                    'error': error_tablas,
+                    'process_type': 'sql_processing'
                 }
             
-            # Si no hay tablas con datos pero sí con metadatos (tablas vacías), no es un error
-            if not tablas_data and not tablas_columnas:
-                error_msg = "No se encontraron tablas válidas o con datos para procesar."
-                tracker.finalizar('ERROR', error_msg)
+            connection = self.source.connection
+            connector = SQLServerConnector(
+                connection.server,
+                connection.username,
+                connection.password,
+                connection.port
+            )
+            if not connector.select_database(connection.selected_database):
                 return False, {
                     'success': False,
-                    'error': error_msg,
-                    'process_type': 'sql_processing',
+                    'error': f'No se pudo conectar a la base de datos {connection.selected_database}',
+                    'process_type': 'sql_processing'
                 }
             
-            # Asegurar que todas las tablas de 'tablas_columnas' existan en 'tablas_data'
-            for nombre_tabla in tablas_columnas:
-                if nombre_tabla not in tablas_data:
-                    tablas_data[nombre_tabla] = []
-            
             # Actualizar estado
             tracker.actualizar_estado('PROCESANDO_DATOS', 
-                f'Procesando {len(tablas_data)} tablas SQL con {total_registros} registros totales')
+                f'Procesando {len(selected_tables)} tablas SQL en streaming')
             
             # Procesar cada tabla por separado
             tablas_exitosas = 0
-            tablas_con_error = 0
+            tablas_con_error = []
+            detalles_tablas = {}
+            total_registros = 0
             
-            for nombre_tabla, datos_tabla in tablas_data.items():
-                print(f"\n📊 Procesando tabla SQL: {nombre_tabla}")
-                print(f"   📈 Registros encontrados: {len(datos_tabla)}")
-                
-                # Convertir datos a DataFrame
-                df_datos = pd.DataFrame(datos_tabla)
-                if df_datos.empty and nombre_tabla in tablas_columnas:
-                    df_datos = pd.DataFrame(columns=tablas_columnas[nombre_tabla])
-                
-                if df_datos.empty:
-                    print(f"⚠️  Tabla {nombre_tabla} está vacía en origen, se creará estructura vacía en destino...")
+            for table_info in selected_tables:
+                table_ref = self._parse_sql_table_ref(table_info)
+                if not table_ref:
+                    continue
+                nombre_tabla = table_ref['table_key']
+                metadatos_tabla = self._get_sql_table_metadata(table_ref)
+                if metadatos_tabla and metadatos_tabla['row_estimate'] is not None:
+                    print(f"\n📊 Procesando tabla SQL: {nombre_tabla} (~{metadatos_tabla['row_estimate']:,} filas estimadas)")
+                else:
+                    print(f"\n📊 Procesando tabla SQL: {nombre_tabla}")
                 
-                print(f"   📋 Columnas detectadas: {list(df_datos.columns)}")
+                # Columnas seleccionadas que ya no existen en el origen (según la validación)
+                if metadatos_tabla:
+                    existentes = {col['name'].lower() for col in metadatos_tabla['columns']}
+                    faltantes = [
+                        col for col in self._get_selected_sql_columns(table_ref) if col.lower() not in existentes
+                    ]
+                    if faltantes:
+                        error_tabla = f"Columnas seleccionadas que ya no existen en el origen: {', '.join(faltantes)}"
+                        tablas_con_error.append({'tabla': nombre_tabla, 'error': error_tabla})
+                        print(f"❌ Tabla {nombre_tabla}: {error_tabla}")
+                        continue
                 
                 # Generar nombre de tabla destino: proceso_nombreTabla (sin caracteres problemáticos)
                 nombre_tabla_normalizada = nombre_tabla.replace('.', '_')
                 nombre_tabla_destino = f"{self.name.replace(' ', '_')}_{nombre_tabla_normalizada}"
                 
                 # Actualizar estado para esta tabla específica
-                duracion_tabla = (timezone.now() - tiempo_extraccion).total_seconds()
                 tracker.actualizar_estado('GUARDANDO_DATOS', 
-                    f'Guardando tabla {nombre_tabla} ({len(datos_tabla)} registros)')
+                    f'Transfiriendo tabla {nombre_tabla} por lotes')
                 
-                # Guardar DataFrame en la base de datos destino
-                exito_guardado, resultado_guardado = self._save_dataframe_to_destination(
-                    df_datos=df_datos,
-                    nombre_tabla_destino=nombre_tabla_destino,
-                    proceso_id=proceso_id,
-                    usuario_responsable='sistema_automatizado',
-                    source_table_name=nombre_tabla  # Pasar nombre de tabla origen para aplicar mapeos
-                )
+                try:
+                    # Leer por lotes (fetchmany) y escribir cada lote directamente en destino.
+                    # En modo incremental solo se leen filas posteriores a la marca de agua;
+                    # en modo completo se lee en paralelo por tramos de clave si aplica
+                    plan_incremental = self._plan_sql_incremental(connector, table_ref)
+                    with self._span('lectura', nombre_tabla):
+                        if plan_incremental:
+                            descripcion, lotes = connector.stream_query(plan_incremental['consulta'], plan_incremental['params'])
+                        else:
+                            descripcion, lotes = self._stream_sql_table(connector, table_ref)
+                    lotes = self._medir_lectura(lotes, nombre_tabla)
+                    
+                    exito_guardado, resultado_guardado = self._save_stream_to_destination(
+                        descripcion_columnas=descripcion,
+                        lotes=lotes,
+                        nombre_tabla_destino=nombre_tabla_destino,
+                        proceso_id=proceso_id,
+                        usuario_responsable='sistema_automatizado',
+                        source_table_name=nombre_tabla,  # Pasar nombre de tabla origen para aplicar mapeos
+                        load_strategy=plan_incremental['load_strategy'] if plan_incremental else None
+                    )
+                    
+                    if exito_guardado and plan_incremental:
+                        self._save_watermark(nombre_tabla, plan_incremental['marca_nueva'])
+                    if exito_guardado and resultado_guardado.get('estadisticas_merge'):
+                        tracker.registrar_merge(nombre_tabla_destino, resultado_guardado['estadisticas_merge'])
+                except Exception as table_error:
+                    exito_guardado, resultado_guardado = False, {
+                        'error': f'Error procesando tabla: {str(table_error)}'
+                    }
                 
                 if exito_guardado:
                     tablas_exitosas += 1
-                    print(f"✅ Tabla {nombre_tabla} guardada exitosamente como {nombre_tabla_destino}")
+                    registros_tabla = resultado_guardado.get('records_inserted', 0)
+                    detalles_tablas[nombre_tabla] = registros_tabla
+                    total_registros += registros_tabla
+                    print(f"✅ Tabla {nombre_tabla} guardada exitosamente como {nombre_tabla_destino} ({registros_tabla} registros)")
                 else:
-                    tablas_con_error += 1
-                    print(f"❌ Error guardando tabla {nombre_tabla}: {resultado_guardado.get('error', 'Error desconocido')}")
+                    error_tabla = resultado_guardado.get('error', 'Error desconocido')
+                    tablas_con_error.append({'tabla': nombre_tabla, 'error': error_tabla})
+                    print(f"❌ Error guardando tabla {nombre_tabla}: {error_tabla}")
+            
+            if not detalles_tablas and not tablas_con_error:
+                error_msg = "No se encontraron tablas válidas o con datos para procesar."
+                tracker.finalizar('ERROR', error_msg)
+                return False, {
+                    'success': False,
+                    'error': error_msg,
+                    'process_type': 'sql_processing',
+                }
+            
+            # Si todas las tablas tienen errores, reportar error
+            if tablas_con_error and not tablas_exitosas:
+                error_msg = f"Error en todas las tablas seleccionadas"
+                if len(tablas_con_error) == 1:
+                    error_msg = f"Error en tabla {tablas_con_error[0]['tabla']}: {tablas_con_error[0]['error']}"
+                tracker.finalizar('ERROR', error_msg)
+                return False, {
+                    'success': False,
+                    'error': error_msg,
+                    'process_type': 'sql_processing',
+                    'tablas_con_error': len(tablas_con_error),
+                    'detalles_tablas_error': tablas_con_error
+                }
             
             # Calcular duración total
             tiempo_fin = timezone.now()
@@ -1263,23 +1974,33 @@ class MigrationProcess(models.Model):
                 'success': success,
                 'process_type': 'sql_multi_table',
                 'tablas_procesadas': tablas_exitosas,
-                'tablas_con_error': tablas_con_error,
+                'tablas_con_error': len(tablas_con_error),
+                'detalles_tablas_error': tablas_con_error,
                 'total_registros': total_registros,
                 'duracion_total': duracion_total,
-                'duracion_extraccion': duracion_extraccion,
                 'proceso_id': proceso_id,
-                'detalles_tablas': {
-                    tabla: len(datos) for tabla, datos in tablas_data.items()
+                'detalles_tablas': detalles_tablas,
+                # Firma de columnas de cada tabla origen al momento de la carga
+                'firmas_columnas': {
+                    nombre: metadatos['signature']
+                    for nombre, metadatos in (getattr(self, '_sql_table_metadata', None) or {}).items()
                 }
             }
             
+            # Resumen de MERGE (insertadas/actualizadas/sin cambios) si se usó esa estrategia
+            mensaje_final = f'SQL procesado: {tablas_exitosas} tablas exitosas, {total_registros} registros totales'
+            if tracker.estadisticas_merge:
+                resumen_merge = tracker.resumen_merge()
+                result_info['estadisticas_merge'] = resumen_merge
+                mensaje_final += (f" (MERGE: {resumen_merge['insertados']} insertadas, "
+                                  f"{resumen_merge['actualizados']} actualizadas, "
+                                  f"{resumen_merge['sin_cambios']} sin cambios")
+                if resumen_merge['duplicados']:
+                    mensaje_final += f", {resumen_merge['duplicados']} duplicadas descartadas"
+                mensaje_final += ")"
+            
             # Actualizar estado final
-            if success:
-                tracker.finalizar('COMPLETADO', 
-                    f'SQL procesado: {tablas_exitosas} tablas exitosas, {total_registros} registros totales')
-            else:
-                tracker.finalizar('ERROR', 
-                    f'Error procesando SQL: {tablas_con_error} tablas con error')
+            tracker.finalizar('COMPLETADO', mensaje_final)
             
             return success, result_info
             
@@ -1304,6 +2025,9 @@ class MigrationProcess(models.Model):
                 'error': error_msg,
                 'process_type': 'sql_processing'
             }
+        finally:
+            if connector:
+                connector.disconnect()
     
     def to_dict(self):
         """
@@ -1319,6 +2043,13 @@ class MigrationProcess(models.Model):
             'selected_tables': self.selected_tables,
             'selected_columns': self.selected_columns,
             'target_db_name': self.target_db_name,
+            'load_strategy': self.load_strategy,
+            'merge_key_columns': self.merge_key_columns,
+            'parallel_degree': self.parallel_degree,
+            'sheet_workers': self.sheet_workers,
+            'extraction_mode': self.extraction_mode,
+            'watermark_column': self.watermark_column,
+            'watermark_state': self.watermark_state,
             'status': self.status,
             'created_at': self.created_at.isoformat(),
             'last_run': self.last_run.isoformat() if self.last_run else None
@@ -1412,7 +2143,105 @@ class MigrationProcess(models.Model):
         
         return df
 
-    def _save_dataframe_to_destination(self, df_datos, nombre_tabla_destino, proceso_id, usuario_responsable, source_table_name=None):
+    def _get_destination_connection(self, tabla=None):
+        """
+        Conexión pyodbc a la base de datos destino (settings.DATABASES['destino'])
+        con autocommit desactivado
+        
+        Durante run() sale del pool de la sesión destino (ver destination_session);
+        fuera de una ejecución se abre una conexión directa.
+        
+        Args:
+            tabla: Tabla destino que se cargará (para las métricas de la sesión)
+        
+        Returns:
+            pyodbc.Connection: Conexión abierta; devolverla con _release_destination_connection
+        """
+        from .destination_session import abrir_conexion_destino, configuracion_destino
+        
+        sesion_destino = getattr(self, '_sesion_destino', None)
+        if sesion_destino is not None:
+            return sesion_destino.checkout(tabla)
+        
+        config = configuracion_destino()
+        print(f"🔍 DEBUG: Conectando a BD - Server: {config['server']}, DB: {config['database']}, User: {config['username']}")
+        return abrir_conexion_destino()
+    
+    def _release_destination_connection(self, conn):
+        """Devuelve la conexión destino a la sesión (o la cierra si es directa)"""
+        sesion_destino = getattr(self, '_sesion_destino', None)
+        if sesion_destino is not None:
+            sesion_destino.checkin(conn)
+        else:
+            conn.close()
+
+    def _get_merge_key_columns(self, source_table_name):
+        """
+        Columnas clave (nombres destino ya limpios) configuradas para una tabla/hoja
+        
+        Returns:
+            list: Columnas clave, vacía si no hay configuración
+        """
+        if not self.merge_key_columns or not source_table_name:
+            return []
+        claves = self.merge_key_columns.get(source_table_name) or []
+        return self._get_clean_destination_columns(claves, source_table_name)
+    
+    def get_merge_key_sources(self):
+        """
+        Tablas/hojas seleccionadas con sus columnas clave, para el editor del proceso
+        
+        Returns:
+            list[dict]: [{'source': nombre, 'keys': 'col1, col2'}]
+        """
+        import json
+        
+        if self.source and self.source.source_type == 'sql':
+            referencias = [self._parse_sql_table_ref(t) for t in self._get_selected_sql_tables_list()]
+            nombres = [ref['table_key'] for ref in referencias if ref]
+        elif self.source and self.source.source_type == 'excel':
+            hojas = self.selected_sheets
+            if isinstance(hojas, str):
+                try:
+                    hojas = json.loads(hojas)
+                except json.JSONDecodeError:
+                    hojas = [hojas]
+            nombres = list(hojas or [])
+        else:
+            nombres = []
+        
+        claves = self.merge_key_columns or {}
+        return [{'source': nombre, 'keys': ', '.join(claves.get(nombre, []))} for nombre in nombres]
+    
+    def _create_destination_loader(self, conn, nombre_tabla_destino, proceso_id, source_table_name=None, load_strategy=None):
+        """
+        Crea el cargador de la tabla destino con la estrategia efectiva
+        
+        Una tabla/hoja sin columnas clave configuradas no puede cargarse con merge
+        (p. ej. una hoja agregada a la selección después): se recarga completa con
+        staging_swap, que deja intacta la tabla anterior si la carga falla.
+        
+        Args:
+            load_strategy: Estrategia a usar en lugar de self.load_strategy (p. ej. incremental)
+        """
+        from .destination_loader import DestinationTableLoader, LOAD_REPLACE, LOAD_MERGE, LOAD_STAGING_SWAP
+        
+        estrategia = load_strategy or self.load_strategy or LOAD_REPLACE
+        key_columns = self._get_merge_key_columns(source_table_name) if estrategia == LOAD_MERGE else None
+        if estrategia == LOAD_MERGE and not key_columns:
+            print(f"⚠️ '{source_table_name or nombre_tabla_destino}' no tiene columnas clave para MERGE; "
+                  f"se recarga completa con staging_swap")
+            estrategia = LOAD_STAGING_SWAP
+        
+        return DestinationTableLoader(
+            conn,
+            nombre_tabla_destino,
+            strategy=estrategia,
+            proceso_id=proceso_id,
+            key_columns=key_columns
+        )
+
+    def _save_dataframe_to_destination(self, df_datos, nombre_tabla_destino, proceso_id, usuario_responsable, source_table_name=None, load_strategy=None):
         """
         Guarda un DataFrame directamente a la base de datos destino como una tabla
         con la estructura exacta del DataFrame (NO metadatos del proceso)
@@ -1423,158 +2252,109 @@ class MigrationProcess(models.Model):
             proceso_id: UUID del proceso para logging
             usuario_responsable: Usuario responsable del proceso
             source_table_name: Nombre de la tabla/hoja origen (para aplicar column_mappings)
+            load_strategy: Estrategia de carga a usar en lugar de self.load_strategy
             
         Returns:
             Tuple[bool, Dict]: (éxito, información_resultado)
         """
         import pandas as pd
-        import pyodbc
-        from django.conf import settings
-        
+        from .run_timeline import bytes_dataframe
+        estadisticas_insercion = None
+        objetivo = source_table_name or nombre_tabla_destino
+
         try:
             print(f"🔍 DEBUG: Iniciando guardado de DataFrame '{nombre_tabla_destino}'")
             print(f"🔍 DEBUG: DataFrame shape: {df_datos.shape}")
             print(f"🔍 DEBUG: DataFrame columnas: {list(df_datos.columns)}")
             
             # Usar conexión directa pyodbc para evitar problemas con Django ORM
-            destino_config = settings.DATABASES['destino']
-            
-            # Construir connection string con parámetros correctos
-            server = destino_config.get('HOST', 'localhost')
-            port = destino_config.get('PORT')
-            database = destino_config.get('NAME', 'DestinoAutomatizacion')
-            username = destino_config.get('USER', '')
-            password = destino_config.get('PASSWORD', '')
-            
-            # Construir servidor con puerto solo si está especificado
-            if port:
-                server_with_port = f"{server},{port}"
-            else:
-                server_with_port = server
-            
-            connection_string = (
-                f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-                f"SERVER={server_with_port};"
-                f"DATABASE={database};"
-                f"UID={username};"
-                f"PWD={password};"
-                f"TrustServerCertificate=yes;"
-            )
-            
-            print(f"🔍 DEBUG: Conectando a BD - Server: {server_with_port}, DB: {database}, User: {username}")
-            print(f"🔍 DEBUG: Connection string (sin pwd): DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={server_with_port};DATABASE={database};UID={username};TrustServerCertificate=yes;")
-            
-            conn = pyodbc.connect(connection_string)
+            conn = self._get_destination_connection(nombre_tabla_destino)
             cursor = conn.cursor()
             print(f"✅ DEBUG: Conexión a BD exitosa")
             
+            # Cargador de tabla destino según la estrategia configurada en el proceso
+            loader = self._create_destination_loader(
+                conn, nombre_tabla_destino, proceso_id, source_table_name, load_strategy
+            )
+            
             # 1. Crear tabla con estructura del DataFrame
-            print(f"📋 Creando tabla '{nombre_tabla_destino}' con estructura del DataFrame...")
+            print(f"📋 Creando tabla '{loader.tabla_trabajo}' con estructura del DataFrame...")
             
             # Generar SQL CREATE TABLE basado en las columnas del DataFrame
-            create_table_sql = self._generate_create_table_sql(df_datos, nombre_tabla_destino, source_table_name)
+            with self._span('inferencia_tipos', objetivo, filas=len(df_datos)):
+                create_table_sql = self._generate_create_table_sql(df_datos, loader.tabla_trabajo, source_table_name)
             
-            # Eliminar tabla si existe y crearla nueva
-            cursor.execute(f"IF OBJECT_ID('{nombre_tabla_destino}', 'U') IS NOT NULL DROP TABLE [{nombre_tabla_destino}]")
-            cursor.execute(create_table_sql)
+            # Eliminar tabla de trabajo si existe y crearla nueva (en staging_swap la destino sigue intacta)
+            with self._span('ddl', objetivo):
+                loader.preparar(create_table_sql)
             
-            print(f"✅ Tabla '{nombre_tabla_destino}' creada exitosamente")
+            print(f"✅ Tabla '{loader.tabla_trabajo}' creada exitosamente")
             print(f"   📊 Columnas: {list(df_datos.columns)}")
             print(f"   📈 Filas a insertar: {len(df_datos)}")
             
             # 2. Insertar datos del DataFrame
             registros_insertados = 0
             if not df_datos.empty:
-                # Obtener mapeos de columnas si existen
-                column_mappings = {}
-                if self.column_mappings and source_table_name and source_table_name in self.column_mappings:
-                    column_mappings = self.column_mappings[source_table_name]
-                
-                # Preparar SQL INSERT con columnas limpias (usando nombres mapeados)
-                clean_columns_list = []
-                for col in df_datos.columns:
-                    # Usar nombre personalizado si existe en el mapeo
-                    custom_name = column_mappings.get(col, col)
-                    clean_col = custom_name.replace(' ', '_').replace('-', '_')
-                    clean_col = ''.join(c for c in clean_col if c.isalnum() or c == '_')
-                    clean_columns_list.append(clean_col)
+                clean_columns_list = self._get_clean_destination_columns(df_datos.columns, source_table_name)
                 
-                columns_sql = ', '.join([f'[{col}]' for col in clean_columns_list])
-                placeholders = ', '.join(['?' for _ in clean_columns_list])
-                insert_sql = f"INSERT INTO [{nombre_tabla_destino}] ({columns_sql}) VALUES ({placeholders})"
-                
-                print(f"🔍 SQL INSERT: {insert_sql}")
-
-                # Convertir DataFrame a lista de tuplas para inserción masiva
-                valores_a_insertar = []
-                for _, row in df_datos.iterrows():
-                    valores_fila = []
-                    for col in df_datos.columns:
-                        valor = row[col]
-                        if pd.isna(valor):
-                            valores_fila.append(None)
-                        elif isinstance(valor, pd.Timestamp):
-                            valores_fila.append(valor.to_pydatetime())
-                        elif hasattr(valor, 'item'):
-                            valores_fila.append(valor.item())
-                        else:
-                            valores_fila.append(valor)
-                    valores_a_insertar.append(tuple(valores_fila))
+                # Escritor masivo: conversión vectorizada + fast_executemany por bloques.
+                # Si un bloque falla se aísla por bisección y solo las filas malas van a cuarentena
+                writer = loader.crear_writer(clean_columns_list)
+                print(f"🔍 SQL INSERT: {writer.insert_sql}")
 
                 try:
-                    if valores_a_insertar:
-                        # Usar executemany para una inserción eficiente
-                        cursor.executemany(insert_sql, valores_a_insertar)
-                        registros_insertados = cursor.rowcount if cursor.rowcount != -1 else len(valores_a_insertar)
-                        print(f"   ✅ Inserción masiva exitosa. Registros afectados: {registros_insertados}")
-                    else:
-                        print("   ⚠️ No hay datos para insertar.")
+                    registros_insertados = writer.write(df_datos)
+                    estadisticas_insercion = writer.resumen()
+                finally:
+                    writer.close()
+                self._registrar_spans_escritura(objetivo, estadisticas_insercion, bytes_dataframe(df_datos))
 
-                except Exception as insert_error:
-                    # Si executemany falla, intentar inserción fila por fila para depurar
-                    print(f"⚠️  Error en inserción masiva: {insert_error}. Intentando fila por fila...")
-                    registros_insertados = 0
-                    for i, valores_fila in enumerate(valores_a_insertar):
-                        try:
-                            cursor.execute(insert_sql, valores_fila)
-                            registros_insertados += 1
-                        except Exception as single_insert_error:
-                            print(f"❌ Error insertando fila {i}: {single_insert_error}")
-                            print(f"   📊 Valores: {valores_fila}")
-                            # Opcional: decidir si continuar o detenerse
-                            # continue
+                if estadisticas_insercion['registros_cuarentena']:
+                    print(f"   ⚠️ Inserción masiva con filas rechazadas: {registros_insertados} insertadas, "
+                          f"{estadisticas_insercion['registros_cuarentena']} en cuarentena "
+                          f"'{writer.quarantine_table}' ({estadisticas_insercion['viajes_fallidos']} viajes fallidos)")
+                else:
+                    print(f"   ✅ Inserción masiva exitosa. Registros afectados: {registros_insertados} "
+                          f"({estadisticas_insercion['filas_por_segundo']} filas/s)")
             else:
                 print("   ⚠️ DataFrame vacío, no se insertarán datos.")
             
-            # Confirmar transacción
-            conn.commit()
+            # Confirmar transacción y publicar la tabla (intercambio atómico en staging_swap)
+            with self._span('commit', objetivo, filas=registros_insertados):
+                loader.finalizar()
             
             print(f"✅ Datos insertados exitosamente:")
             print(f"   📊 Registros insertados: {registros_insertados}")
             print(f"   📋 Tabla final: '{nombre_tabla_destino}'")
             
-            # Cerrar conexión
+            # Devolver la conexión
             cursor.close()
-            conn.close()
+            self._release_destination_connection(conn)
             
             return True, {
                 'success': True,
                 'table_name': nombre_tabla_destino,
                 'records_inserted': registros_insertados,
                 'columns': list(df_datos.columns),
-                'proceso_id': proceso_id
+                'proceso_id': proceso_id,
+                'estadisticas_insercion': estadisticas_insercion,
+                'load_strategy': loader.strategy,
+                'duracion_swap_ms': loader.duracion_swap_ms,
+                'estadisticas_merge': loader.estadisticas_merge
             }
             
         except Exception as e:
             error_msg = f"Error guardando DataFrame en tabla '{nombre_tabla_destino}': {str(e)}"
             print(f"❌ {error_msg}")
             
-            # Cerrar conexiones en caso de error
+            # Descartar staging (la tabla destino anterior queda intacta) y cerrar conexiones
+            if 'loader' in locals():
+                loader.abortar()
             try:
                 if 'cursor' in locals():
                     cursor.close()
                 if 'conn' in locals():
-                    conn.close()
+                    self._release_destination_connection(conn)
             except:
                 pass
             
@@ -1585,7 +2365,257 @@ class MigrationProcess(models.Model):
                 'proceso_id': proceso_id
             }
 
-    def _generate_create_table_sql(self, df, table_name, source_table_name=None):
+    def _save_dataframe_chunks_to_destination(self, primer_bloque, bloques, nombre_tabla_destino, proceso_id, usuario_responsable, source_table_name=None, load_strategy=None, enteros_exactos=True):
+        """
+        Guarda en la base de datos destino una secuencia de DataFrames (bloques de una
+        misma hoja/archivo) sin reunirlos en memoria.
+        
+        La tabla se crea antes de ver los demás bloques, así que se usan tipos
+        estables (BIGINT, FLOAT, NVARCHAR(MAX)) en lugar de ajustarlos a los valores
+        del primer bloque, y cada bloque siguiente se convierte a los tipos de
+        columna del primero (ver _alinear_bloque).
+        
+        Args:
+            primer_bloque: Primer DataFrame (define columnas y tipos; puede estar vacío)
+            bloques: Iterable con los DataFrames restantes
+            nombre_tabla_destino: Nombre que tendrá la tabla en la BD destino
+            proceso_id: UUID del proceso para logging
+            usuario_responsable: Usuario responsable del proceso
+            source_table_name: Nombre de la tabla/hoja origen (para aplicar column_mappings)
+            load_strategy: Estrategia de carga a usar en lugar de self.load_strategy
+            enteros_exactos: False si el origen no distingue enteros de decimales (Excel
+                guarda todo número como double): las columnas enteras del primer
+                bloque se crean como FLOAT
+            
+        Returns:
+            Tuple[bool, Dict]: (éxito, información_resultado)
+        """
+        import itertools
+        import pandas as pd
+        from .run_timeline import bytes_dataframe
+        
+        objetivo = source_table_name or nombre_tabla_destino
+        
+        try:
+            print(f"🔍 DEBUG: Iniciando guardado por bloques de '{nombre_tabla_destino}'")
+            
+            conn = self._get_destination_connection(nombre_tabla_destino)
+            loader = self._create_destination_loader(
+                conn, nombre_tabla_destino, proceso_id, source_table_name, load_strategy
+            )
+            
+            # 1. Crear tabla con tipos estables a partir de las columnas del primer bloque
+            with self._span('inferencia_tipos', objetivo, filas=len(primer_bloque)):
+                if not enteros_exactos:
+                    enteras = [col for col in primer_bloque.columns if pd.api.types.is_integer_dtype(primer_bloque[col].dtype)]
+                    if enteras:
+                        primer_bloque = primer_bloque.astype({col: 'float64' for col in enteras})
+                tipos_referencia = primer_bloque.dtypes
+                create_table_sql = self._generate_create_table_sql(
+                    primer_bloque, loader.tabla_trabajo, source_table_name, tipos_estables=True
+                )
+            with self._span('ddl', objetivo):
+                loader.preparar(create_table_sql)
+            print(f"✅ Tabla '{loader.tabla_trabajo}' creada exitosamente")
+            print(f"   📊 Columnas: {list(primer_bloque.columns)}")
+            
+            # 2. Escribir cada bloque en cuanto está listo
+            clean_columns_list = self._get_clean_destination_columns(primer_bloque.columns, source_table_name)
+            writer = loader.crear_writer(clean_columns_list)
+            print(f"🔍 SQL INSERT: {writer.insert_sql}")
+            registros_leidos = 0
+            bloques_leidos = 0
+            bytes_leidos = 0
+            try:
+                for bloque in itertools.chain([primer_bloque], bloques):
+                    if bloques_leidos:
+                        bloque = self._alinear_bloque(bloque, tipos_referencia)
+                    bloques_leidos += 1
+                    registros_leidos += len(bloque)
+                    bytes_leidos += bytes_dataframe(bloque)
+                    writer.write(bloque)
+                estadisticas_insercion = writer.resumen()
+            finally:
+                writer.close()
+            self._registrar_spans_escritura(objetivo, estadisticas_insercion, bytes_leidos)
+            
+            registros_insertados = estadisticas_insercion['registros_insertados']
+            if estadisticas_insercion['registros_cuarentena']:
+                print(f"   ⚠️ Transferencia con filas rechazadas: {registros_insertados} insertadas, "
+                      f"{estadisticas_insercion['registros_cuarentena']} en cuarentena '{writer.quarantine_table}'")
+            else:
+                print(f"   ✅ {registros_insertados} registros transferidos en {bloques_leidos} bloques de lectura")
+            
+            # Confirmar transacción y publicar la tabla
+            with self._span('commit', objetivo, filas=registros_insertados):
+                loader.finalizar()
+            self._release_destination_connection(conn)
+            
+            return True, {
+                'success': True,
+                'table_name': nombre_tabla_destino,
+                'records_inserted': registros_insertados,
+                'records_read': registros_leidos,
+                'columns': list(primer_bloque.columns),
+                'proceso_id': proceso_id,
+                'estadisticas_insercion': estadisticas_insercion,
+                'lotes_lectura': bloques_leidos,
+                'load_strategy': loader.strategy,
+                'duracion_swap_ms': loader.duracion_swap_ms,
+                'estadisticas_merge': loader.estadisticas_merge
+            }
+            
+        except Exception as e:
+            error_msg = f"Error guardando bloques en tabla '{nombre_tabla_destino}': {str(e)}"
+            print(f"❌ {error_msg}")
+            
+            # Descartar staging (la tabla destino anterior queda intacta) y cerrar conexión
+            if 'loader' in locals():
+                loader.abortar()
+            try:
+                if 'conn' in locals():
+                    self._release_destination_connection(conn)
+            except:
+                pass
+            
+            return False, {
+                'success': False,
+                'error': error_msg,
+                'table_name': nombre_tabla_destino,
+                'proceso_id': proceso_id
+            }
+
+    def _save_stream_to_destination(self, descripcion_columnas, lotes, nombre_tabla_destino, proceso_id, usuario_responsable, source_table_name=None, load_strategy=None):
+        """
+        Guarda en la base de datos destino un flujo de lotes de filas leídos del
+        origen sin materializar la tabla completa en memoria
+        
+        La estructura de la tabla destino se genera a partir de cursor.description
+        del origen, por lo que no hace falta inferir tipos desde un DataFrame.
+        
+        Args:
+            descripcion_columnas: cursor.description de la consulta origen
+            lotes: Iterable de listas de tuplas (p. ej. SQLServerConnector.stream_query)
+            nombre_tabla_destino: Nombre que tendrá la tabla en la BD destino
+            proceso_id: UUID del proceso para logging
+            usuario_responsable: Usuario responsable del proceso
+            source_table_name: Nombre de la tabla origen (para aplicar column_mappings)
+            load_strategy: Estrategia de carga a usar en lugar de self.load_strategy
+            
+        Returns:
+            Tuple[bool, Dict]: (éxito, información_resultado)
+        """
+        from .destination_loader import build_create_table_sql_from_description
+        
+        columnas_origen = [col[0] for col in descripcion_columnas]
+        objetivo = source_table_name or nombre_tabla_destino
+        
+        try:
+            print(f"🔍 DEBUG: Iniciando guardado en streaming de '{nombre_tabla_destino}'")
+            
+            conn = self._get_destination_connection(nombre_tabla_destino)
+            print(f"✅ DEBUG: Conexión a BD exitosa")
+            
+            loader = self._create_destination_loader(
+                conn, nombre_tabla_destino, proceso_id, source_table_name, load_strategy
+            )
+            
+            # 1. Crear tabla con los tipos reportados por el driver en el origen
+            clean_columns_list = self._get_clean_destination_columns(columnas_origen, source_table_name)
+            with self._span('inferencia_tipos', objetivo):
+                create_table_sql = build_create_table_sql_from_description(
+                    loader.tabla_trabajo, clean_columns_list, descripcion_columnas
+                )
+            with self._span('ddl', objetivo):
+                loader.preparar(create_table_sql)
+            print(f"✅ Tabla '{loader.tabla_trabajo}' creada exitosamente")
+            print(f"   📊 Columnas: {columnas_origen}")
+            
+            # 2. Escribir cada lote a medida que llega del origen
+            writer = loader.crear_writer(clean_columns_list)
+            print(f"🔍 SQL INSERT: {writer.insert_sql}")
+            lotes_leidos = 0
+            try:
+                for lote in lotes:
+                    lotes_leidos += 1
+                    writer.write(lote)
+                estadisticas_insercion = writer.resumen()
+            finally:
+                writer.close()
+            self._registrar_spans_escritura(objetivo, estadisticas_insercion)
+            
+            registros_insertados = estadisticas_insercion['registros_insertados']
+            if estadisticas_insercion['registros_cuarentena']:
+                print(f"   ⚠️ Transferencia con filas rechazadas: {registros_insertados} insertadas, "
+                      f"{estadisticas_insercion['registros_cuarentena']} en cuarentena '{writer.quarantine_table}'")
+            else:
+                print(f"   ✅ {registros_insertados} registros transferidos en {lotes_leidos} lotes de lectura")
+            
+            # Confirmar transacción y publicar la tabla (intercambio atómico en staging_swap)
+            with self._span('commit', objetivo, filas=registros_insertados):
+                loader.finalizar()
+            self._release_destination_connection(conn)
+            
+            return True, {
+                'success': True,
+                'table_name': nombre_tabla_destino,
+                'records_inserted': registros_insertados,
+                'columns': columnas_origen,
+                'proceso_id': proceso_id,
+                'estadisticas_insercion': estadisticas_insercion,
+                'lotes_lectura': lotes_leidos,
+                'load_strategy': loader.strategy,
+                'duracion_swap_ms': loader.duracion_swap_ms,
+                'estadisticas_merge': loader.estadisticas_merge
+            }
+            
+        except Exception as e:
+            error_msg = f"Error guardando datos en tabla '{nombre_tabla_destino}': {str(e)}"
+            print(f"❌ {error_msg}")
+            
+            # Descartar staging (la tabla destino anterior queda intacta) y cerrar conexión
+            if 'loader' in locals():
+                loader.abortar()
+            try:
+                if 'conn' in locals():
+                    self._release_destination_connection(conn)
+            except:
+                pass
+            
+            return False, {
+                'success': False,
+                'error': error_msg,
+                'table_name': nombre_tabla_destino,
+                'proceso_id': proceso_id
+            }
+
+    def _get_clean_destination_columns(self, columns, source_table_name=None):
+        """
+        Obtiene los nombres de columnas destino aplicando column_mappings y limpiando
+        caracteres no válidos (mismo criterio que _generate_create_table_sql)
+        
+        Args:
+            columns: Columnas originales del DataFrame/tabla origen
+            source_table_name: Nombre de la tabla/hoja origen (para aplicar column_mappings)
+            
+        Returns:
+            list: Nombres de columnas limpios en el mismo orden
+        """
+        column_mappings = {}
+        if self.column_mappings and source_table_name and source_table_name in self.column_mappings:
+            column_mappings = self.column_mappings[source_table_name]
+        
+        clean_columns_list = []
+        for col in columns:
+            # Usar nombre personalizado si existe en el mapeo
+            custom_name = column_mappings.get(col, col)
+            clean_col = str(custom_name).replace(' ', '_').replace('-', '_')
+            clean_col = ''.join(c for c in clean_col if c.isalnum() or c == '_')
+            clean_columns_list.append(clean_col)
+        
+        return clean_columns_list
+
+    def _generate_create_table_sql(self, df, table_name, source_table_name=None, tipos_estables=False):
         """
         Genera SQL CREATE TABLE basado en las columnas y tipos del DataFrame
         
@@ -1593,6 +2623,9 @@ class MigrationProcess(models.Model):
             df: DataFrame de Pandas
             table_name: Nombre de la tabla destino a crear
             source_table_name: Nombre de la tabla/hoja origen (para aplicar column_mappings)
+            tipos_estables: True si df es solo el primer bloque de una carga por bloques:
+                enteros como BIGINT y textos como NVARCHAR(MAX), sin ajustar la
+                longitud a los valores de este bloque
             
         Returns:
             str: SQL CREATE TABLE statement
@@ -1619,13 +2652,16 @@ class MigrationProcess(models.Model):
             dtype = df[column].dtype
             
             if pd.api.types.is_integer_dtype(dtype):
-                sql_type = 'INT'
+                sql_type = 'BIGINT' if tipos_estables else 'INT'
             elif pd.api.types.is_float_dtype(dtype):
                 sql_type = 'FLOAT'
             elif pd.api.types.is_bool_dtype(dtype):
                 sql_type = 'BIT'
             elif pd.api.types.is_datetime64_any_dtype(dtype):
                 sql_type = 'DATETIME2'
+            elif tipos_estables:
+                # Los bloques siguientes pueden traer textos más largos que el primero
+                sql_type = 'NVARCHAR(MAX)'
             else:
                 # Para strings y otros tipos, usar NVARCHAR
                 # Calcular longitud máxima de la columna
@@ -1650,6 +2686,73 @@ class MigrationProcess(models.Model):
         
         return create_sql
 
+    def _alinear_bloque(self, bloque, tipos_referencia):
+        """
+        Convierte las columnas de un bloque posterior a los tipos que tenían en el
+        primer bloque, con los que se creó la tabla destino
+        
+        La limpieza por bloque (fillna('')) cambia el tipo de una columna numérica
+        en cuanto un bloque trae vacíos; aquí vuelven a ser números, con None en
+        lugar de ''.
+        
+        Args:
+            bloque: DataFrame a insertar
+            tipos_referencia: dtypes del primer bloque (Series columna -> dtype)
+            
+        Returns:
+            DataFrame: Bloque con los tipos de referencia
+        
+        Raises:
+            ValueError: Si una columna entera trae decimales (no caben en BIGINT) o
+                una columna booleana, numérica o de fecha trae valores que no se pueden convertir
+        """
+        import pandas as pd
+        
+        convertidas = {}
+        for columna, dtype in tipos_referencia.items():
+            if columna not in bloque.columns or bloque[columna].dtype == dtype:
+                continue
+            serie = bloque[columna]
+            
+            if pd.api.types.is_bool_dtype(dtype):
+                valores = serie.map({True: True, False: False, 'True': True, 'False': False})
+                self._verificar_conversion(columna, serie, valores)
+                convertidas[columna] = valores.astype(object)
+            elif pd.api.types.is_numeric_dtype(dtype):
+                valores = pd.to_numeric(serie, errors='coerce')
+                self._verificar_conversion(columna, serie, valores)
+                if pd.api.types.is_integer_dtype(dtype) and (valores.dropna() % 1 != 0).any():
+                    raise ValueError(
+                        f"La columna '{columna}' tenía enteros en el primer bloque y trae decimales en un bloque posterior"
+                    )
+                convertidas[columna] = valores
+            elif pd.api.types.is_datetime64_any_dtype(dtype):
+                valores = pd.to_datetime(serie, errors='coerce')
+                self._verificar_conversion(columna, serie, valores)
+                convertidas[columna] = valores
+            else:
+                convertidas[columna] = serie.astype(str).replace({
+                    'nan': '', 'NaN': '', 'None': '', '<NA>': '', 'NaT': ''
+                })
+        
+        if not convertidas:
+            return bloque
+        bloque = bloque.copy()
+        for columna, serie in convertidas.items():
+            bloque[columna] = serie
+        return bloque
+
+    @staticmethod
+    def _verificar_conversion(columna, original, convertida):
+        """Falla si la conversión de _alinear_bloque dejó en nulo valores que no lo eran"""
+        perdidos = convertida.isna() & original.notna() & (original.astype(str).str.strip() != '')
+        if perdidos.any():
+            ejemplo = original[perdidos].iloc[0]
+            raise ValueError(
+                f"La columna '{columna}' trae valores que no encajan con el tipo del primer bloque "
+                f"({int(perdidos.sum())} filas, p. ej. {ejemplo!r})"
+            )
+
 class MigrationLog(models.Model):
     """
     Registra eventos y resultados de cada ejecución del proceso de migración
@@ -1680,7 +2783,9 @@ class MigrationLog(models.Model):
     ]
     
     process = models.ForeignKey(MigrationProcess, on_delete=models.CASCADE, related_name='logs')
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # default en lugar de auto_now_add: los registros que se escriben en bloque
+    # (MigrationLogBuffer) conservan la hora del evento
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     stage = models.CharField(max_length=30, choices=LOG_STAGES)
     level = models.CharField(max_length=20, choices=LOG_LEVELS, default='info')
     message = models.TextField()
@@ -1697,8 +2802,12 @@ class MigrationLog(models.Model):
     def log(cls, process, stage, message, level='info', rows=0, duration=0, error=None, details=None, user=None):
         """
         Método de clase para crear un nuevo registro de log
+        
+        Durante MigrationProcess.run() el registro se agrega al buffer de la
+        ejecución (process._log_buffer) y se escribe en bloque al llenarse el
+        buffer o al terminar; los errores se escriben de inmediato.
         """
-        return cls.objects.create(
+        registro = cls(
             process=process,
             stage=stage,
             message=message,
@@ -1709,6 +2818,11 @@ class MigrationLog(models.Model):
             details=details or {},
             user=user
         )
+        buffer = getattr(process, '_log_buffer', None)
+        if buffer is not None:
+            return buffer.agregar(registro)
+        registro.save()
+        return registro
         
     def complete_log(self, stage, message=None, rows_processed=0, duration_ms=0, error_message=None):
         """
@@ -0,0 +1,182 @@
+"""
+Extracción paralela por rangos de clave para tablas SQL Server grandes
+
+El rango [mínimo, máximo] de una clave entera o de fecha se divide en N tramos
+contiguos. Cada tramo se lee con su propia conexión en un hilo, en lotes de
+fetchmany, y los lotes se entregan por una cola acotada a un único consumidor
+(el escritor de la tabla destino). La cola acotada limita la memoria: si el
+destino es más lento que el origen, los hilos lectores esperan.
+"""
+
+import queue
+import logging
+import datetime
+import threading
+
+logger = logging.getLogger('parallel_extractor')
+
+# Tipos SQL Server que admiten división por rangos
+TIPOS_CLAVE_ENTERA = ('tinyint', 'smallint', 'int', 'bigint')
+TIPOS_CLAVE_FECHA = ('date', 'datetime', 'datetime2', 'smalldatetime')
+
+# Tablas con menos filas estimadas que esto se leen de forma secuencial
+TRAMOS_MIN_FILAS = 100000
+
+# Lotes en cola por cada hilo lector antes de que este se bloquee
+LOTES_EN_COLA_POR_HILO = 2
+
+_FIN_TRAMO = object()
+
+
+class ParallelExtractionError(Exception):
+    """Excepción para errores en un tramo de la extracción paralela"""
+    pass
+
+
+def calcular_tramos(minimo, maximo, grado):
+    """
+    Divide el rango [minimo, maximo] en hasta `grado` tramos contiguos
+
+    Cada tramo es (desde, hasta) con desde inclusivo y hasta exclusivo, salvo el
+    último, cuyo `hasta` es None (sin límite superior) para incluir el máximo.
+
+    Args:
+        minimo: Valor mínimo de la clave (int, date o datetime)
+        maximo: Valor máximo de la clave (mismo tipo que minimo)
+        grado: Número de tramos deseado
+
+    Returns:
+        list[tuple]: Tramos (desde, hasta)
+    """
+    if minimo is None or maximo is None:
+        return []
+
+    grado = max(1, int(grado))
+
+    if isinstance(minimo, datetime.datetime):
+        paso = (maximo - minimo) / grado
+        limites = [minimo + paso * i for i in range(1, grado)]
+    elif isinstance(minimo, datetime.date):
+        dias = (maximo - minimo).days
+        limites = [minimo + datetime.timedelta(days=(dias * i) // grado) for i in range(1, grado)]
+    else:
+        ancho = int(maximo) - int(minimo) + 1
+        limites = [int(minimo) + (ancho * i) // grado for i in range(1, grado)]
+
+    # Eliminar límites repetidos cuando el rango es menor que el grado
+    cortes = []
+    for limite in limites:
+        if limite > minimo and (not cortes or limite > cortes[-1]):
+            cortes.append(limite)
+
+    desde = [minimo] + cortes
+    hasta = cortes + [None]
+    return list(zip(desde, hasta))
+
+
+def construir_consulta_tramo(consulta_base, columna_clave, hasta):
+    """
+    Agrega el filtro de rango a un SELECT sin WHERE
+
+    Returns:
+        str: Consulta con parámetros (desde[, hasta])
+    """
+    if hasta is None:
+        return f"{consulta_base} WHERE [{columna_clave}] >= ?"
+    return f"{consulta_base} WHERE [{columna_clave}] >= ? AND [{columna_clave}] < ?"
+
+
+class ParallelRangeExtractor:
+    """
+    Lee una consulta por tramos de clave en paralelo y entrega los lotes en un
+    único iterador
+    """
+
+    def __init__(self, crear_conector, consulta_base, columna_clave, tramos, batch_size):
+        """
+        Args:
+            crear_conector: Callable sin argumentos que devuelve un SQLServerConnector
+                            ya conectado a la base de datos origen (uno por hilo)
+            consulta_base: SELECT ... FROM [esquema].[tabla] sin cláusula WHERE
+            columna_clave: Columna por la que se divide el rango
+            tramos: Lista de (desde, hasta) de calcular_tramos
+            batch_size: Filas por fetchmany
+        """
+        self.crear_conector = crear_conector
+        self.consulta_base = consulta_base
+        self.columna_clave = columna_clave
+        self.tramos = list(tramos)
+        self.batch_size = batch_size
+
+        self.cola = queue.Queue(maxsize=max(1, len(self.tramos)) * LOTES_EN_COLA_POR_HILO)
+        self.detener = threading.Event()
+        self.filas_por_tramo = [0] * len(self.tramos)
+        self._hilos = []
+
+    def _leer_tramo(self, indice, desde, hasta):
+        """Lee un tramo completo con su propia conexión y encola sus lotes"""
+        conector = None
+        try:
+            conector = self.crear_conector()
+            consulta = construir_consulta_tramo(self.consulta_base, self.columna_clave, hasta)
+            params = (desde,) if hasta is None else (desde, hasta)
+
+            _, lotes = conector.stream_query(consulta, params, batch_size=self.batch_size)
+            for lote in lotes:
+                if self.detener.is_set():
+                    lotes.close()
+                    break
+                self.filas_por_tramo[indice] += len(lote)
+                self._encolar(lote)
+
+            logger.info(f"Tramo {indice + 1}/{len(self.tramos)} [{desde}, {hasta}) leído: "
+                        f"{self.filas_por_tramo[indice]} filas")
+            self._encolar(_FIN_TRAMO)
+        except Exception as e:
+            self._encolar(ParallelExtractionError(f"Tramo {indice + 1} [{desde}, {hasta}): {str(e)}"))
+        finally:
+            if conector:
+                conector.disconnect()
+
+    def _encolar(self, elemento):
+        """Encola esperando espacio, salvo que el consumidor haya abandonado"""
+        while not self.detener.is_set():
+            try:
+                self.cola.put(elemento, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def iterar_lotes(self):
+        """
+        Inicia un hilo por tramo y devuelve los lotes en el orden en que llegan
+
+        Si un tramo falla se detienen los demás y se lanza ParallelExtractionError.
+
+        Yields:
+            list[tuple]: Lote de filas
+        """
+        for indice, (desde, hasta) in enumerate(self.tramos):
+            hilo = threading.Thread(
+                target=self._leer_tramo,
+                args=(indice, desde, hasta),
+                name=f'extraccion-tramo-{indice + 1}',
+                daemon=True
+            )
+            self._hilos.append(hilo)
+            hilo.start()
+
+        pendientes = len(self._hilos)
+        try:
+            while pendientes:
+                elemento = self.cola.get()
+                if elemento is _FIN_TRAMO:
+                    pendientes -= 1
+                elif isinstance(elemento, Exception):
+                    raise elemento
+                else:
+                    yield elemento
+        finally:
+            self.detener.set()
+            for hilo in self._hilos:
+                hilo.join(timeout=5)
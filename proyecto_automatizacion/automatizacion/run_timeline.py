@@ -0,0 +1,141 @@
+"""
+Línea de tiempo por etapas de una ejecución de MigrationProcess
+
+run() solo registraba duraciones gruesas (duracion_extraccion, TiempoEjecucion).
+Aquí cada hoja o tabla mide por separado sus etapas:
+
+    lectura → limpieza → inferencia de tipos → DDL → materialización de filas
+    → inserción → commit
+
+Uso:
+    timeline = RunTimeline()
+    with timeline.span('limpieza', 'Hoja1', filas=len(df)) as tramo:
+        df = limpiar(df)
+        tramo['bytes'] = bytes_dataframe(df)
+    timeline.registrar('insercion', 'Hoja1', segundos, filas=n)
+
+Las mediciones repetidas de una misma etapa y objetivo (p. ej. una hoja leída por
+bloques) se acumulan en un solo tramo con el número de veces. resumen() devuelve
+una estructura JSON que run() guarda en MigrationLog.details['timeline'] del
+registro final de la ejecución.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+# Etapas en el orden en que ocurren (clave, etiqueta)
+ETAPAS = [
+    ('lectura', 'Lectura'),
+    ('limpieza', 'Limpieza'),
+    ('inferencia_tipos', 'Inferencia de tipos'),
+    ('ddl', 'DDL'),
+    ('materializacion', 'Materialización de filas'),
+    ('insercion', 'Inserción'),
+    ('commit', 'Commit'),
+]
+ETIQUETAS = dict(ETAPAS)
+
+
+def bytes_dataframe(df):
+    """Memoria de los datos de un DataFrame sin recorrer los objetos (estimación barata)"""
+    try:
+        return int(df.memory_usage(index=False).sum())
+    except Exception:
+        return 0
+
+
+class RunTimeline:
+    """
+    Tramos (objetivo, etapa) medidos durante una ejecución
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self._tramos = {}  # (objetivo, etapa) -> tramo (en orden de primera medición)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, etapa, objetivo=None, filas=0, bytes=0):
+        """
+        Mide el bloque como una etapa del objetivo; filas y bytes pueden
+        completarse dentro del bloque en el dict entregado
+        """
+        tramo = {'filas': filas, 'bytes': bytes}
+        desde = time.perf_counter()
+        try:
+            yield tramo
+        finally:
+            self.registrar(
+                etapa, objetivo, time.perf_counter() - desde,
+                filas=tramo['filas'], bytes=tramo['bytes'], desde=desde
+            )
+
+    def registrar(self, etapa, objetivo=None, segundos=0.0, filas=0, bytes=0, desde=None):
+        """
+        Agrega una medición ya tomada (p. ej. los tiempos acumulados de BulkWriter)
+
+        Args:
+            desde: time.perf_counter() del comienzo; por defecto, ahora - segundos
+        """
+        if desde is None:
+            desde = time.perf_counter() - segundos
+        clave = (objetivo, etapa)
+        with self._lock:
+            tramo = self._tramos.get(clave)
+            if tramo is None:
+                self._tramos[clave] = {
+                    'objetivo': objetivo,
+                    'etapa': etapa,
+                    'inicio_s': round(desde - self.inicio, 4),
+                    'segundos': segundos,
+                    'filas': filas or 0,
+                    'bytes': bytes or 0,
+                    'veces': 1,
+                }
+            else:
+                tramo['segundos'] += segundos
+                tramo['filas'] += filas or 0
+                tramo['bytes'] += bytes or 0
+                tramo['veces'] += 1
+
+    def __bool__(self):
+        return bool(self._tramos)
+
+    def resumen(self):
+        """
+        Returns:
+            dict: total_s, tramos (por objetivo y etapa, en orden) y por_etapa
+                  (segundos, filas, bytes y porcentaje del total medido)
+        """
+        with self._lock:
+            tramos = [dict(t) for t in self._tramos.values()]
+
+        medido = sum(t['segundos'] for t in tramos)
+        por_etapa = {}
+        for tramo in tramos:
+            total = por_etapa.setdefault(tramo['etapa'], {'segundos': 0.0, 'filas': 0, 'bytes': 0})
+            total['segundos'] += tramo['segundos']
+            tramo['etiqueta'] = ETIQUETAS.get(tramo['etapa'], tramo['etapa'])
+            tramo['porcentaje'] = round(tramo['segundos'] * 100 / medido, 1) if medido else 0
+            tramo['segundos'] = round(tramo['segundos'], 4)
+            total['filas'] += tramo['filas']
+            total['bytes'] += tramo['bytes']
+
+        orden = [clave for clave, _ in ETAPAS] + [e for e in por_etapa if e not in ETIQUETAS]
+        return {
+            'total_s': round(time.perf_counter() - self.inicio, 4),
+            'medido_s': round(medido, 4),
+            'tramos': tramos,
+            'por_etapa': [
+                {
+                    'etapa': etapa,
+                    'etiqueta': ETIQUETAS.get(etapa, etapa),
+                    'segundos': round(por_etapa[etapa]['segundos'], 4),
+                    'filas': por_etapa[etapa]['filas'],
+                    'bytes': por_etapa[etapa]['bytes'],
+                    'porcentaje': round(por_etapa[etapa]['segundos'] * 100 / medido, 1) if medido else 0,
+                }
+                for etapa in orden if etapa in por_etapa
+            ],
+        }
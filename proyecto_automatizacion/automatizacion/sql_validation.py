@@ -2,7 +2,27 @@
 Utilidad para validar tablas SQL en conexiones
 """
 
-import pyodbc
+import hashlib
+
+# Tablas por consulta en validate_tables (2 parámetros por tabla; SQL Server admite 2100)
+TABLAS_POR_CONSULTA = 1000
+
+
+def _pooled_connection(connection):
+    """
+    Conexión del pool del proceso para la base seleccionada de un DatabaseConnection
+    (la misma que usa SQLServerConnector), devuelta al pool al salir del bloque
+    """
+    from .utils import SQLServerConnector
+    
+    connector = SQLServerConnector(
+        connection.server,
+        connection.username,
+        connection.password,
+        connection.port,
+        database=connection.selected_database
+    )
+    return connector.pooled_connection()
 
 def check_table_exists(connection, table_name):
     """
@@ -26,61 +46,143 @@ def check_table_exists(connection, table_name):
             schema = 'dbo'  # Esquema por defecto
             name = table_name
         
-        # Crear string de conexión
-        conn_string = f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={connection.server};DATABASE={connection.selected_database};UID={connection.username};PWD={connection.password}'
-        
-        # Conectar a la base de datos
-        conn = pyodbc.connect(conn_string)
-        cursor = conn.cursor()
-        
-        # Verificar si la tabla existe
-        query = """
-        SELECT COUNT(*) 
-        FROM INFORMATION_SCHEMA.TABLES 
-        WHERE TABLE_SCHEMA = ? AND TABLE_NAME = ?
-        """
-        
-        cursor.execute(query, (schema, name))
-        result = cursor.fetchone()
-        
-        exists = result[0] > 0
-        
-        cursor.close()
-        conn.close()
-        
-        return exists
+        # Verificar si la tabla existe con una conexión del pool
+        with _pooled_connection(connection) as conn:
+            cursor = conn.cursor()
+            
+            query = """
+            SELECT COUNT(*) 
+            FROM INFORMATION_SCHEMA.TABLES 
+            WHERE TABLE_SCHEMA = ? AND TABLE_NAME = ?
+            """
+            
+            cursor.execute(query, (schema, name))
+            result = cursor.fetchone()
+            cursor.close()
+        
+        return result[0] > 0
         
     except Exception as e:
         print(f"Error verificando tabla '{table_name}': {str(e)}")
         return False
 
-def get_valid_tables(connection, table_list):
+def _table_name(table):
+    """Nombre de una tabla seleccionada (diccionario o string)"""
+    if isinstance(table, dict):
+        return table.get('full_name') or table.get('name', '')
+    return table
+
+def _split_table_name(table_name):
+    """Separa 'esquema.tabla' (esquema dbo por defecto)"""
+    if '.' in table_name:
+        return tuple(table_name.split('.', 1))
+    return 'dbo', table_name
+
+def column_signature(columns):
     """
-    Filtra una lista de tablas y devuelve solo las que existen
+    Firma de la estructura de una tabla: cambia si se agrega, quita, renombra o
+    cambia de tipo/nulabilidad alguna columna
+    """
+    texto = '|'.join(f"{col['name']}:{col['type']}:{int(col['nullable'])}" for col in columns)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:16]
+
+def validate_tables(connection, table_list):
+    """
+    Valida una lista de tablas con una sola consulta de catálogo sobre una conexión
+    del pool (en lugar de una conexión y una consulta por tabla)
+    
+    Además de la existencia devuelve, por tabla, las filas estimadas según
+    sys.partitions (sin COUNT(*)) y las columnas con su firma, para que la
+    extracción no tenga que volver a consultarlas.
     
     Args:
         connection: Objeto DatabaseConnection
-        table_list: Lista de nombres de tablas
+        table_list: Lista de tablas (diccionarios con full_name/name o strings)
     
     Returns:
-        list: Lista de nombres de tablas que existen
+        dict: {
+            'valid': tablas de table_list que existen (en el mismo orden y formato),
+            'missing': nombres de las que no existen,
+            'tables': {nombre: {'schema', 'name', 'row_estimate', 'columns', 'signature'}}
+        }
     """
+    resultado = {'valid': [], 'missing': [], 'tables': {}}
     if not connection or not table_list:
-        return []
-    
-    valid_tables = []
+        return resultado
     
+    solicitadas = []
     for table in table_list:
-        # Manejar tanto diccionarios como strings
-        if isinstance(table, dict):
-            table_name = table.get('full_name') or table.get('name', '')
-        else:
-            table_name = table
-        
-        if table_name and check_table_exists(connection, table_name):
-            valid_tables.append(table)
+        table_name = _table_name(table)
+        if table_name:
+            solicitadas.append((table, table_name, _split_table_name(table_name)))
+    
+    # SQL Server compara nombres sin distinguir mayúsculas con la intercalación habitual
+    encontradas = {}
+    try:
+        with _pooled_connection(connection) as conn:
+            cursor = conn.cursor()
+            pares = sorted({(schema, name) for _, _, (schema, name) in solicitadas})
+            for inicio in range(0, len(pares), TABLAS_POR_CONSULTA):
+                grupo = pares[inicio:inicio + TABLAS_POR_CONSULTA]
+                valores = ', '.join(['(?, ?)'] * len(grupo))
+                cursor.execute(f"""
+                    SELECT t.TABLE_SCHEMA, t.TABLE_NAME, e.filas,
+                           c.COLUMN_NAME, c.DATA_TYPE, c.CHARACTER_MAXIMUM_LENGTH, c.IS_NULLABLE
+                    FROM (VALUES {valores}) AS q(esquema, tabla)
+                    JOIN INFORMATION_SCHEMA.TABLES t
+                      ON t.TABLE_SCHEMA = q.esquema AND t.TABLE_NAME = q.tabla
+                    OUTER APPLY (
+                        SELECT SUM(p.rows) AS filas
+                        FROM sys.partitions p
+                        WHERE p.object_id = OBJECT_ID(QUOTENAME(t.TABLE_SCHEMA) + '.' + QUOTENAME(t.TABLE_NAME))
+                          AND p.index_id IN (0, 1)
+                    ) e
+                    JOIN INFORMATION_SCHEMA.COLUMNS c
+                      ON c.TABLE_SCHEMA = t.TABLE_SCHEMA AND c.TABLE_NAME = t.TABLE_NAME
+                    ORDER BY t.TABLE_SCHEMA, t.TABLE_NAME, c.ORDINAL_POSITION
+                """, [valor for par in grupo for valor in par])
+                
+                for schema, name, filas, column, data_type, max_length, is_nullable in cursor.fetchall():
+                    tabla = encontradas.setdefault((schema.lower(), name.lower()), {
+                        'schema': schema,
+                        'name': name,
+                        'row_estimate': int(filas) if filas is not None else None,
+                        'columns': [],
+                    })
+                    tabla['columns'].append(_format_column(column, data_type, max_length, is_nullable))
+            cursor.close()
+    except Exception as e:
+        print(f"Error validando tablas: {str(e)}")
+        return resultado
+    
+    for table, table_name, (schema, name) in solicitadas:
+        tabla = encontradas.get((schema.lower(), name.lower()))
+        if tabla is None:
+            resultado['missing'].append(table_name)
+            continue
+        resultado['valid'].append(table)
+        if table_name not in resultado['tables']:
+            tabla['signature'] = column_signature(tabla['columns'])
+            resultado['tables'][table_name] = tabla
     
-    return valid_tables
+    return resultado
+
+def _format_column(name, data_type, max_length, is_nullable):
+    from .utils import SQLServerConnector
+    return SQLServerConnector._format_column(name, data_type, max_length, is_nullable)
+
+def get_valid_tables(connection, table_list):
+    """
+    Filtra una lista de tablas y devuelve solo las que existen
+    
+    Args:
+        connection: Objeto DatabaseConnection
+        table_list: Lista de nombres de tablas
+    
+    Returns:
+        list: Lista de nombres de tablas que existen
+    """
+    return validate_tables(connection, table_list)['valid']
 
 def ensure_test_table(connection):
     """
@@ -99,41 +201,37 @@ def ensure_test_table(connection):
         if check_table_exists(connection, TEST_TABLE_NAME):
             return TEST_TABLE_NAME
         
-        # Crear string de conexión
-        conn_string = f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={connection.server};DATABASE={connection.selected_database};UID={connection.username};PWD={connection.password}'
-        
-        # Conectar a la base de datos
-        conn = pyodbc.connect(conn_string)
-        cursor = conn.cursor()
-        
-        # Crear tabla con estructura estándar
-        create_table_query = f"""
-        CREATE TABLE {TEST_TABLE_NAME} (
-            ID INT PRIMARY KEY,
-            Nombre NVARCHAR(100),
-            Descripcion NVARCHAR(255),
-            Cantidad INT,
-            FechaCreacion DATETIME DEFAULT GETDATE()
-        )
-        """
-        cursor.execute(create_table_query)
-        conn.commit()
-        
-        # Insertar datos de prueba
-        insert_data_query = f"""
-        INSERT INTO {TEST_TABLE_NAME} (ID, Nombre, Descripcion, Cantidad)
-        VALUES 
-            (1, 'Producto A', 'Producto de prueba A', 100),
-            (2, 'Producto B', 'Producto de prueba B', 200),
-            (3, 'Producto C', 'Producto de prueba C', 300),
-            (4, 'Producto D', 'Producto de prueba D', 400),
-            (5, 'Producto E', 'Producto de prueba E', 500)
-        """
-        cursor.execute(insert_data_query)
-        conn.commit()
-        
-        cursor.close()
-        conn.close()
+        # Conexión del pool (se devuelve al salir del bloque)
+        with _pooled_connection(connection) as conn:
+            cursor = conn.cursor()
+            
+            # Crear tabla con estructura estándar
+            create_table_query = f"""
+            CREATE TABLE {TEST_TABLE_NAME} (
+                ID INT PRIMARY KEY,
+                Nombre NVARCHAR(100),
+                Descripcion NVARCHAR(255),
+                Cantidad INT,
+                FechaCreacion DATETIME DEFAULT GETDATE()
+            )
+            """
+            cursor.execute(create_table_query)
+            conn.commit()
+            
+            # Insertar datos de prueba
+            insert_data_query = f"""
+            INSERT INTO {TEST_TABLE_NAME} (ID, Nombre, Descripcion, Cantidad)
+            VALUES 
+                (1, 'Producto A', 'Producto de prueba A', 100),
+                (2, 'Producto B', 'Producto de prueba B', 200),
+                (3, 'Producto C', 'Producto de prueba C', 300),
+                (4, 'Producto D', 'Producto de prueba D', 400),
+                (5, 'Producto E', 'Producto de prueba E', 500)
+            """
+            cursor.execute(insert_data_query)
+            conn.commit()
+            
+            cursor.close()
         
         return TEST_TABLE_NAME
         
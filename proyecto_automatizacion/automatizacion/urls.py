@@ -27,6 +27,7 @@ urlpatterns = [
     path('sql/connections/', views.list_connections, name='list_connections'),
     path('sql/connection/<int:connection_id>/', views.view_connection, name='view_connection'),
     path('sql/connection/<int:connection_id>/databases/', views.list_sql_databases, name='list_sql_databases'),
+    path('sql/connection/<int:connection_id>/catalog-cache/', views.connection_catalog_cache, name='connection_catalog_cache'),
     path('sql/connection/<int:connection_id>/select_database/', views.select_database, name='select_database'),
     path('sql/connection/<int:connection_id>/tables/', views.list_sql_tables, name='list_sql_tables'),
     path('sql/connection/<int:connection_id>/table/<str:table_name>/columns/', views.list_sql_columns, name='list_sql_columns'),
@@ -36,6 +37,11 @@ urlpatterns = [
     path('api/save_excel_multi_process/', views.save_excel_multi_process, name='save_excel_multi_process'),
     path('api/delete_connection/<int:connection_id>/', views.delete_connection, name='delete_connection'),
     path('api/process/<int:process_id>/load_columns/', views.load_process_columns, name='load_process_columns'),
+    path('api/source/<int:source_id>/analysis/', views.source_analysis_status, name='source_analysis_status'),
+    path('api/sql/connection/<int:connection_id>/table/<str:table_name>/row_count/', views.sql_row_count, name='sql_row_count'),
+    
+    # Métricas para Prometheus
+    path('metrics/', views.metrics_endpoint, name='metrics'),
     
     # Rutas para Transferencia Segura de Datos  
     path('sql/connection/<int:connection_id>/table/<str:table_name>/transfer/', 
@@ -6,6 +6,10 @@ import uuid
 import numpy as np
 from datetime import datetime
 from django.conf import settings
+from . import file_cache
+
+# Filas por lote al leer tablas SQL en streaming (fetchmany)
+SQL_FETCH_BATCH_SIZE = 10000
 
 class ExcelProcessor:
     """
@@ -26,11 +30,57 @@ class ExcelProcessor:
             
     def get_sheet_names(self):
         """Retorna la lista de nombres de hojas en el Excel"""
+        sheet_names = file_cache.leer_metadatos(self.file_path).get('sheet_names')
+        if sheet_names is not None:
+            return sheet_names
+        
         if self.excel_file is None and not self.load_file():
             return []
         
+        file_cache.guardar_metadatos(self.file_path, sheet_names=self.excel_file.sheet_names)
         return self.excel_file.sheet_names
     
+    def _read_sheet(self, sheet_name):
+        """
+        Lee la hoja completa desde la caché columnar; si no está, la parsea una vez
+        desde el libro abierto y la guarda en caché
+        """
+        def parsear():
+            if self.excel_file is None and not self.load_file():
+                raise Exception(f'No se pudo abrir el archivo {self.file_path}')
+            return self.excel_file.parse(sheet_name)
+        
+        return file_cache.obtener_hoja(self.file_path, sheet_name, parsear)
+    
+    def _read_sample(self, sheet_name, max_rows):
+        """
+        Primeras max_rows filas de la hoja y su total de filas, sin parsearla completa
+        
+        Usa la caché si ya tiene la hoja; si no, lee solo la muestra (nrows) y el
+        total sale de la dimensión guardada en la hoja. Las vistas previas nunca
+        llenan la caché: las hojas grandes se leen en streaming al ejecutar.
+        
+        Returns:
+            Tuple[DataFrame, int]: (muestra, total de filas)
+        """
+        from .excel_stream import filas_estimadas
+        
+        df_cache = file_cache.leer_hoja(self.file_path, sheet_name)
+        if df_cache is not None:
+            return df_cache.head(max_rows).copy(), len(df_cache)
+        
+        df = self.excel_file.parse(sheet_name, nrows=max_rows)
+        total_rows = None
+        if self.excel_file.engine == 'openpyxl':
+            hoja = self.excel_file.book[sheet_name]
+            total_rows = filas_estimadas(hoja)
+            if total_rows is None:
+                total_rows = max(sum(1 for _ in hoja.iter_rows(values_only=True)) - 1, 0)
+        if total_rows is None:
+            # Otros motores (p. ej. xls) no guardan la dimensión: lectura completa
+            total_rows = len(self._read_sheet(sheet_name))
+        return df, total_rows
+    
     def _clean_dataframe(self, df):
         """
         Limpia el DataFrame: renombra columnas Unnamed y reemplaza valores NaN
@@ -81,26 +131,106 @@ class ExcelProcessor:
             return None
             
         try:
-            df = pd.read_excel(self.file_path, sheet_name=sheet_name, nrows=max_rows)
+            df, total_rows = self._read_sample(sheet_name, max_rows)
             df = self._clean_dataframe(df)  # Limpiar datos
             
             return {
                 'columns': list(df.columns),
                 'sample_data': df.head(max_rows).values.tolist(),  # Convertir a lista de listas
                 'data': df.head(max_rows).to_dict('records'),
-                'total_rows': len(pd.read_excel(self.file_path, sheet_name=sheet_name)),
+                'total_rows': total_rows,
             }
         except Exception as e:
             print(f"Error al leer la hoja {sheet_name}: {str(e)}")
             return None
             
+    def get_workbook_metadata(self, max_rows=10):
+        """
+        Obtiene en una sola pasada por el libro, para cada hoja: columnas con tipos
+        inferidos, vista previa y número de filas.
+        
+        Con openpyxl solo se leen las primeras max_rows filas de cada hoja y el total
+        de filas sale de la dimensión guardada en la hoja, sin parsearla completa.
+        
+        Returns:
+            dict: {hoja: {'columns', 'preview', 'total_rows', 'column_count'}}
+        """
+        from .excel_stream import nombres_columnas, filas_estimadas
+        
+        if self.excel_file is None and not self.load_file():
+            return {}
+        
+        if self.excel_file.engine != 'openpyxl':
+            # Otros motores (p. ej. xls): lectura por hoja como antes
+            metadata = {}
+            for sheet_name in self.get_sheet_names():
+                columns = self.get_sheet_columns(sheet_name)
+                preview = self.get_sheet_preview(sheet_name, max_rows)
+                metadata[sheet_name] = {
+                    'columns': columns,
+                    'preview': preview,
+                    'total_rows': preview.get('total_rows', 0) if preview else 0,
+                    'column_count': len(columns) if columns else 0
+                }
+            return metadata
+        
+        metadata = {}
+        for sheet_name in self.get_sheet_names():
+            try:
+                hoja = self.excel_file.book[sheet_name]
+                filas = hoja.iter_rows(max_row=max_rows + 1, values_only=True)
+                encabezado = next(filas, None)
+                
+                if encabezado is None:
+                    df = pd.DataFrame()
+                else:
+                    columnas = nombres_columnas(encabezado)
+                    muestra = [tuple(fila[:len(columnas)]) + (None,) * (len(columnas) - len(fila)) for fila in filas]
+                    # Descartar filas vacías al final de la muestra, como pandas
+                    while muestra and all(valor is None for valor in muestra[-1]):
+                        muestra.pop()
+                    df = pd.DataFrame.from_records(muestra, columns=columnas)
+                
+                total_rows = filas_estimadas(hoja)
+                if total_rows is None:
+                    # La hoja no guarda su dimensión: contar filas sin construir DataFrame
+                    total_rows = max(sum(1 for _ in hoja.iter_rows(values_only=True)) - 1, 0)
+                
+                df = self._clean_dataframe(df)  # Limpiar datos (igual que get_sheet_columns)
+                columns = [{
+                    'name': col,
+                    'type': df[col].dtype.name,
+                    'sql_type': self._map_pandas_type_to_sql(df[col].dtype.name),
+                } for col in df.columns]
+                
+                metadata[sheet_name] = {
+                    'columns': columns,
+                    'preview': {
+                        'columns': list(df.columns),
+                        'sample_data': df.values.tolist(),
+                        'data': df.to_dict('records'),
+                        'total_rows': total_rows,
+                    },
+                    'total_rows': total_rows,
+                    'column_count': len(columns)
+                }
+            except Exception as e:
+                print(f"Error al leer metadatos de la hoja {sheet_name}: {str(e)}")
+                metadata[sheet_name] = {'columns': [], 'preview': None, 'total_rows': 0, 'column_count': 0}
+        
+        return metadata
+    
     def get_sheet_columns(self, sheet_name):
         """Obtiene las columnas de una hoja específica con tipos de datos"""
         if self.excel_file is None and not self.load_file():
             return []
             
         try:
-            df = pd.read_excel(self.file_path, sheet_name=sheet_name, nrows=10)
+            df = file_cache.leer_hoja(self.file_path, sheet_name)
+            if df is not None:
+                df = df.head(10).copy()
+            else:
+                df = self.excel_file.parse(sheet_name, nrows=10)
             df = self._clean_dataframe(df)  # Limpiar datos
             columns = []
             
@@ -140,10 +270,9 @@ class ExcelProcessor:
             return None
             
         try:
+            df = self._read_sheet(sheet_name)
             if selected_columns:
-                df = pd.read_excel(self.file_path, sheet_name=sheet_name, usecols=selected_columns)
-            else:
-                df = pd.read_excel(self.file_path, sheet_name=sheet_name)
+                df = df[selected_columns]
             
             df = self._clean_dataframe(df)  # Limpiar datos
             return df
@@ -158,6 +287,10 @@ class CSVProcessor:
     def __init__(self, file_path):
         self.file_path = file_path
     
+    def _read_csv(self):
+        """Lee el CSV completo desde la caché columnar o lo parsea una vez y lo guarda"""
+        return file_cache.obtener_hoja(self.file_path, file_cache.HOJA_CSV, lambda: pd.read_csv(self.file_path))
+    
     def _clean_dataframe(self, df):
         """
         Limpia el DataFrame: renombra columnas Unnamed y reemplaza valores NaN
@@ -205,12 +338,20 @@ class CSVProcessor:
     def get_preview(self, max_rows=10):
         """Obtiene una vista previa del archivo CSV"""
         try:
-            df = pd.read_csv(self.file_path, nrows=max_rows)
+            # Solo la muestra (nrows) salvo que la caché ya tenga el archivo
+            df_cache = file_cache.leer_hoja(self.file_path, file_cache.HOJA_CSV)
+            if df_cache is not None:
+                df = df_cache.head(max_rows).copy()
+                total_rows = len(df_cache)
+            else:
+                df = pd.read_csv(self.file_path, nrows=max_rows)
+                with open(self.file_path, 'rb') as archivo:
+                    total_rows = max(sum(1 for _ in archivo) - 1, 0)
             df = self._clean_dataframe(df)  # Limpiar datos
             return {
                 'columns': list(df.columns),
                 'data': df.head(max_rows).to_dict('records'),
-                'total_rows': sum(1 for line in open(self.file_path, 'r')),
+                'total_rows': total_rows,
             }
         except Exception as e:
             print(f"Error al leer el archivo CSV: {str(e)}")
@@ -219,7 +360,11 @@ class CSVProcessor:
     def get_columns(self):
         """Obtiene las columnas del CSV con tipos de datos"""
         try:
-            df = pd.read_csv(self.file_path, nrows=10)
+            df = file_cache.leer_hoja(self.file_path, file_cache.HOJA_CSV)
+            if df is not None:
+                df = df.head(10).copy()
+            else:
+                df = pd.read_csv(self.file_path, nrows=10)
             df = self._clean_dataframe(df)  # Limpiar datos
             columns = []
             
@@ -256,7 +401,11 @@ class CSVProcessor:
     def read_data(self, selected_columns=None):
         """Lee todos los datos del CSV, opcionalmente filtrando columnas"""
         try:
-            if selected_columns:
+            if file_cache.cache_disponible():
+                df = self._read_csv()
+                if selected_columns:
+                    df = df[selected_columns]
+            elif selected_columns:
                 df = pd.read_csv(self.file_path, usecols=selected_columns)
             else:
                 df = pd.read_csv(self.file_path)
@@ -266,18 +415,76 @@ class CSVProcessor:
         except Exception as e:
             print(f"Error al leer datos del CSV: {str(e)}")
             return None
+    
+    def iter_data_chunks(self, selected_columns=None):
+        """
+        Lee el CSV por bloques sin cargarlo completo. Los archivos grandes se dividen
+        en rangos de bytes alineados con registros y se parsean en un pool de
+        procesos; el resto se lee en streaming (pyarrow o motor C de pandas).
+        
+        Returns:
+            iterator: DataFrames en el orden del archivo
+        """
+        from .csv_parallel import usar_parseo_paralelo, iterar_bloques_paralelo
+        from .csv_stream import iterar_bloques_csv
+        
+        if usar_parseo_paralelo(self.file_path):
+            return iterar_bloques_paralelo(self.file_path, selected_columns)
+        return iterar_bloques_csv(self.file_path, selected_columns)
 
 class SQLServerConnector:
     """
     Clase para manejar conexiones y operaciones con SQL Server
+    
+    Las conexiones salen del pool del proceso (connection_pool) por servidor, puerto,
+    base de datos y usuario: connect() toma una conexión del pool y disconnect() la
+    devuelve, de modo que navegar bases, tablas y columnas reutiliza conexiones ya
+    autenticadas. Con use_pool=False se abre una conexión dedicada (lecturas largas
+    en paralelo que no deben ocupar cupos del pool).
     """
-    def __init__(self, server, username, password, port=1433, database=None):
+    def __init__(self, server, username, password, port=1433, database=None, use_pool=True):
         self.server = server
         self.username = username
         self.password = password
         self.port = port
         self.database = database
+        self.use_pool = use_pool
         self.conn = None
+        self._pool = None
+    
+    def __del__(self):
+        # Devolver al pool una conexión que quedó tomada
+        try:
+            self.disconnect()
+        except Exception:
+            pass
+    
+    def _connection_string(self, database=None):
+        if database:
+            return f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={self.server},{self.port};DATABASE={database};UID={self.username};PWD={self.password}"
+        # Conectar solo al servidor sin especificar base de datos
+        return f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={self.server},{self.port};UID={self.username};PWD={self.password}"
+    
+    def get_pool(self, database=None):
+        """Pool del proceso para este servidor/usuario y la base de datos indicada"""
+        from .connection_pool import obtener_pool
+        
+        db_to_use = database if database is not None else self.database
+        connection_string = self._connection_string(db_to_use)
+        return obtener_pool(
+            self.server, self.port, db_to_use, self.username, self.password,
+            factory=lambda: pyodbc.connect(connection_string)
+        )
+    
+    def pooled_connection(self, database=None):
+        """
+        Context manager con una conexión del pool que se devuelve al salir
+        
+        Uso:
+            with connector.pooled_connection() as conn:
+                cursor = conn.cursor()
+        """
+        return self.get_pool(database).conexion()
     
     def connect(self, database=None):
         """
@@ -289,13 +496,14 @@ class SQLServerConnector:
             # Si se proporciona una base de datos en la llamada, usarla; de lo contrario, usar la del objeto
             db_to_use = database if database is not None else self.database
             
-            if db_to_use:
-                connection_string = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={self.server},{self.port};DATABASE={db_to_use};UID={self.username};PWD={self.password}"
-            else:
-                # Conectar solo al servidor sin especificar base de datos
-                connection_string = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={self.server},{self.port};UID={self.username};PWD={self.password}"
+            # Liberar la conexión anterior si la había
+            self.disconnect()
             
-            self.conn = pyodbc.connect(connection_string)
+            if self.use_pool:
+                self._pool = self.get_pool(db_to_use)
+                self.conn = self._pool.checkout()
+            else:
+                self.conn = pyodbc.connect(self._connection_string(db_to_use))
             
             # Actualizar la base de datos actual si la conexión es exitosa y se proporcionó una
             if database is not None:
@@ -353,10 +561,14 @@ class SQLServerConnector:
         return False
     
     def disconnect(self):
-        """Cierra la conexión"""
+        """Devuelve la conexión al pool (o la cierra si es dedicada)"""
         if self.conn:
-            self.conn.close()
-            self.conn = None
+            conn, self.conn = self.conn, None
+            if self._pool is not None:
+                self._pool.checkin(conn)
+                self._pool = None
+            else:
+                conn.close()
     
     def test_connection(self):
         """Prueba la conexión y devuelve True si es exitosa"""
@@ -366,7 +578,10 @@ class SQLServerConnector:
         return success
     
     def get_tables(self):
-        """Obtiene la lista de tablas en la base de datos"""
+        """
+        Obtiene la lista de tablas en la base de datos, con las filas estimadas de
+        cada una según sys.partitions (metadatos del catálogo, sin recorrer la tabla)
+        """
         if not self.conn and not self.connect():
             return []
         
@@ -374,15 +589,21 @@ class SQLServerConnector:
             cursor = self.conn.cursor()
             tables = []
             
-            # Obtener tablas regulares (no vistas)
+            # Obtener tablas regulares (no vistas) con la suma de filas del heap o índice clúster
             cursor.execute("""
-                SELECT TABLE_SCHEMA, TABLE_NAME 
-                FROM INFORMATION_SCHEMA.TABLES 
-                WHERE TABLE_TYPE = 'BASE TABLE' 
-                ORDER BY TABLE_SCHEMA, TABLE_NAME
+                SELECT s.name, t.name, p.filas
+                FROM sys.tables t
+                JOIN sys.schemas s ON s.schema_id = t.schema_id
+                LEFT JOIN (
+                    SELECT object_id, SUM(rows) AS filas
+                    FROM sys.partitions
+                    WHERE index_id IN (0, 1)
+                    GROUP BY object_id
+                ) p ON p.object_id = t.object_id
+                ORDER BY s.name, t.name
             """)
             
-            for schema, table in cursor.fetchall():
+            for schema, table, row_estimate in cursor.fetchall():
                 # Asegurarse de que schema y table no sean None ni estén vacíos
                 schema_safe = schema if schema else 'dbo'
                 table_safe = table if table else ''
@@ -391,7 +612,8 @@ class SQLServerConnector:
                     tables.append({
                         'schema': schema_safe,
                         'name': table_safe,
-                        'full_name': f"{schema_safe}.{table_safe}"
+                        'full_name': f"{schema_safe}.{table_safe}",
+                        'row_estimate': int(row_estimate) if row_estimate is not None else None
                     })
                 
             # En caso de que no se hayan encontrado tablas
@@ -424,15 +646,7 @@ class SQLServerConnector:
             """, (schema, table))
             
             for name, data_type, max_length, is_nullable in cursor.fetchall():
-                type_info = data_type
-                if max_length and max_length > 0:
-                    type_info = f"{data_type}({max_length})"
-                
-                columns.append({
-                    'name': name,
-                    'type': type_info,
-                    'nullable': is_nullable == 'YES',
-                })
+                columns.append(self._format_column(name, data_type, max_length, is_nullable))
                 
             return columns
         except Exception as e:
@@ -442,21 +656,75 @@ class SQLServerConnector:
             if self.conn:
                 self.disconnect()
     
-    def get_table_preview(self, schema, table, max_rows=10):
-        """Obtiene una vista previa de una tabla"""
+    @staticmethod
+    def _format_column(name, data_type, max_length, is_nullable):
+        """Descripción de una columna tal como la devuelve get_table_columns"""
+        type_info = data_type
+        if max_length and max_length > 0:
+            type_info = f"{data_type}({max_length})"
+        return {
+            'name': name,
+            'type': type_info,
+            'nullable': is_nullable == 'YES',
+        }
+    
+    def get_all_columns(self):
+        """
+        Obtiene las columnas de todas las tablas de la base de datos en una sola
+        consulta (en lugar de una consulta por tabla)
+        
+        Returns:
+            dict: {'esquema.tabla': [columnas como en get_table_columns]}
+        """
+        if not self.conn and not self.connect():
+            return {}
+        
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT c.TABLE_SCHEMA, c.TABLE_NAME, c.COLUMN_NAME, c.DATA_TYPE,
+                       c.CHARACTER_MAXIMUM_LENGTH, c.IS_NULLABLE
+                FROM INFORMATION_SCHEMA.COLUMNS c
+                JOIN INFORMATION_SCHEMA.TABLES t
+                  ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+                WHERE t.TABLE_TYPE = 'BASE TABLE'
+                ORDER BY c.TABLE_SCHEMA, c.TABLE_NAME, c.ORDINAL_POSITION
+            """)
+            
+            tables = {}
+            for schema, table, name, data_type, max_length, is_nullable in cursor.fetchall():
+                tables.setdefault(f"{schema or 'dbo'}.{table}", []).append(
+                    self._format_column(name, data_type, max_length, is_nullable)
+                )
+            return tables
+        except Exception as e:
+            print(f"Error al obtener columnas: {str(e)}")
+            return {}
+        finally:
+            if self.conn:
+                self.disconnect()
+    
+    def get_table_preview(self, schema, table, max_rows=10, columns=None):
+        """
+        Obtiene una vista previa de una tabla
+        
+        Args:
+            columns: Columnas ya conocidas de la tabla (p. ej. de la caché de catálogo);
+                si no se indican se consultan
+        """
+        # Obtener todas las columnas primero (get_table_columns libera su conexión)
+        if columns is None:
+            columns = self.get_table_columns(schema, table)
+        column_names = [col['name'] for col in columns]
+        
         if not self.conn and not self.connect():
             return None
         
         try:
-            # Obtener todas las columnas primero
-            columns = self.get_table_columns(schema, table)
-            column_names = [col['name'] for col in columns]
-            
             cursor = self.conn.cursor()
             
-            # Contar filas totales
-            cursor.execute(f"SELECT COUNT(*) FROM [{schema}].[{table}]")
-            total_rows = cursor.fetchone()[0]
+            # Filas estimadas desde el catálogo (un COUNT(*) recorrería toda la tabla)
+            total_rows = self._row_estimate(cursor, schema, table)
             
             # Obtener muestra de datos
             cursor.execute(f"SELECT TOP {max_rows} * FROM [{schema}].[{table}]")
@@ -476,6 +744,7 @@ class SQLServerConnector:
                 'columns': column_names,
                 'data': data,
                 'total_rows': total_rows,
+                'row_count_exact': False,
             }
         except Exception as e:
             print(f"Error al obtener vista previa: {str(e)}")
@@ -484,6 +753,126 @@ class SQLServerConnector:
             if self.conn:
                 self.disconnect()
     
+    @staticmethod
+    def _row_estimate(cursor, schema, table):
+        """
+        Filas de una tabla según sys.partitions (heap o índice clúster). Se mantiene
+        con las operaciones de escritura y puede desviarse ligeramente del valor real.
+        
+        Returns:
+            int|None: Filas estimadas (None para vistas u objetos sin particiones)
+        """
+        cursor.execute("""
+            SELECT SUM(rows)
+            FROM sys.partitions
+            WHERE object_id = OBJECT_ID(?) AND index_id IN (0, 1)
+        """, (f"[{schema}].[{table}]",))
+        row = cursor.fetchone()
+        return int(row[0]) if row and row[0] is not None else None
+    
+    def get_exact_row_count(self, schema, table):
+        """
+        Cuenta exacta de filas con COUNT_BIG(*). Recorre la tabla completa: usar solo
+        en segundo plano (ver catalog_cache.iniciar_conteo_exacto).
+        """
+        if not self.conn and not self.connect():
+            raise Exception('No hay conexión abierta a SQL Server')
+        
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(f"SELECT COUNT_BIG(*) FROM [{schema}].[{table}]")
+            return int(cursor.fetchone()[0])
+        finally:
+            self.disconnect()
+    
+    def stream_query(self, query, params=None, batch_size=SQL_FETCH_BATCH_SIZE):
+        """
+        Ejecuta una consulta y devuelve sus filas en lotes de tamaño fijo con fetchmany,
+        sin materializar el resultado completo en memoria.
+        La conexión debe estar abierta (select_database) y no se cierra al terminar.
+        
+        Returns:
+            Tuple[tuple, generator]: (cursor.description, generador de listas de tuplas)
+        """
+        if not self.conn and not self.connect():
+            raise Exception('No hay conexión abierta a SQL Server')
+        
+        cursor = self.conn.cursor()
+        cursor.arraysize = batch_size
+        cursor.execute(query, params or ())
+        description = cursor.description
+        
+        def lotes():
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield [tuple(row) for row in rows]
+            finally:
+                cursor.close()
+        
+        return description, lotes()
+    
+    def get_range_key(self, schema, table, allowed_types):
+        """
+        Obtiene la clave primaria de una sola columna de una tabla si su tipo está en
+        allowed_types, junto con sus valores mínimo y máximo.
+        La conexión debe estar abierta (select_database) y no se cierra al terminar.
+
+        Returns:
+            dict|None: {'column', 'type', 'min', 'max'} o None si la tabla no tiene
+            una clave primaria simple de un tipo permitido
+        """
+        if not self.conn and not self.connect():
+            return None
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT c.name, t.name
+                FROM sys.indexes i
+                JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+                JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+                JOIN sys.types t ON t.user_type_id = c.user_type_id
+                WHERE i.is_primary_key = 1 AND i.object_id = OBJECT_ID(?)
+            """, (f"[{schema}].[{table}]",))
+            key_columns = cursor.fetchall()
+
+            if len(key_columns) != 1 or key_columns[0][1].lower() not in allowed_types:
+                return None
+
+            column, data_type = key_columns[0]
+            cursor.execute(f"SELECT MIN([{column}]), MAX([{column}]) FROM [{schema}].[{table}]")
+            minimum, maximum = cursor.fetchone()
+
+            return {
+                'column': column,
+                'type': data_type.lower(),
+                'min': minimum,
+                'max': maximum,
+            }
+        except Exception as e:
+            print(f"Error al obtener la clave de rango: {str(e)}")
+            return None
+        finally:
+            cursor.close()
+
+    def get_column_max(self, schema, table, column):
+        """
+        Obtiene el valor máximo de una columna (p. ej. la columna de marca de agua).
+        La conexión debe estar abierta (select_database) y no se cierra al terminar.
+        """
+        if not self.conn and not self.connect():
+            raise Exception('No hay conexión abierta a SQL Server')
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"SELECT MAX([{column}]) FROM [{schema}].[{table}]")
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
     def read_table_data(self, schema, table, selected_columns=None):
         """Lee datos de una tabla, opcionalmente filtrando columnas"""
         if not self.conn and not self.connect():
@@ -21,6 +21,9 @@ from .frontend_logging import auto_log_frontend_process
 
 from .models import DataSourceType, DataSource, DatabaseConnection, MigrationProcess, MigrationLog
 from .utils import ExcelProcessor, CSVProcessor, SQLServerConnector, TargetDBManager
+from . import catalog_cache
+from . import metrics
+from .metrics import medir_vista
 from .web_logger_optimized import registrar_proceso_web, finalizar_proceso_web
 
 # Vistas principales
@@ -49,6 +52,7 @@ def new_process(request):
     }
     return render(request, 'automatizacion/new_process.html', context)
 
+@medir_vista('list_processes')
 def list_processes(request):
     """Lista todos los procesos de migración guardados, ordenados por última modificación"""
     from automatizacion.logs.models_logs import ProcesoLog
@@ -89,6 +93,7 @@ def list_processes(request):
     
     return render(request, 'automatizacion/list_processes.html', {'processes': processes})
 
+@medir_vista('view_process')
 def view_process(request, process_id):
     """Muestra los detalles de un proceso guardado"""
     process = get_object_or_404(MigrationProcess, pk=process_id)
@@ -97,7 +102,6 @@ def view_process(request, process_id):
     if process.source.source_type == 'sql':
         from automatizacion.logs.models_logs import ProcesoLog
         from django.db.models import Q
-        import pyodbc
         
         # Filtrar por MigrationProcessID (si existe) o por nombre del proceso
         logs = ProcesoLog.objects.filter(
@@ -108,44 +112,45 @@ def view_process(request, process_id):
         sample_data = {}
         if process.selected_columns and process.source.connection:
             try:
-                conn_str = (
-                    f'DRIVER={{ODBC Driver 17 for SQL Server}};'
-                    f'SERVER={process.source.connection.server};'
-                    f'DATABASE={process.source.connection.selected_database};'
-                    f'UID={process.source.connection.username};'
-                    f'PWD={process.source.connection.password}'
+                connection = process.source.connection
+                connector = SQLServerConnector(
+                    connection.server,
+                    connection.username,
+                    connection.password,
+                    connection.port,
+                    database=connection.selected_database
                 )
-                conn = pyodbc.connect(conn_str, timeout=5)
-                cursor = conn.cursor()
-                
-                for table_name, columns in process.selected_columns.items():
-                    try:
-                        # Consultar las primeras 5 filas de las columnas seleccionadas
-                        columns_str = ', '.join([f'[{col}]' for col in columns])
-                        query = f"SELECT TOP 5 {columns_str} FROM {table_name}"
-                        cursor.execute(query)
-                        rows = cursor.fetchall()
+                # Conexión del pool en lugar de una conexión nueva por visita
+                with connector.pooled_connection() as conn:
+                    cursor = conn.cursor()
+                    
+                    for table_name, columns in process.selected_columns.items():
+                        try:
+                            # Consultar las primeras 5 filas de las columnas seleccionadas
+                            columns_str = ', '.join([f'[{col}]' for col in columns])
+                            query = f"SELECT TOP 5 {columns_str} FROM {table_name}"
+                            cursor.execute(query)
+                            rows = cursor.fetchall()
                         
-                        # Aplicar mapeos de nombres si existen
-                        displayed_columns = columns
-                        if process.column_mappings and table_name in process.column_mappings:
-                            displayed_columns = [
-                                process.column_mappings[table_name].get(col, col) 
-                                for col in columns
-                            ]
+                            # Aplicar mapeos de nombres si existen
+                            displayed_columns = columns
+                            if process.column_mappings and table_name in process.column_mappings:
+                                displayed_columns = [
+                                    process.column_mappings[table_name].get(col, col) 
+                                    for col in columns
+                                ]
                         
-                        sample_data[table_name] = {
-                            'columns': displayed_columns,
-                            'rows': [list(row) for row in rows]
-                        }
-                    except Exception as e:
-                        sample_data[table_name] = {
-                            'columns': columns,
-                            'rows': [],
-                            'error': str(e)
-                        }
+                            sample_data[table_name] = {
+                                'columns': displayed_columns,
+                                'rows': [list(row) for row in rows]
+                            }
+                        except Exception as e:
+                            sample_data[table_name] = {
+                                'columns': columns,
+                                'rows': [],
+                                'error': str(e)
+                            }
                 
-                conn.close()
             except Exception as e:
                 print(f"Error obteniendo datos de muestra SQL: {e}")
         
@@ -228,6 +233,12 @@ def view_process(request, process_id):
             'file_path': process.source.file_path if hasattr(process.source, 'file_path') else None,
             'sample_data': sample_data
         }
+    
+    # Desglose de tiempos por etapa de la última ejecución (guardado por run() en el registro final)
+    log_timeline = process.logs.filter(details__has_key='timeline').order_by('-timestamp').first()
+    if log_timeline:
+        context['timeline'] = log_timeline.details['timeline']
+        context['timeline_fecha'] = log_timeline.timestamp
         
     return render(request, 'automatizacion/view_process.html', context)
 
@@ -318,6 +329,10 @@ def upload_excel(request):
             
             # NO registrar aquí - será registrado en save_process al final
             
+            # Pre-análisis en segundo plano: hojas, columnas, tipos y filas
+            from .file_analysis import iniciar_analisis
+            iniciar_analisis(source)
+            
             if file_type == 'excel':
                 return redirect('automatizacion:list_excel_sheets', source_id=source.id)
             else:  # CSV
@@ -341,21 +356,38 @@ def list_excel_sheets(request, source_id):
         messages.error(request, 'La fuente de datos no es un archivo Excel')
         return redirect('automatizacion:index')
         
-    processor = ExcelProcessor(source.file_path)
-    if not processor.load_file():
-        messages.error(request, 'No se pudo cargar el archivo Excel')
-        return redirect('automatizacion:upload_excel')
-        
-    sheets = processor.get_sheet_names()
+    # Mientras el pre-análisis corre se muestra el progreso en lugar de parsear aquí;
+    # si dejó de avanzar se da por vencido y se leen los metadatos del archivo
+    from .file_analysis import verificar_vencimiento
+    verificar_vencimiento(source)
+    if source.analysis_status in ('pending', 'running'):
+        return render(request, 'automatizacion/list_excel_sheets.html', {
+            'source': source,
+            'sheets': [],
+            'previews': {},
+            'analysis_pending': True,
+        })
+    
+    metadatos = source.get_analysis_metadata()
+    if metadatos:
+        sheets = metadatos['sheets']
+        sheets_data = metadatos['sheets_data']
+    else:
+        processor = ExcelProcessor(source.file_path)
+        if not processor.load_file():
+            messages.error(request, 'No se pudo cargar el archivo Excel')
+            return redirect('automatizacion:upload_excel')
+            
+        sheets = processor.get_sheet_names()
+        # Obtener resumen de cada hoja (una sola pasada de metadatos por el libro)
+        sheets_data = processor.get_workbook_metadata()
     
-    # Obtener vista previa de cada hoja
     sheet_previews = {}
-    for sheet in sheets:
-        preview = processor.get_sheet_preview(sheet)
-        if preview:
+    for sheet, datos in sheets_data.items():
+        if datos['preview']:
             sheet_previews[sheet] = {
-                'total_rows': preview['total_rows'],
-                'columns': len(preview['columns'])
+                'total_rows': datos['total_rows'],
+                'columns': len(datos['preview']['columns'])
             }
     
     context = {
@@ -366,6 +398,7 @@ def list_excel_sheets(request, source_id):
     
     return render(request, 'automatizacion/list_excel_sheets.html', context)
 
+@medir_vista('list_excel_multi_sheet_columns')
 def list_excel_multi_sheet_columns(request, source_id):
     """Nueva vista integrada para selección de hojas y columnas de Excel"""
     source = get_object_or_404(DataSource, pk=source_id)
@@ -374,25 +407,21 @@ def list_excel_multi_sheet_columns(request, source_id):
         messages.error(request, 'Esta vista es solo para archivos Excel')
         return redirect('automatizacion:index')
         
-    processor = ExcelProcessor(source.file_path)
-    if not processor.load_file():
-        messages.error(request, 'No se pudo cargar el archivo Excel')
-        return redirect('automatizacion:upload_excel')
-        
-    sheets = processor.get_sheet_names()
-    
-    # Obtener datos completos de cada hoja: columnas y vista previa
-    sheets_data = {}
-    for sheet in sheets:
-        columns = processor.get_sheet_columns(sheet)
-        preview = processor.get_sheet_preview(sheet)
+    metadatos = source.get_analysis_metadata()
+    if metadatos:
+        # Metadatos del pre-análisis hecho al subir el archivo
+        sheets = metadatos['sheets']
+        sheets_data = metadatos['sheets_data']
+    else:
+        processor = ExcelProcessor(source.file_path)
+        if not processor.load_file():
+            messages.error(request, 'No se pudo cargar el archivo Excel')
+            return redirect('automatizacion:upload_excel')
+            
+        sheets = processor.get_sheet_names()
         
-        sheets_data[sheet] = {
-            'columns': columns,
-            'preview': preview,
-            'total_rows': preview.get('total_rows', 0) if preview else 0,
-            'column_count': len(columns) if columns else 0
-        }
+        # Obtener datos de cada hoja (columnas, vista previa y filas) en una sola pasada por el libro
+        sheets_data = processor.get_workbook_metadata()
     
     context = {
         'source': source,
@@ -402,11 +431,46 @@ def list_excel_multi_sheet_columns(request, source_id):
     
     return render(request, 'automatizacion/excel_multi_sheet_selector.html', context)
 
+def source_analysis_status(request, source_id):
+    """Vista AJAX con el estado y progreso del pre-análisis de un archivo subido"""
+    from .file_analysis import verificar_vencimiento
+    
+    source = get_object_or_404(DataSource, pk=source_id)
+    verificar_vencimiento(source)
+    
+    respuesta = {
+        'status': source.analysis_status,
+        'progress': source.analysis_progress,
+        'error': source.analysis_error,
+        'analyzed_at': source.analyzed_at.isoformat() if source.analyzed_at else None,
+    }
+    
+    metadatos = source.get_analysis_metadata()
+    if metadatos:
+        respuesta['sheets'] = [
+            {
+                'name': hoja,
+                'total_rows': metadatos['sheets_data'][hoja]['total_rows'],
+                'column_count': metadatos['sheets_data'][hoja]['column_count'],
+            }
+            for hoja in metadatos['sheets']
+        ]
+    
+    return JsonResponse(respuesta)
+
 def list_excel_columns(request, source_id, sheet_name):
     """Lista las columnas de una hoja de Excel o archivo CSV"""
     source = get_object_or_404(DataSource, pk=source_id)
     
-    if source.source_type == 'excel':
+    if source.source_type == 'csv':
+        sheet_name = 'csv_data'  # Nombre genérico para CSV
+    
+    metadatos = source.get_analysis_metadata()
+    if metadatos and sheet_name in metadatos['sheets_data']:
+        # Columnas y vista previa desde el pre-análisis del archivo
+        columns = metadatos['sheets_data'][sheet_name]['columns']
+        preview = metadatos['sheets_data'][sheet_name]['preview']
+    elif source.source_type == 'excel':
         processor = ExcelProcessor(source.file_path)
         if not processor.load_file():
             messages.error(request, 'No se pudo cargar el archivo Excel')
@@ -418,7 +482,6 @@ def list_excel_columns(request, source_id, sheet_name):
         processor = CSVProcessor(source.file_path)
         columns = processor.get_columns()
         preview = processor.get_preview()
-        sheet_name = 'csv_data'  # Nombre genérico para CSV
     
     context = {
         'source': source,
@@ -525,6 +588,39 @@ def view_connection(request, connection_id):
     connection = get_object_or_404(DatabaseConnection, pk=connection_id)
     return render(request, 'automatizacion/view_connection.html', {'connection': connection})
 
+def connection_catalog_cache(request, connection_id):
+    """Guarda el TTL de la caché de catálogo de una conexión o la precalienta"""
+    connection = get_object_or_404(DatabaseConnection, pk=connection_id)
+    if request.method != 'POST':
+        return redirect('automatizacion:view_connection', connection_id=connection_id)
+    
+    if request.POST.get('action') == 'ttl':
+        ttl = request.POST.get('catalog_cache_ttl', '').strip()
+        try:
+            connection.catalog_cache_ttl = max(int(ttl), 0) if ttl else None
+        except ValueError:
+            messages.error(request, 'El TTL debe ser un número de segundos')
+            return redirect('automatizacion:view_connection', connection_id=connection_id)
+        connection.save(update_fields=['catalog_cache_ttl'])
+        catalog_cache.invalidar(connection)
+        messages.success(request, 'TTL de la caché de catálogo actualizado')
+        return redirect('automatizacion:view_connection', connection_id=connection_id)
+    
+    try:
+        resumen = catalog_cache.precalentar(connection)
+    except Exception as e:
+        messages.error(request, f'No se pudo precalentar el catálogo: {str(e)}')
+        return redirect('automatizacion:view_connection', connection_id=connection_id)
+    
+    messages.success(
+        request,
+        f"Catálogo precalentado: {resumen['bases_datos']} bases de datos y {resumen['tablas']} tablas "
+        f"en {resumen['segundos']} s"
+    )
+    for database, error in resumen['errores'].items():
+        messages.warning(request, f'Base de datos {database}: {error}')
+    return redirect('automatizacion:view_connection', connection_id=connection_id)
+
 @log_operation("Listado de bases de datos SQL")
 def list_sql_databases(request, connection_id):
     """Lista todas las bases de datos disponibles en el servidor SQL"""
@@ -534,23 +630,15 @@ def list_sql_databases(request, connection_id):
     connection.last_used = timezone.now()
     connection.save()
     
-    # Si ya tenemos bases de datos almacenadas, usarlas
-    if connection.available_databases:
-        databases = connection.available_databases
-    else:
-        # Si no, obtenerlas del servidor
-        connector = SQLServerConnector(
-            connection.server,
-            connection.username,
-            connection.password,
-            connection.port
-        )
-        
-        databases = connector.get_databases()
-        
+    # Bases de datos desde la caché de catálogo (consulta el servidor al vencer el TTL)
+    databases = catalog_cache.obtener_bases_datos(connection)
+    if databases and databases != connection.available_databases:
         # Guardar la lista de bases de datos en la conexión
         connection.available_databases = databases
-        connection.save()
+        connection.save(update_fields=['available_databases'])
+    elif not databases:
+        # Servidor no disponible: usar la última lista conocida
+        databases = connection.available_databases or []
     
     context = {
         'connection': connection,
@@ -617,19 +705,20 @@ def list_sql_tables(request, connection_id):
     connection.last_used = timezone.now()
     connection.save()
     
-    connector = SQLServerConnector(
-        connection.server,
-        connection.username,
-        connection.password,
-        connection.port
-    )
-    
-    # Conectar a la base de datos seleccionada
-    if not connector.select_database(connection.selected_database):
-        messages.error(request, f'No se pudo conectar a la base de datos {connection.selected_database}')
-        return redirect('automatizacion:list_sql_databases', connection_id=connection_id)
+    tables = catalog_cache.obtener_tablas(connection)
     
-    tables = connector.get_tables()
+    if not tables:
+        # Sin tablas: distinguir una base vacía de un error de conexión
+        connector = SQLServerConnector(
+            connection.server,
+            connection.username,
+            connection.password,
+            connection.port
+        )
+        if not connector.select_database(connection.selected_database):
+            messages.error(request, f'No se pudo conectar a la base de datos {connection.selected_database}')
+            return redirect('automatizacion:list_sql_databases', connection_id=connection_id)
+        connector.disconnect()
     
     # Verificar que cada tabla tenga un full_name válido
     for table in tables:
@@ -700,8 +789,14 @@ def list_sql_columns(request, connection_id, table_name):
         messages.error(request, f'Error al procesar el nombre de la tabla: {str(e)}')
         return redirect('automatizacion:list_sql_tables', connection_id=connection_id)
     
-    columns = connector.get_table_columns(schema, table)
-    preview = connector.get_table_preview(schema, table)
+    columns = catalog_cache.obtener_columnas(connection, schema, table)
+    preview = connector.get_table_preview(schema, table, columns=columns or None)
+    
+    # Conteo exacto ya calculado en segundo plano (si no, queda la estimación del catálogo)
+    conteo = catalog_cache.obtener_conteo_exacto(connection, schema, table)
+    if preview and conteo:
+        preview['total_rows'] = conteo['count']
+        preview['row_count_exact'] = True
     
     # Buscar fuente de datos para esta conexión
     source, created = DataSource.objects.get_or_create(
@@ -726,6 +821,35 @@ def list_sql_columns(request, connection_id, table_name):
 
 # Vistas para API AJAX
 
+def sql_row_count(request, connection_id, table_name):
+    """
+    Conteo exacto de filas de una tabla SQL (endpoint AJAX)
+    
+    POST lanza el conteo en segundo plano; GET devuelve su estado.
+    """
+    connection = get_object_or_404(DatabaseConnection, pk=connection_id)
+    if not connection.selected_database:
+        return JsonResponse({'error': 'La conexión no tiene base de datos seleccionada'}, status=400)
+    
+    schema, table = table_name.split('.', 1) if '.' in table_name else ('dbo', table_name)
+    
+    if request.method == 'POST':
+        catalog_cache.iniciar_conteo_exacto(connection, schema, table)
+    elif request.method != 'GET':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+    
+    estado = catalog_cache.estado_conteo_exacto(connection, schema, table)
+    return JsonResponse({'success': True, 'table': f'{schema}.{table}', **estado})
+
+def metrics_endpoint(request):
+    """
+    Métricas de la canalización y de las vistas en formato de texto de Prometheus
+    (sumadas entre workers si PROMETHEUS_MULTIPROC_DIR está configurado; sin él
+    solo las del worker que responde)
+    """
+    cuerpo, content_type = metrics.exportar()
+    return HttpResponse(cuerpo, content_type=content_type)
+
 @csrf_exempt
 def save_process(request):
     """Guarda un proceso de migración (endpoint AJAX)"""
@@ -830,9 +954,15 @@ def save_process(request):
         process.selected_columns = data.get('selected_columns')
         process.column_mappings = data.get('column_mappings')  # Guardar mapeos de columnas personalizadas
         process.target_db_name = data.get('target_db', 'DestinoAutomatizacion')
+        if data.get('load_strategy') in dict(MigrationProcess.LOAD_STRATEGY_CHOICES):
+            process.load_strategy = data.get('load_strategy')
         
         process.save()
         
+        # El catálogo de la conexión se vuelve a leer tras guardar un proceso SQL
+        if source.source_type == 'sql' and source.connection:
+            catalog_cache.invalidar(source.connection)
+        
         # Finalizar logger con éxito
         print(f"DEBUG: Finalizando logger con éxito para proceso Django ID {process.id}")
         print(f"DEBUG: Proceso guardado: {process.name} (Source: {process.source.name})")
@@ -950,6 +1080,8 @@ def save_excel_multi_process(request):
             target_db_name=data.get('target_db', 'DestinoAutomatizacion'),
             status='configured'
         )
+        if data.get('load_strategy') in dict(MigrationProcess.LOAD_STRATEGY_CHOICES):
+            process.load_strategy = data.get('load_strategy')
         
         process.save()
         print(f"DEBUG: Proceso Excel multi-hoja guardado exitosamente con ID: {process.id}")
@@ -1002,6 +1134,7 @@ def delete_connection(request, connection_id):
         
         # Eliminar también las fuentes de datos asociadas
         DataSource.objects.filter(connection=connection).delete()
+        catalog_cache.invalidar(connection)
         
         connection_name = connection.name
         connection.delete()
@@ -1023,6 +1156,62 @@ def edit_process(request, process_id):
         process.name = request.POST.get('name', process.name)
         process.description = request.POST.get('description', process.description)
         
+        # Estrategia de carga en destino
+        estrategia_anterior = process.load_strategy
+        load_strategy = request.POST.get('load_strategy')
+        if load_strategy in dict(MigrationProcess.LOAD_STRATEGY_CHOICES):
+            process.load_strategy = load_strategy
+        
+        # Extracción incremental por marca de agua
+        extraction_mode = request.POST.get('extraction_mode')
+        if extraction_mode == 'tail' and process.source.source_type != 'csv':
+            # El checkpoint por offset de bytes solo tiene sentido en un CSV que crece
+            messages.warning(request, 'El modo "solo filas agregadas" solo está disponible para fuentes CSV. '
+                                      'Se conserva el modo de extracción anterior.')
+        elif extraction_mode in dict(MigrationProcess.EXTRACTION_MODE_CHOICES):
+            process.extraction_mode = extraction_mode
+        if process.extraction_mode == 'tail' and process.source.source_type != 'csv':
+            process.extraction_mode = 'full'
+        if 'watermark_column' in request.POST:
+            watermark_column = request.POST.get('watermark_column', '').strip() or None
+            if watermark_column != process.watermark_column:
+                # Las marcas guardadas corresponden a la columna anterior
+                process.watermark_state = None
+            process.watermark_column = watermark_column
+        if request.POST.get('reset_watermark'):
+            process.watermark_state = None
+        if request.POST.get('reset_csv_checkpoint') and process.last_checkpoint:
+            from .csv_tail import CLAVE_CHECKPOINT
+            process.last_checkpoint = {
+                clave: valor for clave, valor in process.last_checkpoint.items() if clave != CLAVE_CHECKPOINT
+            }
+        
+        # Columnas clave para la estrategia merge, una entrada por tabla/hoja
+        merge_key_columns = {}
+        for campo, valor in request.POST.items():
+            if campo.startswith('merge_keys::'):
+                claves = [col.strip() for col in valor.split(',') if col.strip()]
+                if claves:
+                    merge_key_columns[campo[len('merge_keys::'):]] = claves
+        if any(campo.startswith('merge_keys::') for campo in request.POST):
+            process.merge_key_columns = merge_key_columns or None
+        
+        # Grado de paralelismo de lectura (solo fuentes SQL)
+        if 'parallel_degree' in request.POST:
+            try:
+                parallel_degree = int(request.POST.get('parallel_degree'))
+                process.parallel_degree = min(max(parallel_degree, 1), MigrationProcess.MAX_PARALLEL_DEGREE)
+            except (TypeError, ValueError):
+                pass
+        
+        # Procesos para parsear hojas en paralelo (solo fuentes Excel)
+        if 'sheet_workers' in request.POST:
+            try:
+                sheet_workers = int(request.POST.get('sheet_workers'))
+                process.sheet_workers = min(max(sheet_workers, 1), MigrationProcess.MAX_SHEET_WORKERS)
+            except (TypeError, ValueError):
+                pass
+        
         # Actualizar campos específicos según el tipo de fuente
         if process.source.source_type in ['excel', 'csv']:
             # Para Excel/CSV, actualizar hojas/columnas seleccionadas
@@ -1058,9 +1247,22 @@ def edit_process(request, process_id):
                 except:
                     pass
         
+        # MERGE necesita columnas clave en cada tabla/hoja seleccionada (validado con
+        # la selección ya actualizada)
+        if process.load_strategy == 'merge':
+            sin_claves = [item['source'] for item in process.get_merge_key_sources() if not item['keys']]
+            if not process.merge_key_columns or sin_claves:
+                detalle = f" Sin claves: {', '.join(sin_claves)}." if sin_claves else ''
+                messages.warning(request, f'La estrategia MERGE requiere columnas clave en cada tabla u hoja.{detalle} '
+                                          f'Se conserva la estrategia anterior.')
+                process.load_strategy = estrategia_anterior if estrategia_anterior != 'merge' else 'replace'
+        
         # Guardar cambios
         process.save()
         
+        if process.source.source_type == 'sql' and process.source.connection:
+            catalog_cache.invalidar(process.source.connection)
+        
         # Crear log de modificación
         from .models import MigrationLog
         MigrationLog.log(
@@ -1085,26 +1287,21 @@ def edit_process(request, process_id):
         # Para Excel, obtener información de hojas disponibles Y TODOS LOS CAMPOS ORIGINALES
         context['file_path'] = process.source.file_path
         try:
-            from .utils import ExcelProcessor
-            processor = ExcelProcessor(process.source.file_path)
-            
-            # Obtener todas las hojas disponibles
-            context['available_sheets'] = processor.get_sheet_names()
-            
-            # ✅ NUEVO: Obtener TODOS los campos originales de cada hoja
-            all_sheets_data = {}
-            for sheet_name in context['available_sheets']:
-                columns = processor.get_sheet_columns(sheet_name)
-                preview = processor.get_sheet_preview(sheet_name)
+            metadatos = process.source.get_analysis_metadata()
+            if metadatos:
+                # Hojas y campos originales desde el pre-análisis del archivo
+                context['available_sheets'] = metadatos['sheets']
+                context['all_sheets_data'] = metadatos['sheets_data']
+            else:
+                from .utils import ExcelProcessor
+                processor = ExcelProcessor(process.source.file_path)
                 
-                all_sheets_data[sheet_name] = {
-                    'columns': columns,  # Lista completa de columnas originales
-                    'preview': preview,
-                    'total_rows': preview.get('total_rows', 0) if preview else 0,
-                    'column_count': len(columns) if columns else 0
-                }
-            
-            context['all_sheets_data'] = all_sheets_data
+                # Obtener todas las hojas disponibles
+                context['available_sheets'] = processor.get_sheet_names()
+                
+                # ✅ NUEVO: Obtener TODOS los campos originales de cada hoja
+                # Una sola pasada de metadatos por el libro (filas según la dimensión de cada hoja)
+                context['all_sheets_data'] = processor.get_workbook_metadata()
             
         except Exception as e:
             context['available_sheets'] = []
@@ -1119,12 +1316,13 @@ def edit_process(request, process_id):
         # Para SQL, obtener información de conexión
         context['connection'] = process.source.connection
         try:
-            from .utils import DatabaseInspector
-            inspector = DatabaseInspector(process.source.connection)
-            context['available_databases'] = inspector.get_databases()
+            context['available_databases'] = catalog_cache.obtener_bases_datos(process.source.connection)
             
             if process.selected_database:
-                context['available_tables'] = inspector.get_tables(process.selected_database)
+                context['available_tables'] = [
+                    table['full_name']
+                    for table in catalog_cache.obtener_tablas(process.source.connection, process.selected_database)
+                ]
         except Exception as e:
             context['available_databases'] = []
             context['available_tables'] = []
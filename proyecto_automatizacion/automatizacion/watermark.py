@@ -0,0 +1,120 @@
+"""
+Marcas de agua (watermark) para la extracción incremental
+
+La marca de agua de cada tabla/hoja es el valor máximo de la columna configurada
+(fecha de modificación, identidad o rowversion) que ya se cargó en destino. Se
+guarda en MigrationProcess.watermark_state como JSON, con su tipo, para poder
+reconstruir el valor exacto que se envía como parámetro en la siguiente ejecución.
+"""
+
+import datetime
+from decimal import Decimal
+
+import pandas as pd
+
+
+def serializar_marca(valor):
+    """
+    Convierte un valor de marca de agua en un dict serializable a JSON
+
+    Returns:
+        dict|None: {'tipo': ..., 'valor': ...}
+    """
+    if valor is None or (not isinstance(valor, (bytes, bytearray)) and pd.isna(valor)):
+        return None
+
+    if hasattr(valor, 'to_pydatetime'):
+        valor = valor.to_pydatetime()
+    elif hasattr(valor, 'item'):
+        valor = valor.item()
+
+    if isinstance(valor, (bytes, bytearray)):
+        return {'tipo': 'bytes', 'valor': bytes(valor).hex()}
+    if isinstance(valor, datetime.datetime):
+        return {'tipo': 'datetime', 'valor': valor.isoformat()}
+    if isinstance(valor, datetime.date):
+        return {'tipo': 'date', 'valor': valor.isoformat()}
+    if isinstance(valor, bool):
+        return {'tipo': 'int', 'valor': int(valor)}
+    if isinstance(valor, int):
+        return {'tipo': 'int', 'valor': valor}
+    if isinstance(valor, Decimal):
+        return {'tipo': 'decimal', 'valor': str(valor)}
+    if isinstance(valor, float):
+        return {'tipo': 'float', 'valor': valor}
+    return {'tipo': 'str', 'valor': str(valor)}
+
+
+def deserializar_marca(marca):
+    """
+    Reconstruye el valor original de una marca guardada con serializar_marca
+
+    Returns:
+        Valor Python (int, datetime, bytes, ...) o None si no hay marca
+    """
+    if not marca:
+        return None
+
+    tipo = marca.get('tipo')
+    valor = marca.get('valor')
+
+    if tipo == 'bytes':
+        return bytes.fromhex(valor)
+    if tipo == 'datetime':
+        return datetime.datetime.fromisoformat(valor)
+    if tipo == 'date':
+        return datetime.date.fromisoformat(valor)
+    if tipo == 'int':
+        return int(valor)
+    if tipo == 'decimal':
+        return Decimal(valor)
+    if tipo == 'float':
+        return float(valor)
+    return valor
+
+
+def normalizar_serie_marca(serie):
+    """
+    Devuelve la columna de marca de agua con un tipo comparable. Las hojas de
+    Excel limpias guardan los vacíos como '' y convierten la columna a texto, por
+    lo que se intenta recuperar el tipo numérico o de fecha de los valores no vacíos.
+    """
+    if pd.api.types.is_numeric_dtype(serie.dtype) or pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return serie
+
+    vacios = serie.isna() | (serie.astype(str).str.strip() == '')
+    numerica = pd.to_numeric(serie.where(~vacios), errors='coerce')
+    if numerica[~vacios].notna().all():
+        return numerica
+
+    fecha = pd.to_datetime(serie.where(~vacios), errors='coerce')
+    if fecha[~vacios].notna().all():
+        return fecha
+
+    return serie.where(~vacios).astype(str).where(~vacios)
+
+
+def filtrar_dataframe_por_marca(df, columna, marca):
+    """
+    Conserva solo las filas de un DataFrame posteriores a la marca de agua
+
+    Args:
+        df: DataFrame con la columna de marca de agua
+        columna: Nombre de la columna de marca de agua
+        marca: Valor de la última marca cargada (None = primera carga, sin filtro)
+
+    Returns:
+        Tuple[DataFrame, Any]: (filas nuevas, nuevo valor máximo o None si no hay filas)
+    """
+    serie = normalizar_serie_marca(df[columna])
+    if marca is not None and isinstance(marca, datetime.date):
+        marca = pd.Timestamp(marca)
+
+    if marca is not None:
+        mascara = (serie > marca).to_numpy()
+        df = df[mascara]
+        serie = serie[mascara]
+
+    serie = serie.dropna()
+    nueva_marca = serie.max() if len(serie) else None
+    return df, nueva_marca
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark del escritor masivo (automatizacion/bulk_writer.py)
+
+Compara la conversión anterior de _save_dataframe_to_destination (iterrows +
+isinstance/pd.isna/.item() por celda) contra la conversión vectorizada, y mide
+la inserción por bloques contra un destino local de reemplazo (SQLite en
+memoria, que acepta los mismos placeholders '?' y nombres entre corchetes).
+
+Uso:
+    python benchmark_bulk_writer.py [filas] [tamano_bloque]
+"""
+import sys
+import time
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from automatizacion.bulk_writer import BulkWriter, dataframe_a_filas
+
+
+def generar_dataframe(filas):
+    """Genera un DataFrame con tipos mixtos similar a una hoja de Excel real"""
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({
+        'ID': np.arange(filas, dtype=np.int64),
+        'Cantidad': rng.integers(0, 1000, filas),
+        'Precio': rng.random(filas) * 100,
+        'Nombre': [f'Producto {i % 500}' for i in range(filas)],
+        'Fecha': pd.date_range('2020-01-01', periods=filas, freq='min'),
+        'Activo': rng.random(filas) > 0.5,
+    })
+    # Introducir nulos como en los datos de origen
+    df.loc[df.index % 17 == 0, 'Precio'] = np.nan
+    df.loc[df.index % 23 == 0, 'Fecha'] = pd.NaT
+    return df
+
+
+def conversion_anterior(df):
+    """Réplica de la conversión fila por fila que usaba _save_dataframe_to_destination"""
+    valores_a_insertar = []
+    for _, row in df.iterrows():
+        valores_fila = []
+        for col in df.columns:
+            valor = row[col]
+            if pd.isna(valor):
+                valores_fila.append(None)
+            elif isinstance(valor, pd.Timestamp):
+                valores_fila.append(valor.to_pydatetime())
+            elif hasattr(valor, 'item'):
+                valores_fila.append(valor.item())
+            else:
+                valores_fila.append(valor)
+        valores_a_insertar.append(tuple(valores_fila))
+    return valores_a_insertar
+
+
+def medir(nombre, funcion, filas):
+    """Ejecuta una función, imprime su duración y devuelve el resultado"""
+    inicio = time.perf_counter()
+    resultado = funcion()
+    duracion = time.perf_counter() - inicio
+    print(f"   {nombre:<38} {duracion:8.3f}s  ({filas / duracion:,.0f} filas/s)")
+    return resultado, duracion
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    tamano_bloque = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    print(f"=== BENCHMARK ESCRITOR MASIVO: {filas:,} filas, bloques de {tamano_bloque:,} ===")
+    df = generar_dataframe(filas)
+
+    print("\n📊 Conversión DataFrame -> filas del driver")
+    filas_antes, t_antes = medir('iterrows (anterior)', lambda: conversion_anterior(df), filas)
+    filas_ahora, t_ahora = medir('vectorizada (dataframe_a_filas)', lambda: dataframe_a_filas(df), filas)
+    assert filas_antes == filas_ahora, "Las conversiones no producen las mismas filas"
+    print(f"   ⚡ Aceleración de conversión: x{t_antes / t_ahora:.1f}")
+
+    print("\n📦 Inserción contra destino local (SQLite en memoria)")
+    conn = sqlite3.connect(':memory:')
+    conn.execute(
+        "CREATE TABLE [Benchmark] ([ID] INTEGER, [Cantidad] INTEGER, [Precio] REAL, "
+        "[Nombre] TEXT, [Fecha] TIMESTAMP, [Activo] INTEGER)"
+    )
+    writer = BulkWriter(conn, 'Benchmark', list(df.columns), chunk_size=tamano_bloque)
+    medir('BulkWriter.write (conversión + insert)', lambda: writer.write(df), filas)
+    conn.commit()
+    writer.close()
+
+    total = conn.execute("SELECT COUNT(*) FROM [Benchmark]").fetchone()[0]
+    assert total == filas, f"Se esperaban {filas} filas y hay {total}"
+
+    resumen = writer.resumen()
+    print(f"\n✅ {resumen['registros_insertados']:,} filas en {resumen['bloques']} bloques, "
+          f"{resumen['filas_por_segundo']:,} filas/s de inserción pura")
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark de lectura de Excel multihoja
+
+Compara la lectura anterior de _process_excel_sheets_individually (un
+pd.read_excel por hoja, que descomprime el archivo y procesa shared strings y
+estilos en cada llamada) contra abrir el libro una sola vez con pd.ExcelFile y
+leer cada hoja desde ese objeto. Con la lectura anterior el costo de abrir el
+libro (que crece con el número de hojas) se paga una vez por hoja, por lo que el
+tiempo total crece más rápido que el número de hojas; con el libro compartido
+se paga una sola vez.
+
+Uso:
+    python benchmark_excel_multihoja.py [filas_por_hoja] [hojas,hojas,...]
+"""
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+def generar_libro(ruta, hojas, filas):
+    """Genera un libro con `hojas` hojas de `filas` filas con texto repetido (shared strings)"""
+    rng = np.random.default_rng(7)
+    with pd.ExcelWriter(ruta, engine='openpyxl') as writer:
+        for i in range(hojas):
+            pd.DataFrame({
+                'ID': np.arange(filas),
+                'Producto': [f'Producto {j % 300}' for j in range(filas)],
+                'Region': rng.choice(['Norte', 'Sur', 'Centro', 'Caribe'], filas),
+                'Valor': rng.random(filas) * 1000,
+            }).to_excel(writer, sheet_name=f'Hoja{i + 1}', index=False)
+
+
+def lectura_por_hoja(ruta, hojas):
+    """Réplica de la lectura anterior: un read_excel por hoja"""
+    return [pd.read_excel(ruta, sheet_name=hoja) for hoja in hojas]
+
+
+def lectura_libro_compartido(ruta, hojas):
+    """Lectura actual: el libro se abre una vez y cada hoja se parsea desde él"""
+    with pd.ExcelFile(ruta) as libro:
+        return [libro.parse(hoja) for hoja in hojas]
+
+
+def medir(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    conteos = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [1, 5, 10, 20, 40]
+
+    print(f"=== BENCHMARK EXCEL MULTIHOJA: {filas:,} filas por hoja ===")
+    print(f"   {'hojas':>6} {'por hoja (s)':>14} {'compartido (s)':>16} {'aceleración':>12}")
+
+    directorio = tempfile.mkdtemp()
+    for hojas in conteos:
+        ruta = os.path.join(directorio, f'libro_{hojas}.xlsx')
+        generar_libro(ruta, hojas, filas)
+        nombres = [f'Hoja{i + 1}' for i in range(hojas)]
+
+        antes, t_antes = medir(lectura_por_hoja, ruta, nombres)
+        ahora, t_ahora = medir(lectura_libro_compartido, ruta, nombres)
+        assert all(a.equals(b) for a, b in zip(antes, ahora)), "Las lecturas no producen los mismos datos"
+
+        print(f"   {hojas:>6} {t_antes:>14.2f} {t_ahora:>16.2f} {t_antes / t_ahora:>11.1f}x")
+        os.remove(ruta)
+
+    print("\n✅ Mismos datos en ambas lecturas")
+
+
+if __name__ == '__main__':
+    main()
@@ -156,6 +156,59 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Configuración para archivos temporales (Excel/CSV)
 TEMP_DIR = BASE_DIR / 'temp_files'
 
+# Caché columnar (Arrow) de hojas parseadas en TEMP_DIR/parsed_cache; requiere pyarrow
+PARSED_FILE_CACHE_MAX_BYTES = 2 * 1024 ** 3  # 2 GB, se expulsan los archivos menos usados
+PARSED_FILE_CACHE_MAX_ROWS = 200000  # hojas con más filas no se cachean (se leen en streaming)
+
+# Pre-análisis de archivos subidos (automatizacion/file_analysis.py)
+FILE_ANALYSIS_WORKERS = 2          # análisis simultáneos; el resto espera en cola
+FILE_ANALYSIS_STALE_SECONDS = 600  # sin avance en este tiempo, las vistas leen el archivo directamente
+
+# CSV desde este tamaño se parsean en paralelo por rangos de bytes (procesos = núcleos si es None)
+CSV_PARALLEL_MIN_BYTES = 256 * 1024 ** 2
+CSV_PARALLEL_WORKERS = None
+
+# Pool de conexiones a SQL Server por servidor/puerto/base de datos/usuario
+SQL_POOL_MAX_SIZE = 8
+SQL_POOL_IDLE_TIMEOUT = 300        # segundos ociosa antes de cerrarla
+SQL_POOL_PING_AFTER = 30           # segundos ociosa antes de verificarla con SELECT 1
+SQL_POOL_CHECKOUT_TIMEOUT = 30     # segundos esperando una conexión libre
+DESTINATION_POOL_SIZE = 2          # conexiones al destino reutilizadas por las ejecuciones
+
+# Caché de catálogo de SQL Server (bases de datos, tablas y columnas) por conexión
+CATALOG_CACHE_TTL = 300            # segundos; DatabaseConnection.catalog_cache_ttl lo sobrescribe
+CATALOG_CACHE_MAX_ENTRIES = 20000  # entradas en memoria por proceso
+# Alias de una caché de Django compartida entre workers (None = solo en memoria), p. ej.:
+# CACHES = {
+#     'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+#     'catalogo': {
+#         'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+#         'LOCATION': BASE_DIR / 'temp_files' / 'catalog_cache',
+#     },
+# }
+# CATALOG_CACHE_ALIAS = 'catalogo'
+CATALOG_CACHE_ALIAS = None
+ROW_COUNT_CACHE_TTL = 3600         # segundos que se conserva un conteo exacto de filas (COUNT_BIG)
+ROW_COUNT_JOB_TIMEOUT = 900        # segundos que el estado de un conteo en curso se conserva en CATALOG_CACHE_ALIAS
+
+# Registro de procesos (ProcesoLog): True encola los cambios y los escribe en bloque desde un hilo
+PROCESS_TRACKER_ASYNC = False
+PROCESS_TRACKER_FLUSH_INTERVAL = 1.0  # segundos entre escrituras del hilo
+
+# Registros de ejecución (MigrationLog): máximo de registros pendientes antes de escribir en bloque
+MIGRATION_LOG_BUFFER_SIZE = 500
+
+# Métricas Prometheus en /automatizacion/metrics/ (automatizacion/metrics.py). Con varios
+# workers de gunicorn es obligatorio exportar en el entorno
+# PROMETHEUS_MULTIPROC_DIR=<directorio compartido, vacío al arrancar> antes de iniciar el
+# servidor, con o sin prometheus_client; el endpoint suma entonces todos los workers. Con
+# prometheus_client instalado, además, en gunicorn.conf.py:
+#     def child_exit(server, worker):
+#         from automatizacion.metrics import marcar_worker_terminado
+#         marcar_worker_terminado(worker.pid)
+# Sin ese directorio el endpoint solo expone el worker que responde (series con etiqueta
+# pid) y registra una advertencia.
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
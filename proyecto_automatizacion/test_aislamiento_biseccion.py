@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Prueba del aislamiento de errores por bisección del escritor masivo
+
+Usa SQLite en memoria como destino de reemplazo: una restricción CHECK hace que
+algunas filas fallen y se verifica que las filas válidas se confirmen en bloque,
+que solo las filas malas queden rechazadas y que el número de viajes fallidos
+se mantenga en O(filas_malas × log(tamaño_bloque)).
+"""
+import math
+import sqlite3
+
+from automatizacion.bulk_writer import BulkWriter
+
+
+def crear_destino():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE [Destino] ([ID] INTEGER, [Cantidad] INTEGER CHECK ([Cantidad] >= 0))")
+    conn.commit()
+    return conn
+
+
+def test_biseccion_aisla_solo_filas_malas():
+    print("=== PRUEBA: BISECCIÓN DE BLOQUES FALLIDOS ===")
+
+    total_filas = 1000
+    filas_malas = {17, 500, 998}
+    filas = [(i, -1 if i in filas_malas else i) for i in range(total_filas)]
+
+    conn = crear_destino()
+    writer = BulkWriter(conn, 'Destino', ['ID', 'Cantidad'], chunk_size=250, isolate_errors=True)
+    insertadas = writer.write(filas)
+    writer.close()
+
+    total_destino = conn.execute("SELECT COUNT(*) FROM [Destino]").fetchone()[0]
+    rechazadas = sorted(f['numero_fila'] for f in writer.filas_rechazadas)
+    limite_viajes = len(filas_malas) * (math.ceil(math.log2(writer.chunk_size)) + 1)
+
+    print(f"   Insertadas: {insertadas}, en destino: {total_destino}")
+    print(f"   Rechazadas: {rechazadas}")
+    print(f"   Viajes fallidos: {writer.viajes_fallidos} (límite {limite_viajes})")
+
+    assert insertadas == total_filas - len(filas_malas)
+    assert total_destino == insertadas
+    assert rechazadas == sorted(filas_malas)
+    assert writer.viajes_fallidos <= limite_viajes
+    print("✅ Solo las filas malas fueron aisladas")
+    conn.close()
+
+
+def test_sin_errores_un_viaje_por_bloque():
+    print("\n=== PRUEBA: SIN ERRORES NO HAY BISECCIÓN ===")
+
+    conn = crear_destino()
+    writer = BulkWriter(conn, 'Destino', ['ID', 'Cantidad'], chunk_size=100, isolate_errors=True)
+    writer.write((i, i) for i in range(1000))
+    writer.close()
+
+    resumen = writer.resumen()
+    print(f"   Bloques: {resumen['bloques']}, viajes fallidos: {resumen['viajes_fallidos']}")
+
+    assert resumen['registros_insertados'] == 1000
+    assert resumen['bloques'] == 10
+    assert resumen['viajes_fallidos'] == 0
+    assert resumen['registros_cuarentena'] == 0
+    print("✅ Cada bloque se insertó en un solo viaje")
+    conn.close()
+
+
+if __name__ == '__main__':
+    test_biseccion_aisla_solo_filas_malas()
+    test_sin_errores_un_viaje_por_bloque()
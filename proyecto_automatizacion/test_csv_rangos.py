@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Prueba de la división de CSV en rangos de bytes
+
+Genera un CSV con campos entre comillas que contienen saltos de línea, comas y
+comillas escapadas, lo divide con rangos muy pequeños (para forzar cortes dentro
+de campos multilínea) y verifica con el módulo csv que cada rango contiene
+registros completos y que la concatenación de todos es igual al archivo completo.
+También verifica la lectura de la cola (modo 'tail'): un registro a medio
+escribir al final del archivo no se incluye y el offset queda alineado.
+"""
+import os
+import io
+import csv
+import random
+import tempfile
+
+from automatizacion.csv_parallel import calcular_rangos, fin_encabezado, fin_ultimo_registro
+
+
+def generar_csv(ruta, filas, terminador='\n'):
+    """CSV con texto multilínea, comillas escapadas y comas dentro de campos"""
+    rng = random.Random(11)
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo, lineterminator=terminador)
+        escritor.writerow(['ID', 'Descripcion', 'Valor'])
+        for i in range(filas):
+            texto = rng.choice([
+                'simple',
+                'con, coma',
+                'línea 1\nlínea 2',
+                'cita "textual"\ny salto',
+                '"\n"\n""',
+                '',
+            ])
+            escritor.writerow([i, texto, round(rng.random() * 1000, 2)])
+
+
+def leer_registros(datos):
+    return list(csv.reader(io.StringIO(datos.decode('utf-8'), newline='')))
+
+
+def probar(tamano_rango, terminador):
+    ruta = os.path.join(tempfile.mkdtemp(), 'datos.csv')
+    generar_csv(ruta, 3000, terminador)
+
+    with open(ruta, 'rb') as archivo:
+        contenido = archivo.read()
+    esperados = leer_registros(contenido)[1:]
+
+    rangos = list(calcular_rangos(ruta, tamano_rango))
+    assert rangos[0][0] == fin_encabezado(ruta), "El primer rango no empieza tras el encabezado"
+    assert rangos[-1][1] == len(contenido), "El último rango no llega al final del archivo"
+
+    obtenidos = []
+    for (inicio, fin), siguiente in zip(rangos, rangos[1:] + [(len(contenido), None)]):
+        assert fin == siguiente[0], "Rangos con huecos o solapados"
+        registros = leer_registros(contenido[inicio:fin])
+        # Cada rango empieza en un registro: el primer campo siempre es un ID numérico
+        assert all(registro[0].isdigit() for registro in registros), f"Rango {inicio}-{fin} cortado dentro de un campo"
+        obtenidos.extend(registros)
+
+    assert obtenidos == esperados, "Los rangos no reproducen el archivo completo"
+    print(f"✅ rango={tamano_rango:>5} bytes, fin de línea={terminador!r}: {len(rangos)} rangos, {len(obtenidos)} registros")
+    os.remove(ruta)
+
+
+def probar_cola():
+    """Registro incompleto al final (archivo en escritura) y lectura desde un offset"""
+    ruta = os.path.join(tempfile.mkdtemp(), 'log.csv')
+    generar_csv(ruta, 500)
+    tamano_inicial = os.path.getsize(ruta)
+
+    inicio = fin_encabezado(ruta)
+    assert fin_ultimo_registro(ruta, inicio) == tamano_inicial, "El archivo completo debe terminar en un registro"
+
+    # Se agregan filas y un registro a medio escribir dentro de un campo entre comillas
+    with open(ruta, 'a', newline='', encoding='utf-8') as archivo:
+        archivo.write('500,"agregada\ncon salto",1.5\n501,otra,2\n502,"incompleta\n')
+    fin = fin_ultimo_registro(ruta, tamano_inicial)
+
+    with open(ruta, 'rb') as archivo:
+        contenido = archivo.read()
+    nuevos = []
+    for inicio_rango, fin_rango in calcular_rangos(ruta, 16, inicio=tamano_inicial, fin=fin):
+        nuevos.extend(leer_registros(contenido[inicio_rango:fin_rango]))
+
+    assert [registro[0] for registro in nuevos] == ['500', '501'], f"Cola incorrecta: {nuevos}"
+    assert nuevos[0][1] == 'agregada\ncon salto'
+    print(f"✅ cola: {len(nuevos)} registros nuevos desde el byte {tamano_inicial}, registro incompleto excluido")
+    os.remove(ruta)
+
+
+if __name__ == '__main__':
+    probar_cola()
+    for tamano in (7, 64, 1000, 10 ** 9):
+        for terminador in ('\n', '\r\n'):
+            probar(tamano, terminador)
+    print("\n✅ Todos los rangos están alineados con registros completos")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Prueba de la extracción paralela por tramos de clave
+
+Verifica que los tramos cubren el rango completo sin solaparse (claves enteras
+y de fecha) y que ParallelRangeExtractor entrega todas las filas exactamente
+una vez, usando un archivo SQLite temporal como origen (una conexión por hilo).
+"""
+import os
+import sqlite3
+import datetime
+import tempfile
+
+from automatizacion.parallel_extractor import (
+    ParallelRangeExtractor, ParallelExtractionError, calcular_tramos
+)
+
+
+class ConectorSQLite:
+    """Conector mínimo con la misma interfaz de stream_query que SQLServerConnector"""
+
+    def __init__(self, ruta, fallar=False):
+        self.conn = sqlite3.connect(ruta)
+        self.fallar = fallar
+
+    def stream_query(self, query, params=None, batch_size=1000):
+        if self.fallar:
+            raise RuntimeError('conexión perdida')
+        cursor = self.conn.execute(query, params or ())
+
+        def lotes():
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [tuple(row) for row in rows]
+
+        return cursor.description, lotes()
+
+    def disconnect(self):
+        self.conn.close()
+
+
+def crear_origen(filas):
+    ruta = os.path.join(tempfile.mkdtemp(), 'origen.db')
+    conn = sqlite3.connect(ruta)
+    conn.execute("CREATE TABLE [Origen] ([ID] INTEGER PRIMARY KEY, [Valor] TEXT)")
+    conn.executemany("INSERT INTO [Origen] VALUES (?, ?)", ((i, f'v{i}') for i in range(1, filas + 1)))
+    conn.commit()
+    conn.close()
+    return ruta
+
+
+def test_tramos_cubren_rango():
+    print("=== PRUEBA: TRAMOS DE CLAVE ===")
+
+    tramos = calcular_tramos(1, 100, 4)
+    print(f"   Enteros: {tramos}")
+    assert tramos[0][0] == 1 and tramos[-1][1] is None
+    assert all(tramos[i][1] == tramos[i + 1][0] for i in range(len(tramos) - 1))
+    assert len(tramos) == 4
+
+    # Rango menor que el grado: sin tramos vacíos repetidos
+    assert calcular_tramos(5, 6, 8) == [(5, 6), (6, None)]
+    assert calcular_tramos(7, 7, 4) == [(7, None)]
+
+    fechas = calcular_tramos(datetime.date(2024, 1, 1), datetime.date(2024, 12, 31), 3)
+    print(f"   Fechas: {fechas}")
+    assert len(fechas) == 3
+    print("✅ Los tramos son contiguos y cubren el rango")
+
+
+def test_extractor_entrega_todas_las_filas():
+    print("\n=== PRUEBA: EXTRACCIÓN PARALELA ===")
+
+    ruta = crear_origen(10000)
+    tramos = calcular_tramos(1, 10000, 4)
+    extractor = ParallelRangeExtractor(
+        lambda: ConectorSQLite(ruta), "SELECT [ID], [Valor] FROM [Origen]", 'ID', tramos, batch_size=500
+    )
+
+    ids = [fila[0] for lote in extractor.iterar_lotes() for fila in lote]
+    print(f"   Filas por tramo: {extractor.filas_por_tramo}")
+
+    assert len(ids) == 10000
+    assert sorted(ids) == list(range(1, 10001))
+    print("✅ Cada fila se leyó exactamente una vez")
+
+
+def test_error_en_tramo_se_propaga():
+    print("\n=== PRUEBA: ERROR EN UN TRAMO ===")
+
+    ruta = crear_origen(1000)
+    creados = []
+
+    def crear_conector():
+        creados.append(1)
+        return ConectorSQLite(ruta, fallar=len(creados) == 2)
+
+    extractor = ParallelRangeExtractor(
+        crear_conector, "SELECT [ID], [Valor] FROM [Origen]", 'ID', calcular_tramos(1, 1000, 3), batch_size=50
+    )
+    try:
+        for _ in extractor.iterar_lotes():
+            pass
+        assert False, 'Se esperaba ParallelExtractionError'
+    except ParallelExtractionError as e:
+        print(f"   Error recibido: {e}")
+    print("✅ El error del tramo detiene la extracción")
+
+
+if __name__ == '__main__':
+    test_tramos_cubren_rango()
+    test_extractor_entrega_todas_las_filas()
+    test_error_en_tramo_se_propaga()
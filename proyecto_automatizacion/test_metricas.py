@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Prueba de las métricas en formato Prometheus
+
+Registra eventos con la API de automatizacion.metrics y verifica que la
+exportación en texto contenga contadores por etiqueta, buckets acumulados de
+los histogramas y la latencia de una vista decorada con medir_vista. Sin
+agregación entre workers las series llevan además la etiqueta pid; con
+PROMETHEUS_MULTIPROC_DIR el endpoint suma los valores de todos los workers.
+"""
+import os
+import tempfile
+
+from automatizacion import metrics
+
+
+def exportar_texto():
+    cuerpo, content_type = metrics.exportar()
+    assert content_type.startswith('text/plain')
+    return cuerpo.decode('utf-8')
+
+
+def con_pid(serie):
+    """Agrega la etiqueta pid que lleva cada serie sin agregación entre workers"""
+    pid = metrics.pid_serie()
+    if pid is None:
+        return serie
+    if '{' in serie:
+        return serie.replace('{', f'{{pid="{pid}",', 1)
+    return f'{serie}{{pid="{pid}"}}'
+
+
+def valor(texto, prefijo):
+    prefijo = con_pid(prefijo)
+    for linea in texto.splitlines():
+        if linea.startswith(prefijo + ' '):
+            return float(linea.rsplit(' ', 1)[1])
+    raise AssertionError(f"No se encontró la serie {prefijo}")
+
+
+def probar_contadores():
+    metrics.filas_extraidas('csv', 1000)
+    metrics.filas_extraidas('csv', 500)
+    metrics.filas_cargadas('sql', 42)
+    metrics.consulta_cache('catalogo', True)
+    metrics.consulta_cache('catalogo', False)
+    metrics.consulta_cache('catalogo', True)
+
+    texto = exportar_texto()
+    assert valor(texto, 'opav_filas_extraidas_total{tipo_origen="csv"}') == 1500
+    assert valor(texto, 'opav_filas_cargadas_total{tipo_origen="sql"}') == 42
+    assert valor(texto, 'opav_cache_consultas_total{cache="catalogo",resultado="acierto"}') == 2
+    assert valor(texto, 'opav_cache_consultas_total{cache="catalogo",resultado="fallo"}') == 1
+    print("✅ contadores por tipo de origen y aciertos/fallos de caché")
+
+
+def probar_histogramas():
+    metrics.observar_lote_insercion(0.02)
+    metrics.observar_lote_insercion(3.0)
+    metrics.observar_escritura_tracker('sincrono', 0.004)
+
+    texto = exportar_texto()
+    assert valor(texto, 'opav_lote_insercion_segundos_bucket{le="0.025"}') == 1
+    assert valor(texto, 'opav_lote_insercion_segundos_bucket{le="+Inf"}') == 2
+    assert valor(texto, 'opav_lote_insercion_segundos_count') == 2
+    assert abs(valor(texto, 'opav_lote_insercion_segundos_sum') - 3.02) < 1e-9
+    assert valor(texto, 'opav_escritura_tracker_segundos_count{modo="sincrono"}') == 1
+    print("✅ histogramas con buckets acumulados, conteo y suma")
+
+
+def probar_vista():
+    @metrics.medir_vista('vista_prueba')
+    def vista(request):
+        return 'ok'
+
+    assert vista(None) == 'ok'
+    texto = exportar_texto()
+    assert valor(texto, 'opav_vista_segundos_count{vista="vista_prueba"}') == 1
+    print("✅ latencia de vistas con medir_vista")
+
+
+def probar_directorio_compartido():
+    if metrics.prometheus_client is not None or not hasattr(os, 'fork'):
+        print("⏭️ suma entre workers: solo aplica al registro mínimo con fork")
+        return
+
+    with tempfile.TemporaryDirectory() as directorio:
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = directorio
+        try:
+            # Dos "workers": cada uno registra filas y responde un scrape (que vuelca sus valores)
+            for filas in (100, 250):
+                pid = os.fork()
+                if pid == 0:
+                    metrics.filas_cargadas('parquet', filas)
+                    metrics.exportar()
+                    os._exit(0)
+                _, estado = os.waitpid(pid, 0)
+                assert estado == 0
+
+            texto = exportar_texto()
+            assert valor(texto, 'opav_filas_cargadas_total{tipo_origen="parquet"}') == 350
+            assert 'pid=' not in texto
+            # El proceso que responde también suma sus propios valores
+            assert valor(texto, 'opav_filas_extraidas_total{tipo_origen="csv"}') == 1500
+        finally:
+            del os.environ['PROMETHEUS_MULTIPROC_DIR']
+    print("✅ con PROMETHEUS_MULTIPROC_DIR el endpoint suma los valores de todos los workers")
+
+
+if __name__ == '__main__':
+    probar_contadores()
+    probar_histogramas()
+    probar_vista()
+    probar_directorio_compartido()
+    modo = 'prometheus_client' if metrics.prometheus_client else 'registro mínimo'
+    print(f"\n✅ Métricas verificadas ({modo})")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Prueba del pool de conexiones
+
+Usa conexiones SQLite en memoria como conexiones del pool para verificar
+reutilización, límite de tamaño con tiempo de espera, expiración de conexiones
+ociosas, descarte de conexiones muertas (ping) y estadísticas por checkout.
+"""
+import time
+import sqlite3
+import threading
+
+from automatizacion.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+def crear_pool(**opciones):
+    return ConnectionPool(lambda: sqlite3.connect(':memory:', check_same_thread=False), 'prueba', **opciones)
+
+
+def probar_reutilizacion():
+    pool = crear_pool(max_size=2)
+    primera = pool.checkout()
+    pool.checkin(primera)
+    segunda = pool.checkout()
+    assert segunda is primera, "La conexión devuelta debe reutilizarse"
+    pool.checkin(segunda)
+
+    stats = pool.estadisticas()
+    assert stats['creadas'] == 1 and stats['reutilizadas'] == 1 and stats['checkouts'] == 2
+    print(f"✅ reutilización: {stats['creadas']} creada, {stats['reutilizadas']} reutilizada")
+
+
+def probar_limite_y_espera():
+    pool = crear_pool(max_size=2, checkout_timeout=0.2)
+    a, b = pool.checkout(), pool.checkout()
+    try:
+        pool.checkout()
+        raise AssertionError("Debía agotarse el tiempo de espera con el pool lleno")
+    except PoolTimeoutError:
+        pass
+
+    # Un checkin desde otro hilo libera el cupo para quien espera
+    pool.checkout_timeout = 5
+    threading.Timer(0.1, pool.checkin, args=(a,)).start()
+    c = pool.checkout()
+    assert c is a
+    pool.checkin(b)
+    pool.checkin(c)
+
+    stats = pool.estadisticas()
+    assert stats['timeouts'] == 1 and stats['en_uso'] == 0 and stats['espera_max_ms'] >= 50
+    print(f"✅ límite: timeout con pool lleno, espera máxima {stats['espera_max_ms']:.0f} ms")
+
+
+def probar_expiracion_y_ping():
+    pool = crear_pool(max_size=2, idle_timeout=0.1, ping_after=0)
+    conexion = pool.checkout()
+    pool.checkin(conexion)
+    time.sleep(0.15)
+    nueva = pool.checkout()
+    assert nueva is not conexion, "La conexión ociosa debía expirar"
+    pool.checkin(nueva)
+    assert pool.estadisticas()['expiradas'] == 1
+
+    # Conexión muerta en el pool: el ping falla y se abre otra
+    pool.idle_timeout = 60
+    nueva.close()
+    reemplazo = pool.checkout()
+    assert reemplazo is not nueva
+    reemplazo.execute('SELECT 1')
+    pool.checkin(reemplazo)
+    assert pool.estadisticas()['descartadas'] == 1
+    print("✅ expiración de ociosas y descarte por ping fallido")
+
+
+def probar_context_manager():
+    pool = crear_pool(max_size=1)
+    with pool.conexion() as conexion:
+        conexion.execute('CREATE TABLE t (x INT)')
+    with pool.conexion() as otra:
+        assert otra is conexion
+    assert pool.estadisticas()['en_uso'] == 0
+    print("✅ context manager devuelve la conexión al pool")
+
+
+if __name__ == '__main__':
+    probar_reutilizacion()
+    probar_limite_y_espera()
+    probar_expiracion_y_ping()
+    probar_context_manager()
+    print("\n✅ Pool de conexiones verificado")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Prueba de la línea de tiempo por etapas de una ejecución
+
+Verifica que los tramos se midan por objetivo y etapa, que las mediciones
+repetidas (lectura por bloques) se acumulen y que el resumen ordene las etapas
+y calcule los porcentajes sobre el tiempo medido.
+"""
+import json
+import time
+
+from automatizacion.run_timeline import RunTimeline
+
+
+def probar_span_y_acumulacion():
+    timeline = RunTimeline()
+    for _ in range(3):
+        with timeline.span('lectura', 'Hoja1', filas=100) as tramo:
+            tramo['bytes'] = 800
+            time.sleep(0.01)
+
+    resumen = timeline.resumen()
+    assert len(resumen['tramos']) == 1
+    tramo = resumen['tramos'][0]
+    assert tramo['veces'] == 3 and tramo['filas'] == 300 and tramo['bytes'] == 2400
+    assert tramo['segundos'] >= 0.03 and tramo['porcentaje'] == 100
+    print(f"✅ lectura acumulada: {tramo['veces']} bloques, {tramo['segundos']}s")
+
+
+def probar_orden_y_porcentajes():
+    timeline = RunTimeline()
+    timeline.registrar('insercion', 'Tabla', 0.3, filas=10)
+    timeline.registrar('ddl', 'Tabla', 0.1)
+    timeline.registrar('commit', 'Tabla', 0.1, filas=10)
+    timeline.registrar('ddl', 'Otra', 0.5)
+
+    resumen = timeline.resumen()
+    etapas = [etapa['etapa'] for etapa in resumen['por_etapa']]
+    assert etapas == ['ddl', 'insercion', 'commit'], etapas
+    ddl = resumen['por_etapa'][0]
+    assert abs(ddl['segundos'] - 0.6) < 1e-9 and ddl['porcentaje'] == 60.0
+    assert [t['objetivo'] for t in resumen['tramos']] == ['Tabla', 'Tabla', 'Tabla', 'Otra']
+    # Se guarda en MigrationLog.details: debe ser serializable
+    json.dumps(resumen)
+    print(f"✅ etapas en orden {etapas}, DDL {ddl['porcentaje']}% del tiempo medido")
+
+
+def probar_error_dentro_del_span():
+    timeline = RunTimeline()
+    try:
+        with timeline.span('commit', 'Hoja1'):
+            raise RuntimeError('fallo')
+    except RuntimeError:
+        pass
+    assert timeline and timeline.resumen()['tramos'][0]['etapa'] == 'commit'
+    print("✅ un tramo que falla también queda medido")
+
+
+if __name__ == '__main__':
+    probar_span_y_acumulacion()
+    probar_orden_y_porcentajes()
+    probar_error_dentro_del_span()
+    print("\n✅ Línea de tiempo por etapas verificada")